@@ -12,569 +12,164 @@ from PIL import Image
 import io
 import base64
 import streamlit.components.v1 as components
+from collections import OrderedDict
+import heapq
+import os
+import threading
+import itertools
+import uuid
+import shutil
+import atexit
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from real_data_no_keys import FreeRealData
 
 # =============================================================================
 # PREMIUM CANVAS ANIMATIONS
 # =============================================================================
 
+# Static bundle built by scripts/build_components.py. Assets are content-hashed,
+# so the browser fetches them once and reruns only send the scene arguments.
+SCENE_COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "components", "skywatch")
+scene_component = components.declare_component("skywatch_scenes", path=SCENE_COMPONENT_DIR)
+
 class PremiumCanvasAnimations:
+    # Frame-rate cap per animation mode; 0 draws a single static frame
+    ANIMATION_MODES = {
+        "Full": 60,
+        "Low Power": 15,
+        "Static": 0
+    }
+    
     def __init__(self):
         pass
     
-    def create_cosmic_starfield(self):
+    def get_animation_config(self, mode="Full", fps=None):
+        """Client-side animation settings for a mode, optionally overriding the frame cap"""
+        max_fps = self.ANIMATION_MODES.get(mode, 60) if fps is None or mode == "Static" else fps
+        return {
+            'mode': mode,
+            'fps': max_fps,
+            'density': 0.5 if mode == "Low Power" else 1.0
+        }
+    
+    def create_cosmic_starfield(self, mode="Full", fps=None):
         """Create advanced cosmic starfield with constellations"""
-        cosmic_js = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                .cosmic-canvas {
-                    position: fixed;
-                    top: 0;
-                    left: 0;
-                    width: 100%;
-                    height: 100%;
-                    pointer-events: none;
-                    z-index: -1;
-                }
-            </style>
-        </head>
-        <body>
-            <canvas class="cosmic-canvas" id="cosmicCanvas"></canvas>
-            
-            <script>
-                class CosmicStarfield {
-                    constructor() {
-                        this.canvas = document.getElementById('cosmicCanvas');
-                        this.ctx = this.canvas.getContext('2d');
-                        this.stars = [];
-                        this.meteors = [];
-                        this.nebulas = [];
-                        this.constellations = [];
-                        
-                        this.init();
-                    }
-                    
-                    init() {
-                        this.resize();
-                        this.createStars();
-                        this.createNebulas();
-                        this.createConstellations();
-                        this.animate();
-                        
-                        window.addEventListener('resize', () => this.resize());
-                    }
-                    
-                    resize() {
-                        this.canvas.width = window.innerWidth;
-                        this.canvas.height = window.innerHeight;
-                        this.stars = [];
-                        this.createStars();
-                    }
-                    
-                    createStars() {
-                        const starCount = Math.min(400, Math.floor((this.canvas.width * this.canvas.height) / 3000));
-                        
-                        for (let i = 0; i < starCount; i++) {
-                            this.stars.push({
-                                x: Math.random() * this.canvas.width,
-                                y: Math.random() * this.canvas.height,
-                                size: Math.random() * 3 + 0.5,
-                                speed: Math.random() * 0.8 + 0.1,
-                                brightness: Math.random() * 0.8 + 0.2,
-                                twinkleSpeed: Math.random() * 0.05 + 0.02,
-                                twinkleOffset: Math.random() * Math.PI * 2,
-                                color: this.getStarColor()
-                            });
-                        }
-                    }
-                    
-                    createNebulas() {
-                        for (let i = 0; i < 3; i++) {
-                            this.nebulas.push({
-                                x: Math.random() * this.canvas.width,
-                                y: Math.random() * this.canvas.height,
-                                radius: Math.random() * 200 + 100,
-                                color: this.getNebulaColor(),
-                                pulseSpeed: Math.random() * 0.002 + 0.001,
-                                pulsePhase: Math.random() * Math.PI * 2
-                            });
-                        }
-                    }
-                    
-                    createConstellations() {
-                        const constellationCount = 8;
-                        for (let i = 0; i < constellationCount; i++) {
-                            const starsInConstellation = Math.floor(Math.random() * 6) + 4;
-                            const constellation = {
-                                stars: [],
-                                lines: [],
-                                brightness: Math.random() * 0.3 + 0.7
-                            };
-                            
-                            // Create constellation stars
-                            const baseX = Math.random() * this.canvas.width;
-                            const baseY = Math.random() * this.canvas.height;
-                            
-                            for (let j = 0; j < starsInConstellation; j++) {
-                                constellation.stars.push({
-                                    x: baseX + (Math.random() - 0.5) * 300,
-                                    y: baseY + (Math.random() - 0.5) * 200,
-                                    size: Math.random() * 2 + 1,
-                                    brightness: Math.random() * 0.4 + 0.6
-                                });
-                            }
-                            
-                            // Create constellation lines
-                            for (let j = 0; j < starsInConstellation - 1; j++) {
-                                for (let k = j + 1; k < starsInConstellation; k++) {
-                                    if (Math.random() > 0.7) { // 30% chance to connect stars
-                                        constellation.lines.push({
-                                            from: j,
-                                            to: k,
-                                            brightness: Math.random() * 0.2 + 0.3
-                                        });
-                                    }
-                                }
-                            }
-                            
-                            this.constellations.push(constellation);
-                        }
-                    }
-                    
-                    getStarColor() {
-                        const colors = [
-                            '#ffffff', '#f8f7ff', '#e3f2fd', '#f3e5f5',
-                            '#fff8e1', '#e8f5e8', '#ffebee', '#e0f2f1'
-                        ];
-                        return colors[Math.floor(Math.random() * colors.length)];
-                    }
-                    
-                    getNebulaColor() {
-                        const colors = [
-                            'rgba(102, 126, 234, 0.1)', 'rgba(118, 75, 162, 0.1)',
-                            'rgba(240, 147, 251, 0.1)', 'rgba(79, 195, 247, 0.1)',
-                            'rgba(129, 199, 132, 0.1)', 'rgba(255, 183, 77, 0.1)'
-                        ];
-                        return colors[Math.floor(Math.random() * colors.length)];
-                    }
-                    
-                    animate() {
-                        this.ctx.fillStyle = 'rgba(12, 12, 46, 0.05)';
-                        this.ctx.fillRect(0, 0, this.canvas.width, this.canvas.height);
-                        
-                        this.drawNebulas();
-                        this.drawStars();
-                        this.drawConstellations();
-                        this.drawDataParticles();
-                        
-                        requestAnimationFrame(() => this.animate());
-                    }
-                    
-                    drawNebulas() {
-                        this.nebulas.forEach(nebula => {
-                            const gradient = this.ctx.createRadialGradient(
-                                nebula.x, nebula.y, 0,
-                                nebula.x, nebula.y, nebula.radius
-                            );
-                            
-                            const pulse = Math.sin(nebula.pulsePhase) * 0.5 + 0.5;
-                            nebula.pulsePhase += nebula.pulseSpeed;
-                            
-                            gradient.addColorStop(0, nebula.color.replace('0.1', (0.15 * pulse).toFixed(2)));
-                            gradient.addColorStop(1, nebula.color.replace('0.1', '0.01'));
-                            
-                            this.ctx.fillStyle = gradient;
-                            this.ctx.beginPath();
-                            this.ctx.arc(nebula.x, nebula.y, nebula.radius, 0, Math.PI * 2);
-                            this.ctx.fill();
-                        });
-                    }
-                    
-                    drawStars() {
-                        this.stars.forEach(star => {
-                            const twinkle = Math.sin(star.twinkleOffset) * 0.3 + 0.7;
-                            star.twinkleOffset += star.twinkleSpeed;
-                            
-                            star.y += star.speed;
-                            if (star.y > this.canvas.height) {
-                                star.y = 0;
-                                star.x = Math.random() * this.canvas.width;
-                            }
-                            
-                            this.ctx.beginPath();
-                            this.ctx.arc(star.x, star.y, star.size, 0, Math.PI * 2);
-                            
-                            // Create star glow
-                            const gradient = this.ctx.createRadialGradient(
-                                star.x, star.y, 0,
-                                star.x, star.y, star.size * 3
-                            );
-                            gradient.addColorStop(0, star.color.replace(')', `, ${star.brightness * twinkle})`).replace('rgb', 'rgba'));
-                            gradient.addColorStop(1, star.color.replace(')', ', 0)').replace('rgb', 'rgba'));
-                            
-                            this.ctx.fillStyle = gradient;
-                            this.ctx.fill();
-                        });
-                    }
-                    
-                    drawConstellations() {
-                        this.constellations.forEach(constellation => {
-                            // Draw constellation lines
-                            constellation.lines.forEach(line => {
-                                const fromStar = constellation.stars[line.from];
-                                const toStar = constellation.stars[line.to];
-                                
-                                this.ctx.strokeStyle = `rgba(102, 126, 234, ${line.brightness * 0.3})`;
-                                this.ctx.lineWidth = 1;
-                                this.ctx.beginPath();
-                                this.ctx.moveTo(fromStar.x, fromStar.y);
-                                this.ctx.lineTo(toStar.x, toStar.y);
-                                this.ctx.stroke();
-                            });
-                            
-                            // Draw constellation stars
-                            constellation.stars.forEach(star => {
-                                this.ctx.beginPath();
-                                this.ctx.arc(star.x, star.y, star.size, 0, Math.PI * 2);
-                                
-                                const gradient = this.ctx.createRadialGradient(
-                                    star.x, star.y, 0,
-                                    star.x, star.y, star.size * 4
-                                );
-                                gradient.addColorStop(0, `rgba(102, 126, 234, ${star.brightness})`);
-                                gradient.addColorStop(1, 'rgba(102, 126, 234, 0)');
-                                
-                                this.ctx.fillStyle = gradient;
-                                this.ctx.fill();
-                            });
-                        });
-                    }
-                    
-                    drawDataParticles() {
-                        // Occasionally create data flow particles
-                        if (Math.random() < 0.1) {
-                            this.createDataParticle();
-                        }
-                        
-                        // Update and draw data particles
-                        for (let i = this.meteors.length - 1; i >= 0; i--) {
-                            const meteor = this.meteors[i];
-                            
-                            meteor.x += meteor.vx;
-                            meteor.y += meteor.vy;
-                            meteor.life -= 0.02;
-                            
-                            if (meteor.life <= 0 || meteor.x < 0 || meteor.x > this.canvas.width || 
-                                meteor.y < 0 || meteor.y > this.canvas.height) {
-                                this.meteors.splice(i, 1);
-                                continue;
-                            }
-                            
-                            // Draw meteor with trail
-                            this.ctx.strokeStyle = `rgba(102, 126, 234, ${meteor.life})`;
-                            this.ctx.lineWidth = 2;
-                            this.ctx.beginPath();
-                            this.ctx.moveTo(meteor.x, meteor.y);
-                            this.ctx.lineTo(meteor.x - meteor.vx * 3, meteor.y - meteor.vy * 3);
-                            this.ctx.stroke();
-                            
-                            // Draw meteor head
-                            this.ctx.beginPath();
-                            this.ctx.arc(meteor.x, meteor.y, 2, 0, Math.PI * 2);
-                            this.ctx.fillStyle = `rgba(255, 255, 255, ${meteor.life})`;
-                            this.ctx.fill();
-                        }
-                    }
-                    
-                    createDataParticle() {
-                        this.meteors.push({
-                            x: Math.random() * this.canvas.width,
-                            y: 0,
-                            vx: (Math.random() - 0.5) * 4,
-                            vy: Math.random() * 3 + 2,
-                            life: 1
-                        });
-                    }
-                }
-                
-                // Initialize when page loads
-                document.addEventListener('DOMContentLoaded', () => {
-                    new CosmicStarfield();
-                });
-            </script>
-        </body>
-        </html>
-        """
-        components.html(cosmic_js, height=0)
-    
-    def create_satellite_network(self):
+        scene_component(
+            scene="starfield",
+            config=self.get_animation_config(mode, fps),
+            height=0,
+            key="cosmic_starfield",
+            default=None
+        )
+    
+    def create_satellite_network(self, mode="Full", fps=None):
         """Create animated satellite network visualization"""
-        satellite_js = """
-        <div style="text-align: center; margin: 2rem 0;">
-            <div style="position: relative; width: 100%; height: 300px; background: rgba(12, 12, 46, 0.3); 
-                border-radius: 20px; overflow: hidden; border: 1px solid rgba(102, 126, 234, 0.3);">
-                <canvas id="satelliteNetwork" style="width: 100%; height: 100%;"></canvas>
-            </div>
-        </div>
-        
-        <script>
-            class SatelliteNetwork {
-                constructor() {
-                    this.canvas = document.getElementById('satelliteNetwork');
-                    this.ctx = this.canvas.getContext('2d');
-                    this.satellites = [];
-                    this.connections = [];
-                    this.dataPackets = [];
-                    
-                    this.init();
-                }
-                
-                init() {
-                    this.resize();
-                    this.createSatellites();
-                    this.createConnections();
-                    this.animate();
-                    
-                    window.addEventListener('resize', () => this.resize());
-                }
-                
-                resize() {
-                    this.canvas.width = this.canvas.offsetWidth;
-                    this.canvas.height = this.canvas.offsetHeight;
-                }
-                
-                createSatellites() {
-                    const satelliteCount = 8;
-                    const padding = 80;
-                    
-                    for (let i = 0; i < satelliteCount; i++) {
-                        const angle = (i / satelliteCount) * Math.PI * 2;
-                        const radius = Math.min(this.canvas.width, this.canvas.height) / 2 - padding;
-                        
-                        this.satellites.push({
-                            x: this.canvas.width / 2 + Math.cos(angle) * radius,
-                            y: this.canvas.height / 2 + Math.sin(angle) * radius,
-                            size: 8,
-                            orbitSpeed: 0.0005 + Math.random() * 0.0005,
-                            orbitAngle: angle,
-                            orbitRadius: radius,
-                            color: this.getSatelliteColor(),
-                            pulsePhase: Math.random() * Math.PI * 2
-                        });
-                    }
-                    
-                    // Add central hub
-                    this.satellites.push({
-                        x: this.canvas.width / 2,
-                        y: this.canvas.height / 2,
-                        size: 12,
-                        orbitSpeed: 0,
-                        orbitAngle: 0,
-                        orbitRadius: 0,
-                        color: '#764ba2',
-                        pulsePhase: 0
-                    });
-                }
-                
-                createConnections() {
-                    // Connect satellites to central hub
-                    for (let i = 0; i < this.satellites.length - 1; i++) {
-                        this.connections.push({
-                            from: i,
-                            to: this.satellites.length - 1, // Central hub
-                            strength: 0.8,
-                            dataFlow: Math.random() * 0.02 + 0.01
-                        });
-                    }
-                    
-                    // Connect some satellites to each other
-                    for (let i = 0; i < this.satellites.length - 1; i++) {
-                        for (let j = i + 1; j < this.satellites.length - 1; j++) {
-                            if (Math.random() > 0.7) {
-                                this.connections.push({
-                                    from: i,
-                                    to: j,
-                                    strength: 0.4,
-                                    dataFlow: Math.random() * 0.01 + 0.005
-                                });
-                            }
-                        }
-                    }
-                }
-                
-                getSatelliteColor() {
-                    const colors = ['#667eea', '#764ba2', '#f093fb', '#4fc3f7', '#81c784', '#fff176'];
-                    return colors[Math.floor(Math.random() * colors.length)];
-                }
-                
-                animate() {
-                    this.ctx.fillStyle = 'rgba(12, 12, 46, 0.1)';
-                    this.ctx.fillRect(0, 0, this.canvas.width, this.canvas.height);
-                    
-                    this.updateSatellites();
-                    this.drawConnections();
-                    this.drawSatellites();
-                    this.drawDataFlow();
-                    
-                    requestAnimationFrame(() => this.animate());
-                }
-                
-                updateSatellites() {
-                    this.satellites.forEach((sat, index) => {
-                        if (sat.orbitSpeed > 0) {
-                            sat.orbitAngle += sat.orbitSpeed;
-                            sat.x = this.canvas.width / 2 + Math.cos(sat.orbitAngle) * sat.orbitRadius;
-                            sat.y = this.canvas.height / 2 + Math.sin(sat.orbitAngle) * sat.orbitRadius;
-                        }
-                        
-                        sat.pulsePhase += 0.05;
-                    });
-                }
-                
-                drawConnections() {
-                    this.connections.forEach(conn => {
-                        const from = this.satellites[conn.from];
-                        const to = this.satellites[conn.to];
-                        
-                        // Animated connection line
-                        const gradient = this.ctx.createLinearGradient(from.x, from.y, to.x, to.y);
-                        gradient.addColorStop(0, `${from.color}33`);
-                        gradient.addColorStop(1, `${to.color}33`);
-                        
-                        this.ctx.strokeStyle = gradient;
-                        this.ctx.lineWidth = 1;
-                        this.ctx.setLineDash([5, 5]);
-                        this.ctx.beginPath();
-                        this.ctx.moveTo(from.x, from.y);
-                        this.ctx.lineTo(to.x, to.y);
-                        this.ctx.stroke();
-                        this.ctx.setLineDash([]);
-                        
-                        // Occasionally send data packets
-                        if (Math.random() < conn.dataFlow) {
-                            this.createDataPacket(conn.from, conn.to);
-                        }
-                    });
-                }
-                
-                drawSatellites() {
-                    this.satellites.forEach(satellite => {
-                        const pulse = Math.sin(satellite.pulsePhase) * 0.3 + 0.7;
-                        
-                        // Satellite glow
-                        const gradient = this.ctx.createRadialGradient(
-                            satellite.x, satellite.y, 0,
-                            satellite.x, satellite.y, satellite.size * 4
-                        );
-                        gradient.addColorStop(0, `${satellite.color}${Math.floor(pulse * 255).toString(16).padStart(2, '0')}`);
-                        gradient.addColorStop(1, `${satellite.color}00`);
-                        
-                        this.ctx.fillStyle = gradient;
-                        this.ctx.beginPath();
-                        this.ctx.arc(satellite.x, satellite.y, satellite.size * 4, 0, Math.PI * 2);
-                        this.ctx.fill();
-                        
-                        // Satellite body
-                        this.ctx.fillStyle = satellite.color;
-                        this.ctx.beginPath();
-                        this.ctx.arc(satellite.x, satellite.y, satellite.size, 0, Math.PI * 2);
-                        this.ctx.fill();
-                        
-                        // Satellite details
-                        this.ctx.strokeStyle = '#ffffff';
-                        this.ctx.lineWidth = 1;
-                        this.ctx.beginPath();
-                        this.ctx.arc(satellite.x, satellite.y, satellite.size * 0.7, 0, Math.PI * 2);
-                        this.ctx.stroke();
-                    });
-                }
-                
-                drawDataFlow() {
-                    // Update and draw data packets
-                    for (let i = this.dataPackets.length - 1; i >= 0; i--) {
-                        const packet = this.dataPackets[i];
-                        const from = this.satellites[packet.from];
-                        const to = this.satellites[packet.to];
-                        
-                        packet.progress += 0.02;
-                        
-                        if (packet.progress >= 1) {
-                            this.dataPackets.splice(i, 1);
-                            continue;
-                        }
-                        
-                        // Calculate current position
-                        const currentX = from.x + (to.x - from.x) * packet.progress;
-                        const currentY = from.y + (to.y - from.y) * packet.progress;
-                        
-                        // Draw data packet
-                        this.ctx.fillStyle = `rgba(102, 126, 234, ${1 - packet.progress})`;
-                        this.ctx.beginPath();
-                        this.ctx.arc(currentX, currentY, 3, 0, Math.PI * 2);
-                        this.ctx.fill();
-                        
-                        // Draw packet trail
-                        this.ctx.strokeStyle = `rgba(102, 126, 234, ${0.3 * (1 - packet.progress)})`;
-                        this.ctx.lineWidth = 1;
-                        this.ctx.beginPath();
-                        this.ctx.moveTo(from.x, from.y);
-                        this.ctx.lineTo(currentX, currentY);
-                        this.ctx.stroke();
-                    }
-                }
-                
-                createDataPacket(fromIndex, toIndex) {
-                    this.dataPackets.push({
-                        from: fromIndex,
-                        to: toIndex,
-                        progress: 0
-                    });
-                }
-            }
-            
-            // Initialize satellite network
-            document.addEventListener('DOMContentLoaded', () => {
-                new SatelliteNetwork();
-            });
-        </script>
-        """
-        components.html(satellite_js, height=320)
+        scene_component(
+            scene="satellite_network",
+            config=self.get_animation_config(mode, fps),
+            height=450,
+            key="satellite_network",
+            default=None
+        )
 
 # =============================================================================
 # ENTERPRISE AI PREDICTIVE ANALYTICS
 # =============================================================================
 
 class PredictiveAI:
-    def __init__(self):
+    # Monte Carlo ETA model: speed held within ~10%, weather slows passages by 5% on average,
+    # and vessels not making way are assumed to get underway at a typical service speed
+    ETA_SAMPLES = 1000
+    SPEED_CV = 0.1
+    WEATHER_MEAN = 1.05
+    WEATHER_SD = 0.08
+    ASSUMED_SPEED_KN = 12.0
+    MAX_BATCH_DRAWS = 4_000_000
+    
+    def __init__(self, port_system=None, sea_routes=None):
         self.historical_data = {}
+        self.port_system = port_system
+        self.sea_routes = sea_routes
+        self.rng = np.random.default_rng()
     
-    def predict_ship_eta(self, ship_data, destination):
-        """AI predicts ship arrival time with confidence"""
-        # Simulate ML model prediction
-        base_hours = np.random.uniform(2.0, 48.0)
+    def predict_etas(self, ships_df, destination=None, queue_forecast=None, samples=None):
+        """P10/P50/P90 arrival times for every vessel, sampled in one vectorized Monte Carlo"""
+        samples = samples or self.ETA_SAMPLES
+        ports = self.port_system.ports
+        destinations = np.full(len(ships_df), destination, dtype=object) if destination else ships_df['Destination'].to_numpy()
         
-        # Factors: distance, speed, weather, historical patterns
-        speed_factor = max(0.5, ship_data.get('Speed', 10) / 20)
-        weather_factor = np.random.uniform(0.8, 1.2)
+        lat = ships_df['Filtered_Latitude' if 'Filtered_Latitude' in ships_df else 'Latitude'].to_numpy(dtype=float)
+        lon = ships_df['Filtered_Longitude' if 'Filtered_Longitude' in ships_df else 'Longitude'].to_numpy(dtype=float)
+        if self.sea_routes is not None:
+            distance = self.sea_routes.estimate_remaining_nm(lat, lon, destinations)
+        else:
+            port_lat = np.array([ports[name]['lat'] if name in ports else np.nan for name in destinations])
+            port_lon = np.array([ports[name]['lon'] if name in ports else np.nan for name in destinations])
+            distance = self.port_system.great_circle_nm(lat, lon, port_lat, port_lon)
         
-        predicted_hours = base_hours * speed_factor * weather_factor
-        confidence = min(95, 80 + (ship_data.get('Speed', 0) * 0.5))
+        speed = ships_df['Filtered_Speed' if 'Filtered_Speed' in ships_df else 'Speed'].to_numpy(dtype=float)
+        speed = np.where(speed >= 1, speed, self.ASSUMED_SPEED_KN)
         
-        arrival_time = datetime.now() + timedelta(hours=predicted_hours)
+        # Port delay: exponential anchorage wait with the mean from the berth queue simulation
+        mean_wait = np.zeros(len(ships_df))
+        if queue_forecast is not None:
+            mean_wait = queue_forecast['mean_wait_h'].reindex(destinations).fillna(0).to_numpy(dtype=float)
         
-        return {
-            'eta': arrival_time.strftime('%Y-%m-%d %H:%M'),
-            'hours': round(predicted_hours, 1),
-            'confidence': round(confidence),
-            'factors': {
-                'speed_impact': f"{speed_factor:.1f}x",
-                'weather_impact': f"{weather_factor:.1f}x"
-            }
-        }
+        # One set of draws shared by all vessels: passage time scales with (weather / speed factor)
+        sigma = np.sqrt(np.log(1 + self.SPEED_CV ** 2))
+        passage = np.maximum(self.rng.normal(self.WEATHER_MEAN, self.WEATHER_SD, samples), 0.5) / self.rng.lognormal(-sigma ** 2 / 2, sigma, samples)
+        delay = self.rng.exponential(1.0, samples)
+        
+        # Destinations outside the port table or not reachable by sea get no estimate (NaN hours, NaT ETAs)
+        sailing = np.where(np.isfinite(distance), distance / speed, np.nan)
+        
+        # Without a port delay the quantiles scale directly; otherwise sample the sum per vessel
+        quantiles = sailing[:, None] * np.percentile(passage, [10, 50, 90])[None, :]
+        delayed = np.flatnonzero(mean_wait > 0)
+        chunk = max(1, self.MAX_BATCH_DRAWS // samples)
+        for begin in range(0, len(delayed), chunk):
+            rows = delayed[begin:begin + chunk]
+            hours = sailing[rows, None] * passage[None, :] + mean_wait[rows, None] * delay[None, :]
+            quantiles[rows] = np.percentile(hours, [10, 50, 90], axis=1).T
+        
+        now = pd.Timestamp.now()
+        return pd.DataFrame({
+            'Distance_nm': np.round(distance, 1),
+            'Hours_P10': np.round(quantiles[:, 0], 1),
+            'Hours_P50': np.round(quantiles[:, 1], 1),
+            'Hours_P90': np.round(quantiles[:, 2], 1),
+            'ETA_P10': now + pd.to_timedelta(quantiles[:, 0], unit='h'),
+            'ETA_P50': now + pd.to_timedelta(quantiles[:, 1], unit='h'),
+            'ETA_P90': now + pd.to_timedelta(quantiles[:, 2], unit='h')
+        }, index=ships_df.index)
     
-    def predict_port_congestion(self, port_name, hours_ahead=24):
-        """Predict port congestion for next 24 hours"""
+    def predict_port_congestion(self, port_name, hours_ahead=24, queue_forecast=None):
+        """Predict port congestion for next 24 hours, from the simulated berth queue when given"""
+        if queue_forecast is not None and port_name in queue_forecast.index:
+            forecast = queue_forecast.loc[port_name]
+            if forecast['queue_change'] > 0.5:
+                trend = 'increasing'
+            elif forecast['queue_change'] < -0.5:
+                trend = 'decreasing'
+            else:
+                trend = 'stable'
+            
+            hour = datetime.now().hour
+            peak_hours = [f"{(hour + h) % 24:02d}:00-{(hour + h + 1) % 24:02d}:00" for h in forecast['peak_hour']] if forecast['expected_queue'] >= 0.05 else []
+            
+            return {
+                'congestion_level': round(float(forecast['congestion_level']), 2),
+                'trend': trend,
+                'peak_hours': peak_hours,
+                'expected_queue': round(float(forecast['expected_queue']), 1),
+                'queue_p90': round(float(forecast['queue_p90']), 1),
+                'expected_wait_h': round(float(forecast['mean_wait_h']), 1),
+                'recommendation': self.get_congestion_recommendation(forecast['congestion_level'], forecast['mean_wait_h']),
+                'alternatives': self.get_reroute_options(port_name, queue_forecast) if forecast['mean_wait_h'] > 12 else []
+            }
+        
         # Simulate congestion prediction AI
         base_congestion = np.random.uniform(0.3, 0.9)
         time_of_day_factor = 0.8 + (0.4 * np.sin((datetime.now().hour / 24) * 2 * np.pi))
@@ -588,7 +183,26 @@ class PredictiveAI:
             'recommendation': self.get_congestion_recommendation(predicted_congestion)
         }
     
-    def get_congestion_recommendation(self, congestion):
+    def get_reroute_options(self, port_name, queue_forecast, limit=3, max_distance_nm=1500):
+        """Nearby ports by sea distance whose simulated wait is shorter than at the given port"""
+        if self.sea_routes is None:
+            return []
+        nearby = self.sea_routes.get_alternatives(port_name, limit=limit * 3)
+        nearby['Wait_h'] = queue_forecast['mean_wait_h'].reindex(nearby['Port']).to_numpy()
+        better = nearby[
+            (nearby['Wait_h'] < queue_forecast.at[port_name, 'mean_wait_h']) & (nearby['Distance_nm'] <= max_distance_nm)
+        ].head(limit)
+        return better.round({'Wait_h': 1}).to_dict('records')
+    
+    def get_congestion_recommendation(self, congestion, expected_wait_h=None):
+        # Simulated anchorage waits drive the advice when available
+        if expected_wait_h is not None:
+            if expected_wait_h > 12:
+                return f"Consider rerouting - {expected_wait_h:.0f}h average anchorage wait expected"
+            elif expected_wait_h > 4:
+                return f"Moderate delays expected - schedule {expected_wait_h:.0f}h buffer time"
+            else:
+                return "Normal operations - minimal delays expected"
         if congestion > 0.8:
             return "Consider rerouting - severe congestion expected"
         elif congestion > 0.6:
@@ -596,38 +210,34 @@ class PredictiveAI:
         else:
             return "Normal operations - minimal delays expected"
     
-    def detect_anomalies(self, ships_data):
-        """AI anomaly detection for unusual ship behavior"""
-        anomalies = []
-        
-        for ship in ships_data:
-            # Detect unusual speed patterns
-            if ship.get('Speed', 0) > 25:  # Unusually fast for port area
-                anomalies.append({
-                    'ship_name': ship.get('Name', 'Unknown'),
-                    'type': 'HIGH_SPEED',
-                    'severity': 'MEDIUM',
-                    'message': f"Vessel moving at {ship['Speed']} knots in port area",
-                    'timestamp': datetime.now().strftime('%H:%M:%S')
-                })
-            
-            # Detect unusual locations
-            if ship.get('Status') == 'Underway' and ship.get('Speed', 0) < 2:
-                anomalies.append({
-                    'ship_name': ship.get('Name', 'Unknown'),
-                    'type': 'DRIFTING',
-                    'severity': 'LOW', 
-                    'message': "Vessel appears to be drifting",
-                    'timestamp': datetime.now().strftime('%H:%M:%S')
-                })
+    def detect_snapshot_anomalies(self, ships_df, when):
+        """Unusual speed and drifting checks over a whole snapshot, as scored anomaly events"""
+        speed = ships_df['Filtered_Speed' if 'Filtered_Speed' in ships_df else 'Speed'].to_numpy(dtype=float)
+        underway = ships_df['Status'].to_numpy() == 'Underway' if 'Status' in ships_df else np.zeros(len(ships_df), dtype=bool)
         
-        return anomalies
+        # Unusually fast for port area, and underway while barely making way; drifting is a
+        # weak signal on its own, so its score stays in the LOW band (5 to 5.5)
+        return StreamingAnomalyDetector.build_events(ships_df, when, [
+            ('HIGH_SPEED', speed > 25, speed / 25, lambda i: f"Vessel moving at {speed[i]:.0f} knots in port area"),
+            ('DRIFTING', underway & (speed < 2), 1 + 0.05 * np.clip(2 - speed, 0, 2), lambda i: "Vessel appears to be drifting")
+        ])
 
 # =============================================================================
 # ULTIMATE GLOBAL MULTI-PORT SYSTEM
 # =============================================================================
 
 class GlobalPortSystem:
+    # Cargo value ranges ($M) by ship type, [low, high)
+    CARGO_VALUE_RANGES = {
+        'Container': (20, 100),
+        'Tanker': (50, 150),
+        'Bulk Carrier': (10, 60),
+        'Cargo': (5, 40),
+        'Ro-Ro': (15, 80),
+        'Vehicle Carrier': (25, 90),
+        'General Cargo': (8, 50)
+    }
+    
     def __init__(self):
         self.ports = {
             # NORTH AMERICA
@@ -701,6 +311,52 @@ class GlobalPortSystem:
             "Middle East": ["Tanker", "Container", "Bulk Carrier", "General Cargo"],
             "Oceania": ["Container", "Bulk Carrier", "General Cargo", "Vehicle Carrier"]
         }
+        
+        # Major trade lanes used to place vessels in transit
+        self.sea_lanes = [
+            ("Shanghai", "Los Angeles"), ("Shenzhen", "Long Beach"), ("Busan", "Vancouver"),
+            ("Tokyo", "Seattle"), ("Singapore", "Rotterdam"), ("Shanghai", "Hamburg"),
+            ("Singapore", "Jebel Ali"), ("Colombo", "Piraeus"), ("Ningbo", "Singapore"),
+            ("Hong Kong", "Sydney"), ("Port Klang", "Durban"), ("Rotterdam", "New York"),
+            ("Felixstowe", "Montreal"), ("Antwerp", "Santos"), ("Valencia", "Cartagena"),
+            ("Santos", "Buenos Aires"), ("Lagos", "Le Havre"), ("Mombasa", "Dubai"),
+            ("Melbourne", "Auckland"), ("Callao", "Los Angeles")
+        ]
+        
+        self.volume_multiplier = {
+            'Very High': 1.5,
+            'High': 1.2,
+            'Medium': 1.0,
+            'Low': 0.7
+        }
+        
+        # Geofence zones per port as (lon, lat) polygons; an explicit 'zones' entry wins
+        for port in self.ports.values():
+            port.setdefault('zones', self.build_port_zones(port))
+    
+    def build_port_zones(self, port):
+        """Default anchorage, port and berth polygons around a port's reference position"""
+        lat, lon = port['lat'], port['lon']
+        lon_scale = 1 / max(np.cos(np.radians(lat)), 0.01)
+        angles = np.radians(np.arange(0, 360, 45) + 22.5)
+        
+        def octagon(radius):
+            return [[round(lon + radius * np.sin(a) * lon_scale, 5), round(lat + radius * np.cos(a), 5)] for a in angles]
+        
+        return {
+            'anchorage': octagon(0.12),
+            'port': octagon(0.035),
+            'berth': [
+                [round(lon + dx * lon_scale, 5), round(lat + dy, 5)]
+                for dx, dy in [(-0.008, -0.003), (0.008, -0.003), (0.008, 0.003), (-0.008, 0.003)]
+            ]
+        }
+    
+    def great_circle_nm(self, lat1, lon1, lat2, lon2):
+        """Haversine distance in nautical miles, element-wise over arrays"""
+        lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=float)) for value in (lat1, lon1, lat2, lon2))
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return 2 * 3440.065 * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
     
     def get_port_ships(self, port_name):
         """Get ships for specific port with realistic regional patterns"""
@@ -712,49 +368,41 @@ class GlobalPortSystem:
         ship_types = self.regional_ship_types.get(region, ["Container", "Tanker", "Bulk Carrier"])
         
         # Adjust ship count based on port volume
-        volume_multiplier = {
-            'Very High': 1.5,
-            'High': 1.2,
-            'Medium': 1.0,
-            'Low': 0.7
-        }
         base_count = 15
-        ship_count = int(base_count * volume_multiplier.get(port.get('volume', 'Medium'), 1.0))
+        ship_count = int(base_count * self.volume_multiplier.get(port.get('volume', 'Medium'), 1.0))
         
         ships = []
         base_lat, base_lon = port["lat"], port["lon"]
         
+        # MMSIs are unique across the fleet: a block of 1000 per port, serials drawn without replacement
+        port_number = list(self.ports.keys()).index(port_name)
+        serials = np.random.permutation(1000)
+        
         for i in range(np.random.randint(ship_count-5, ship_count+5)):
             lat = base_lat + (np.random.random() - 0.5) * 0.06
             lon = base_lon + (np.random.random() - 0.5) * 0.06
             
             company = np.random.choice(companies)
             ship_type = np.random.choice(ship_types)
+            status = np.random.choice(["Underway", "Anchored", "Moored", "Docked", "Berthed"])
             
             # Adjust cargo value based on ship type and region
-            base_value = {
-                'Container': np.random.randint(20, 100),
-                'Tanker': np.random.randint(50, 150),
-                'Bulk Carrier': np.random.randint(10, 60),
-                'Cargo': np.random.randint(5, 40),
-                'Ro-Ro': np.random.randint(15, 80),
-                'Vehicle Carrier': np.random.randint(25, 90),
-                'General Cargo': np.random.randint(8, 50)
-            }.get(ship_type, 30)
+            base_value = np.random.randint(*self.CARGO_VALUE_RANGES[ship_type]) if ship_type in self.CARGO_VALUE_RANGES else 30
             
             # Asian ports have higher values
             if region == 'Asia':
                 base_value = int(base_value * 1.3)
             
             ships.append({
-                'MMSI': f"367{np.random.randint(100000, 999999)}",
+                'MMSI': f"367{port_number:03d}{serials[i]:03d}",
                 'Name': f"{company} {np.random.choice(['SEA', 'OCEAN', 'MARINE', 'GLOBAL', 'WORLD'])} {np.random.randint(1000, 9999)}",
                 'Type': ship_type,
                 'Company': company,
                 'Latitude': round(lat, 6),
                 'Longitude': round(lon, 6),
-                'Speed': np.random.randint(0, 22),
-                'Status': np.random.choice(["Underway", "Anchored", "Moored", "Docked", "Berthed"]),
+                'Speed': np.random.randint(0, 22) if status == "Underway" else 0,
+                'Course': np.random.randint(0, 360),
+                'Status': status,
                 'Destination': port_name,
                 'Port': port_name,
                 'Timestamp': datetime.now().strftime('%H:%M:%S'),
@@ -763,6 +411,860 @@ class GlobalPortSystem:
         
         return ships
 
+    def get_global_fleet(self, scale=None, router=None):
+        """Get ships for every port in the registry, or a simulated fleet of `scale` vessels"""
+        if scale:
+            return self.simulate_fleet(scale, router=router)
+        
+        all_ships = []
+        for port_name in self.ports.keys():
+            all_ships.extend(self.get_port_ships(port_name))
+        return all_ships
+    
+    def simulate_fleet(self, total_vessels, transit_share=0.25, seed=None, router=None):
+        """Vectorized large-scale fleet simulation across ports and sea lanes"""
+        rng = np.random.default_rng(seed)
+        
+        port_names = list(self.ports.keys())
+        port_lat = np.array([self.ports[name]['lat'] for name in port_names])
+        port_lon = np.array([self.ports[name]['lon'] for name in port_names])
+        port_region = np.array([self.ports[name].get('region', 'Asia') for name in port_names])
+        weights = np.array([
+            self.volume_multiplier.get(self.ports[name].get('volume', 'Medium'), 1.0) for name in port_names
+        ])
+        weights = weights / weights.sum()
+        
+        transit_count = int(total_vessels * transit_share) if self.sea_lanes else 0
+        port_count = total_vessels - transit_count
+        
+        # Vessels around ports: the anchorage spread grows with the per-port density
+        port_idx = rng.choice(len(port_names), size=port_count, p=weights)
+        spread = 0.06 * min(15.0, np.sqrt(max(1.0, port_count / (20.0 * len(port_names)))))
+        lat = port_lat[port_idx] + (rng.random(port_count) - 0.5) * spread
+        lon = port_lon[port_idx] + (rng.random(port_count) - 0.5) * spread
+        speed = rng.integers(0, 22, size=port_count)
+        course = rng.integers(0, 360, size=port_count)
+        status = rng.choice(["Underway", "Anchored", "Moored", "Docked", "Berthed"], size=port_count)
+        speed = np.where(status == "Underway", speed, 0)  # only vessels underway make way
+        
+        # Stationary vessels stay in their port's zones however dense the port gets:
+        # anchored ones in the anchorage ring outside the port, the rest alongside in the berth area
+        lon_scale = 1 / np.maximum(np.cos(np.radians(port_lat[port_idx])), 0.01)
+        anchored = np.flatnonzero(status == "Anchored")
+        radius = rng.uniform(0.045, 0.105, size=len(anchored))
+        angle = rng.uniform(0, 2 * np.pi, size=len(anchored))
+        lat[anchored] = port_lat[port_idx[anchored]] + radius * np.cos(angle)
+        lon[anchored] = port_lon[port_idx[anchored]] + radius * np.sin(angle) * lon_scale[anchored]
+        alongside = np.flatnonzero(np.isin(status, ["Moored", "Docked", "Berthed"]))
+        lat[alongside] = port_lat[port_idx[alongside]] + rng.uniform(-0.002, 0.002, size=len(alongside))
+        lon[alongside] = port_lon[port_idx[alongside]] + rng.uniform(-0.006, 0.006, size=len(alongside)) * lon_scale[alongside]
+        
+        # Vessels in transit: interpolated along a lane towards the destination port
+        lookup = {name: i for i, name in enumerate(port_names)}
+        lane_from = np.array([lookup[a] for a, b in self.sea_lanes])
+        lane_to = np.array([lookup[b] for a, b in self.sea_lanes])
+        lane_idx = rng.integers(0, len(self.sea_lanes), size=transit_count)
+        reverse = rng.random(transit_count) < 0.5
+        origin = np.where(reverse, lane_to[lane_idx], lane_from[lane_idx])
+        destination = np.where(reverse, lane_from[lane_idx], lane_to[lane_idx])
+        
+        progress = rng.uniform(0.05, 0.95, size=transit_count)
+        if router is None:
+            dlat = port_lat[destination] - port_lat[origin]
+            dlon = (port_lon[destination] - port_lon[origin] + 180) % 360 - 180  # shortest way round
+            transit_lat = port_lat[origin] + dlat * progress + rng.normal(0, 0.3, transit_count)
+            transit_lon = (port_lon[origin] + dlon * progress + rng.normal(0, 0.3, transit_count) + 180) % 360 - 180
+            transit_course = (np.degrees(np.arctan2(dlon, dlat)) % 360).astype(int)
+        else:
+            # Follow the sea route for each lane and direction, with a little spread across the lane
+            transit_lat = np.empty(transit_count)
+            transit_lon = np.empty(transit_count)
+            transit_course = np.empty(transit_count, dtype=int)
+            pairs = origin * len(port_names) + destination
+            for pair in np.unique(pairs):
+                on_route = pairs == pair
+                route = router.get_route(port_names[pair // len(port_names)], port_names[pair % len(port_names)])
+                lat_, lon_, course_ = router.positions_along(route, progress[on_route])
+                transit_lat[on_route] = lat_ + rng.normal(0, 0.05, int(on_route.sum()))
+                transit_lon[on_route] = (lon_ + rng.normal(0, 0.05, int(on_route.sum())) + 180) % 360 - 180
+                transit_course[on_route] = course_.astype(int)
+        
+        # Routed vessels carry their voyage, so the voyage simulation can keep them on the route
+        origin_names = np.full(total_vessels, "", dtype=object)
+        route_progress = np.full(total_vessels, np.nan)
+        if router is not None:
+            origin_names[port_count:] = np.array(port_names, dtype=object)[origin]
+            route_progress[port_count:] = progress
+        
+        port_idx = np.concatenate([port_idx, destination])
+        lat = np.concatenate([lat, transit_lat])
+        lon = np.concatenate([lon, transit_lon])
+        speed = np.concatenate([speed, rng.integers(10, 22, size=transit_count)])
+        course = np.concatenate([course, transit_course])
+        status = np.concatenate([status, np.full(transit_count, "Underway")])
+        region = port_region[port_idx]
+        
+        # Regional companies and ship types
+        company = np.empty(total_vessels, dtype=object)
+        ship_type = np.empty(total_vessels, dtype=object)
+        for region_name in np.unique(region):
+            in_region = region == region_name
+            count = int(in_region.sum())
+            company[in_region] = rng.choice(self.regional_companies.get(region_name, ["Maersk", "MSC", "COSCO"]), size=count)
+            ship_type[in_region] = rng.choice(self.regional_ship_types.get(region_name, ["Container", "Tanker", "Bulk Carrier"]), size=count)
+        
+        cargo_value = np.full(total_vessels, 30)
+        for type_name, (low, high) in self.CARGO_VALUE_RANGES.items():
+            of_type = ship_type == type_name
+            cargo_value[of_type] = rng.integers(low, high, size=int(of_type.sum()))
+        cargo_value = np.where(region == 'Asia', (cargo_value * 1.3).astype(int), cargo_value)
+        
+        ports = np.array(port_names, dtype=object)[port_idx]
+        names = (
+            pd.Series(company) + " "
+            + pd.Series(rng.choice(['SEA', 'OCEAN', 'MARINE', 'GLOBAL', 'WORLD'], size=total_vessels)) + " "
+            + pd.Series(rng.integers(1000, 9999, size=total_vessels)).astype(str)
+        )
+        
+        return pd.DataFrame({
+            'MMSI': (200000000 + rng.permutation(total_vessels)).astype(str),
+            'Name': names,
+            'Type': ship_type,
+            'Company': company,
+            'Latitude': np.round(lat, 6),
+            'Longitude': np.round(lon, 6),
+            'Speed': speed,
+            'Course': course,
+            'Status': status,
+            'Destination': ports,
+            'Port': ports,
+            'Timestamp': datetime.now().strftime('%H:%M:%S'),
+            'Cargo_Value_M': cargo_value,
+            'Origin': origin_names,
+            'Route_Progress': route_progress
+        })
+
+# =============================================================================
+# SEA ROUTING NETWORK
+# =============================================================================
+
+class SeaRouteNetwork:
+    """Port-to-port sea distances and transit times over a graph of ocean waypoints, straits and canals"""
+    
+    # Waypoints (lat, lon) placed so that every edge below stays on water
+    WAYPOINTS = {
+        # North-west Europe
+        "Dover Strait": (51.0, 1.5), "Felixstowe Approach": (51.9, 1.8), "Scheldt Approach": (51.45, 3.4),
+        "Maas Approach": (52.0, 3.8), "Texel Offshore": (53.3, 4.3), "German Bight": (54.0, 7.8),
+        "English Channel": (50.0, -2.0), "Ushant": (48.5, -5.8), "Finisterre": (43.5, -10.5),
+        "Cape St Vincent": (36.5, -10.0),
+        # Mediterranean and Suez
+        "Gibraltar": (35.95, -5.6), "Alboran Sea": (36.0, -3.0), "Balearic Channel": (39.0, 0.5),
+        "Western Med": (37.5, 3.0), "Cap Bon North": (37.6, 11.0), "Sicily Channel": (36.5, 12.5),
+        "Kythira Strait": (36.0, 23.1), "Eastern Med": (33.8, 26.0),
+        "Suez Canal North": (31.25, 32.35), "Suez Canal South": (29.9, 32.55), "Red Sea": (20.0, 38.5),
+        "Bab el-Mandeb": (12.6, 43.4), "Gulf of Aden": (12.5, 48.0),
+        # Indian Ocean
+        "Arabian Sea": (15.0, 60.0), "Ras al Hadd": (22.6, 60.3), "Gulf of Oman": (24.5, 58.5),
+        "Strait of Hormuz": (26.5, 56.4), "Somali Basin": (2.0, 52.0), "Sri Lanka South": (5.3, 80.0),
+        "Central Indian Ocean": (-5.0, 75.0), "Malacca Entrance": (6.0, 95.5), "Malacca North": (5.8, 97.8),
+        "Malacca South": (1.9, 102.3), "Singapore Strait East": (1.25, 104.3), "Mozambique Channel": (-17.0, 41.0),
+        "South Madagascar": (-27.0, 47.0), "Port Elizabeth Offshore": (-35.0, 26.0), "Cape of Good Hope": (-35.5, 18.5),
+        # East Asia and the western Pacific
+        "South China Sea South": (5.0, 107.0), "South China Sea": (12.0, 112.0), "Pearl River Approach": (22.0, 114.3),
+        "Taiwan Strait": (24.0, 119.5), "Luzon Strait": (21.0, 121.0), "East China Sea": (30.5, 125.0),
+        "Korea Strait": (34.3, 128.8), "Osumi Strait": (30.8, 131.2), "Japan South": (33.0, 136.0),
+        "Japan East": (34.5, 140.5), "Uraga Channel": (35.1, 139.75), "Philippine Sea": (15.0, 127.0),
+        "Mindanao East": (8.0, 128.0), "Equatorial Pacific": (0.0, 150.0), "Solomon Sea East": (-11.0, 163.0),
+        # Australia and New Zealand
+        "Tasman Sea North": (-25.0, 157.0), "Gabo Island": (-37.8, 150.5), "Bass Strait": (-39.6, 146.8),
+        "Bass Strait West": (-39.2, 143.5), "Port Phillip Heads": (-38.35, 144.65), "Great Australian Bight": (-37.0, 130.0),
+        "Cape Leeuwin": (-35.5, 114.5), "North Cape NZ": (-34.0, 173.5), "Hauraki Gulf": (-36.2, 175.6),
+        # North Pacific and the Americas' Pacific coast
+        "North Pacific West": (40.0, 160.0), "North Pacific East": (45.0, -150.0), "Juan de Fuca": (48.4, -124.8),
+        "Admiralty Inlet": (48.2, -122.75), "Strait of Georgia": (49.1, -123.6), "Los Angeles Approach": (33.4, -118.3),
+        "Baja West": (28.0, -116.5), "Cabo San Lucas": (21.5, -110.5), "Central America Pacific": (12.0, -92.0),
+        "Panama Offshore": (6.0, -80.0), "Ecuador Offshore": (-3.0, -83.0), "Peru Offshore": (-8.0, -81.5),
+        "Panama Canal Pacific": (8.9, -79.5), "Panama Canal Atlantic": (9.35, -79.9),
+        # Atlantic
+        "Caribbean Sea": (15.0, -75.0), "Mona Passage": (18.5, -67.8), "Bahamas Offshore": (25.0, -70.0),
+        "US East Offshore": (35.0, -74.0), "New York Approach": (40.3, -73.5), "Grand Banks": (44.0, -50.0),
+        "North Atlantic": (45.0, -40.0), "Cabot Strait": (47.3, -59.8), "Anticosti South": (49.0, -63.0),
+        "St Lawrence": (49.5, -66.5), "Madeira West": (30.0, -20.0), "West Africa": (10.0, -18.0),
+        "Cape Palmas": (3.5, -8.0), "Gulf of Guinea": (3.0, 2.0), "South Atlantic": (-15.0, -25.0),
+        "Brazil East": (-8.0, -33.0), "Abrolhos": (-18.5, -37.5), "Cabo Frio": (-23.5, -41.5),
+        "River Plate": (-35.5, -55.0)
+    }
+    
+    SEA_EDGES = [
+        ("Dover Strait", "Felixstowe Approach"), ("Dover Strait", "Scheldt Approach"), ("Dover Strait", "Maas Approach"),
+        ("Dover Strait", "English Channel"), ("Maas Approach", "Texel Offshore"), ("Texel Offshore", "German Bight"),
+        ("English Channel", "Ushant"), ("Ushant", "Finisterre"), ("Ushant", "North Atlantic"),
+        ("Finisterre", "Cape St Vincent"), ("Finisterre", "North Atlantic"), ("Cape St Vincent", "Gibraltar"),
+        ("Cape St Vincent", "Madeira West"),
+        ("Gibraltar", "Alboran Sea"), ("Alboran Sea", "Western Med"), ("Alboran Sea", "Balearic Channel"),
+        ("Balearic Channel", "Western Med"), ("Western Med", "Cap Bon North"), ("Cap Bon North", "Sicily Channel"),
+        ("Sicily Channel", "Kythira Strait"), ("Sicily Channel", "Eastern Med"), ("Kythira Strait", "Eastern Med"),
+        ("Eastern Med", "Suez Canal North"), ("Suez Canal South", "Red Sea"), ("Red Sea", "Bab el-Mandeb"),
+        ("Bab el-Mandeb", "Gulf of Aden"), ("Gulf of Aden", "Arabian Sea"), ("Gulf of Aden", "Somali Basin"),
+        ("Arabian Sea", "Ras al Hadd"), ("Ras al Hadd", "Gulf of Oman"), ("Gulf of Oman", "Strait of Hormuz"),
+        ("Arabian Sea", "Sri Lanka South"), ("Arabian Sea", "Somali Basin"), ("Arabian Sea", "Central Indian Ocean"),
+        ("Somali Basin", "Mozambique Channel"), ("Mozambique Channel", "Port Elizabeth Offshore"),
+        ("Sri Lanka South", "Malacca Entrance"), ("Sri Lanka South", "Central Indian Ocean"),
+        ("Central Indian Ocean", "Malacca Entrance"), ("Central Indian Ocean", "South Madagascar"),
+        ("Central Indian Ocean", "Cape Leeuwin"), ("South Madagascar", "Port Elizabeth Offshore"),
+        ("Port Elizabeth Offshore", "Cape of Good Hope"), ("Cape of Good Hope", "South Atlantic"),
+        ("Cape of Good Hope", "Gulf of Guinea"),
+        ("Malacca Entrance", "Malacca North"), ("Malacca North", "Malacca South"), ("Malacca South", "Singapore Strait East"),
+        ("Singapore Strait East", "South China Sea South"), ("South China Sea South", "South China Sea"),
+        ("South China Sea", "Pearl River Approach"), ("South China Sea", "Luzon Strait"),
+        ("Pearl River Approach", "Taiwan Strait"), ("Taiwan Strait", "East China Sea"), ("Taiwan Strait", "Luzon Strait"),
+        ("Luzon Strait", "Philippine Sea"), ("Luzon Strait", "East China Sea"), ("East China Sea", "Korea Strait"),
+        ("East China Sea", "Osumi Strait"), ("Osumi Strait", "Japan South"), ("Japan South", "Japan East"),
+        ("Japan East", "Uraga Channel"), ("Japan East", "North Pacific West"), ("Philippine Sea", "Mindanao East"),
+        ("Philippine Sea", "Japan South"), ("Mindanao East", "Equatorial Pacific"), ("Equatorial Pacific", "Solomon Sea East"),
+        ("Solomon Sea East", "Tasman Sea North"),
+        ("Tasman Sea North", "North Cape NZ"), ("Tasman Sea North", "Gabo Island"), ("Gabo Island", "Bass Strait"),
+        ("Gabo Island", "North Cape NZ"),
+        ("Bass Strait", "Bass Strait West"), ("Bass Strait West", "Port Phillip Heads"),
+        ("Bass Strait West", "Great Australian Bight"), ("Great Australian Bight", "Cape Leeuwin"),
+        ("North Cape NZ", "Hauraki Gulf"),
+        ("North Pacific West", "North Pacific East"), ("North Pacific East", "Juan de Fuca"),
+        ("North Pacific East", "Los Angeles Approach"), ("Juan de Fuca", "Admiralty Inlet"),
+        ("Juan de Fuca", "Strait of Georgia"), ("Los Angeles Approach", "Baja West"), ("Baja West", "Cabo San Lucas"),
+        ("Cabo San Lucas", "Central America Pacific"), ("Central America Pacific", "Panama Offshore"),
+        ("Panama Offshore", "Panama Canal Pacific"), ("Panama Offshore", "Ecuador Offshore"),
+        ("Ecuador Offshore", "Peru Offshore"),
+        ("Panama Canal Atlantic", "Caribbean Sea"), ("Caribbean Sea", "Mona Passage"), ("Mona Passage", "Bahamas Offshore"),
+        ("Bahamas Offshore", "US East Offshore"), ("US East Offshore", "New York Approach"),
+        ("New York Approach", "Grand Banks"), ("Grand Banks", "North Atlantic"), ("Grand Banks", "Cabot Strait"),
+        ("Cabot Strait", "Anticosti South"), ("Anticosti South", "St Lawrence"), ("North Atlantic", "Madeira West"),
+        ("Mona Passage", "North Atlantic"), ("Madeira West", "West Africa"), ("West Africa", "Cape Palmas"),
+        ("West Africa", "Brazil East"), ("West Africa", "South Atlantic"), ("Cape Palmas", "Gulf of Guinea"),
+        ("Gulf of Guinea", "Brazil East"), ("South Atlantic", "Brazil East"), ("Brazil East", "Abrolhos"),
+        ("Abrolhos", "Cabo Frio"), ("Cabo Frio", "River Plate"), ("South Atlantic", "River Plate")
+    ]
+    
+    # Canal transits: (entrance, exit) -> hours added on top of the sailing time
+    CANALS = {
+        ("Suez Canal North", "Suez Canal South"): 14.0,
+        ("Panama Canal Pacific", "Panama Canal Atlantic"): 10.0
+    }
+    
+    # Port -> the waypoints a vessel reaches it from
+    PORT_ACCESS = {
+        "New York": ["New York Approach"], "Los Angeles": ["Los Angeles Approach"], "Long Beach": ["Los Angeles Approach"],
+        "Seattle": ["Admiralty Inlet"], "Vancouver": ["Strait of Georgia"], "Montreal": ["St Lawrence"],
+        "Rotterdam": ["Maas Approach"], "Hamburg": ["German Bight"], "Antwerp": ["Scheldt Approach"],
+        "Felixstowe": ["Felixstowe Approach"], "Le Havre": ["English Channel"], "Bremen": ["German Bight"],
+        "Valencia": ["Balearic Channel"], "Piraeus": ["Kythira Strait"],
+        "Shanghai": ["East China Sea"], "Singapore": ["Singapore Strait East", "Malacca South"],
+        "Shenzhen": ["Pearl River Approach"], "Ningbo": ["East China Sea"], "Hong Kong": ["Pearl River Approach"],
+        "Busan": ["Korea Strait"], "Tokyo": ["Uraga Channel"], "Yokohama": ["Uraga Channel"],
+        "Kaohsiung": ["Taiwan Strait", "Luzon Strait"], "Port Klang": ["Malacca North", "Malacca South"],
+        "Colombo": ["Sri Lanka South"], "Dubai": ["Strait of Hormuz"], "Jebel Ali": ["Strait of Hormuz"],
+        "Santos": ["Cabo Frio"], "Buenos Aires": ["River Plate"], "Callao": ["Peru Offshore"],
+        "Cartagena": ["Caribbean Sea"], "Durban": ["Mozambique Channel", "Port Elizabeth Offshore", "South Madagascar"],
+        "Mombasa": ["Somali Basin", "Mozambique Channel"], "Lagos": ["Gulf of Guinea"], "Alexandria": ["Eastern Med"],
+        "Sydney": ["Gabo Island", "Tasman Sea North"], "Melbourne": ["Port Phillip Heads"], "Auckland": ["Hauraki Gulf"]
+    }
+    
+    TRANSIT_SPEED_KN = 14.0
+    
+    def __init__(self, port_system, cache_path=None):
+        self.port_system = port_system
+        self.port_names = list(port_system.ports.keys())
+        self.port_index = {name: i for i, name in enumerate(self.port_names)}
+        
+        # Ports first, then waypoints, so the first len(port_names) rows are the port matrix
+        self.node_names = self.port_names + [name for name in self.WAYPOINTS if name not in self.port_index]
+        self.node_index = {name: i for i, name in enumerate(self.node_names)}
+        self.node_lat = np.array([self.get_position(name)[0] for name in self.node_names])
+        self.node_lon = np.array([self.get_position(name)[1] for name in self.node_names])
+        
+        # Edge list: (a, b, nautical miles, extra hours)
+        edges = [(a, b, 0.0) for a, b in self.SEA_EDGES]
+        edges += [(a, b, hours) for (a, b), hours in self.CANALS.items()]
+        edges += [(port, waypoint, 0.0) for port, waypoints in self.PORT_ACCESS.items() if port in self.port_index for waypoint in waypoints]
+        a = np.array([self.node_index[edge[0]] for edge in edges])
+        b = np.array([self.node_index[edge[1]] for edge in edges])
+        self.edges = {
+            'a': a,
+            'b': b,
+            'nm': self.port_system.great_circle_nm(self.node_lat[a], self.node_lon[a], self.node_lat[b], self.node_lon[b]),
+            'delay_h': np.array([edge[2] for edge in edges])
+        }
+        
+        self.cache_path = cache_path
+        self.distances, self.transit_hours = self.load_or_build()
+    
+    def get_position(self, name):
+        if name in self.port_system.ports:
+            return self.port_system.ports[name]['lat'], self.port_system.ports[name]['lon']
+        return self.WAYPOINTS[name]
+    
+    def get_fingerprint(self):
+        """Hash of everything the matrices depend on, so a stale cache file is rebuilt"""
+        graph = {
+            'nodes': [(name, round(lat, 5), round(lon, 5)) for name, lat, lon in zip(self.node_names, self.node_lat, self.node_lon)],
+            'edges': sorted((self.node_names[a], self.node_names[b], hours) for a, b, hours in zip(self.edges['a'], self.edges['b'], self.edges['delay_h'])),
+            'speed': self.TRANSIT_SPEED_KN
+        }
+        return hashlib.sha256(json.dumps(graph, sort_keys=True).encode()).hexdigest()
+    
+    def build_matrices(self):
+        """All-pairs fastest routes (Floyd-Warshall on transit hours), carrying the route distance along"""
+        n = len(self.node_names)
+        hours = np.full((n, n), np.inf)
+        miles = np.full((n, n), np.inf)
+        np.fill_diagonal(hours, 0)
+        np.fill_diagonal(miles, 0)
+        
+        edge_hours = self.edges['nm'] / self.TRANSIT_SPEED_KN + self.edges['delay_h']
+        for a, b in ((self.edges['a'], self.edges['b']), (self.edges['b'], self.edges['a'])):
+            hours[a, b] = edge_hours
+            miles[a, b] = self.edges['nm']
+        
+        for k in range(n):
+            via = hours[:, k, None] + hours[None, k, :]
+            shorter = via < hours
+            hours = np.where(shorter, via, hours)
+            miles = np.where(shorter, miles[:, k, None] + miles[None, k, :], miles)
+        
+        ports = len(self.port_names)
+        return miles[:ports, :ports], hours[:ports, :ports]
+    
+    def load_or_build(self):
+        """Port matrices from the cache file when it matches this graph, else computed and saved"""
+        fingerprint = self.get_fingerprint()
+        if self.cache_path and os.path.exists(self.cache_path):
+            try:
+                with np.load(self.cache_path, allow_pickle=False) as cached:
+                    if str(cached['fingerprint']) == fingerprint and list(cached['ports']) == self.port_names:
+                        return cached['distances'], cached['transit_hours']
+            except (OSError, KeyError, ValueError):
+                pass
+        
+        distances, transit_hours = self.build_matrices()
+        if self.cache_path:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            staging = f"{self.cache_path}.{uuid.uuid4().hex}.tmp"
+            with open(staging, "wb") as f:
+                np.savez(f, fingerprint=fingerprint, ports=np.array(self.port_names), distances=distances, transit_hours=transit_hours)
+            os.replace(staging, self.cache_path)
+        return distances, transit_hours
+    
+    def get_distance(self, origin, destination):
+        """Sea distance in nautical miles between two ports"""
+        return float(self.distances[self.port_index[origin], self.port_index[destination]])
+    
+    def get_transit_hours(self, origin, destination):
+        """Typical transit time in hours between two ports, canal transits included"""
+        return float(self.transit_hours[self.port_index[origin], self.port_index[destination]])
+    
+    def get_distance_table(self):
+        return pd.DataFrame(self.distances, index=self.port_names, columns=self.port_names)
+    
+    def get_nearest_ports(self, lat, lon):
+        """Index of the closest port for each position"""
+        port_lat = self.node_lat[:len(self.port_names)]
+        port_lon = self.node_lon[:len(self.port_names)]
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        return self.port_system.great_circle_nm(lat[:, None], lon[:, None], port_lat[None, :], port_lon[None, :]).argmin(axis=1)
+    
+    def estimate_remaining_nm(self, lat, lon, destinations):
+        """Sea distance still to go, from the route via the nearest port less the part already sailed"""
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        destination = np.array([self.port_index.get(name, -1) for name in destinations])
+        known = destination >= 0
+        
+        port_lat = self.node_lat[:len(self.port_names)]
+        port_lon = self.node_lon[:len(self.port_names)]
+        direct = np.full(len(lat), np.nan)
+        direct[known] = self.port_system.great_circle_nm(lat[known], lon[known], port_lat[destination[known]], port_lon[destination[known]])
+        
+        nearest = self.get_nearest_ports(lat[known], lon[known])
+        sailed = self.port_system.great_circle_nm(lat[known], lon[known], port_lat[nearest], port_lon[nearest])
+        remaining = direct.copy()
+        remaining[known] = np.maximum(direct[known], self.distances[nearest, destination[known]] - sailed)
+        return remaining
+    
+    def get_alternatives(self, port_name, limit=3):
+        """Closest other ports by sea, with distance and transit time"""
+        row = self.port_index[port_name]
+        order = [i for i in np.argsort(self.distances[row], kind='stable') if i != row and np.isfinite(self.distances[row, i])]
+        return pd.DataFrame({
+            'Port': [self.port_names[i] for i in order[:limit]],
+            'Distance_nm': self.distances[row, order[:limit]].round(0),
+            'Transit_h': self.transit_hours[row, order[:limit]].round(1)
+        })
+
+class SeaRouter:
+    """A* over the sea route graph, with an LRU cache of routes densified for drawing and placement"""
+    
+    def __init__(self, network, max_cached=4096, step_nm=60.0):
+        self.network = network
+        self.step_nm = step_nm
+        self.max_cached = max_cached
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        
+        # Adjacency lists of (neighbour, hours, nautical miles), both directions
+        edges = network.edges
+        edge_hours = edges['nm'] / network.TRANSIT_SPEED_KN + edges['delay_h']
+        self.neighbours = [[] for _ in network.node_names]
+        for a, b, hours, miles in zip(edges['a'], edges['b'], edge_hours, edges['nm']):
+            self.neighbours[a].append((b, hours, miles))
+            self.neighbours[b].append((a, hours, miles))
+    
+    def heuristic_hours(self, node, goal):
+        # Straight-line sailing time never overestimates the remaining route time
+        return self.network.port_system.great_circle_nm(
+            self.network.node_lat[node], self.network.node_lon[node],
+            self.network.node_lat[goal], self.network.node_lon[goal]
+        ) / self.network.TRANSIT_SPEED_KN
+    
+    def find_path(self, start, goal):
+        """Fastest node sequence between two graph nodes, or None when they are not connected"""
+        best = {start: 0.0}
+        previous = {}
+        frontier = [(self.heuristic_hours(start, goal), 0.0, start)]
+        while frontier:
+            _, hours, node = heapq.heappop(frontier)
+            if node == goal:
+                path = [node]
+                while path[-1] in previous:
+                    path.append(previous[path[-1]])
+                return path[::-1]
+            if hours > best.get(node, np.inf):
+                continue
+            for neighbour, edge_hours, _ in self.neighbours[node]:
+                candidate = hours + edge_hours
+                if candidate < best.get(neighbour, np.inf):
+                    best[neighbour] = candidate
+                    previous[neighbour] = node
+                    heapq.heappush(frontier, (candidate + self.heuristic_hours(neighbour, goal), candidate, neighbour))
+        return None
+    
+    def densify(self, nodes):
+        """Great-circle points along each leg, about step_nm apart"""
+        lat = np.radians(self.network.node_lat[nodes])
+        lon = np.radians(self.network.node_lon[nodes])
+        points_lat, points_lon = [lat[:1]], [lon[:1]]
+        for i in range(len(nodes) - 1):
+            # Spherical interpolation between unit vectors
+            a = np.array([np.cos(lat[i]) * np.cos(lon[i]), np.cos(lat[i]) * np.sin(lon[i]), np.sin(lat[i])])
+            b = np.array([np.cos(lat[i + 1]) * np.cos(lon[i + 1]), np.cos(lat[i + 1]) * np.sin(lon[i + 1]), np.sin(lat[i + 1])])
+            angle = np.arccos(np.clip(a @ b, -1, 1))
+            steps = max(1, int(np.ceil(angle * 3440.065 / self.step_nm)))
+            f = np.arange(1, steps + 1)[:, None] / steps
+            if angle < 1e-9:
+                xyz = np.repeat(b[None, :], steps, axis=0)
+            else:
+                xyz = (np.sin((1 - f) * angle) * a + np.sin(f * angle) * b) / np.sin(angle)
+            points_lat.append(np.arcsin(np.clip(xyz[:, 2], -1, 1)))
+            points_lon.append(np.arctan2(xyz[:, 1], xyz[:, 0]))
+        return np.degrees(np.concatenate(points_lat)), np.degrees(np.concatenate(points_lon))
+    
+    def get_route(self, origin, destination):
+        """Route between two ports: node names, densified (lat, lon), cumulative miles and total hours"""
+        key = (origin, destination)
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key]
+        
+        network = self.network
+        nodes = self.find_path(network.node_index[origin], network.node_index[destination])
+        if nodes is None:
+            route = None
+        else:
+            lat, lon = self.densify(nodes)
+            legs = network.port_system.great_circle_nm(lat[:-1], lon[:-1], lat[1:], lon[1:])
+            route = {
+                'nodes': [network.node_names[node] for node in nodes],
+                'lat': lat,
+                'lon': lon,
+                'lon_unwrapped': np.degrees(np.unwrap(np.radians(lon))),
+                'cumulative_nm': np.concatenate([[0.0], np.cumsum(legs)]),
+                'nm': float(legs.sum()),
+                'hours': float(network.transit_hours[network.port_index[origin], network.port_index[destination]])
+            }
+        
+        with self.lock:
+            self.misses += 1
+            self.cache[key] = route
+            while len(self.cache) > self.max_cached:
+                self.cache.popitem(last=False)
+        return route
+    
+    def positions_along(self, route, progress):
+        """(lat, lon, course) at fractions of the way along a route"""
+        distance = np.clip(progress, 0, 1) * route['nm']
+        cumulative = route['cumulative_nm']
+        lon_unwrapped = route['lon_unwrapped']
+        lat = np.interp(distance, cumulative, route['lat'])
+        lon = (np.interp(distance, cumulative, lon_unwrapped) + 180) % 360 - 180
+        
+        # Course of the leg each position is on
+        leg = np.clip(np.searchsorted(cumulative, distance, side='right') - 1, 0, len(cumulative) - 2)
+        lat1, lat2 = np.radians(route['lat'][leg]), np.radians(route['lat'][leg + 1])
+        dlon = np.radians(lon_unwrapped[leg + 1] - lon_unwrapped[leg])
+        course = np.degrees(np.arctan2(
+            np.sin(dlon) * np.cos(lat2),
+            np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+        )) % 360
+        return lat, lon, course
+    
+    def get_stats(self):
+        with self.lock:
+            return {'cached_routes': len(self.cache), 'hits': self.hits, 'misses': self.misses}
+
+# =============================================================================
+# VOYAGE SIMULATION
+# =============================================================================
+
+class VoyageSimulator:
+    """Moves simulated vessels through their port calls: sail the sea route, anchor, berth and depart"""
+    
+    # Routed voyages end at anchor this far from the port; the move alongside is made at harbor speed
+    ANCHOR_NM = 5.0
+    HARBOR_SPEED_KN = 6.0
+    
+    # Mean hours waiting at anchor and alongside (exponential, so a wait can be drawn at any time)
+    ANCHOR_HOURS = 4.0
+    BERTH_HOURS = 12.0
+    
+    # A vessel's spread across the lane narrows over the last miles, so arrivals end on the route
+    LANE_TAPER_NM = 30.0
+    
+    BERTH_STATUSES = ["Moored", "Docked", "Berthed"]
+    
+    def __init__(self, port_system, router, seed=None):
+        self.port_system = port_system
+        self.router = router
+        self.port_names = list(port_system.ports.keys())
+        self.port_lookup = pd.Index(self.port_names)
+        self.port_lat = np.array([port_system.ports[name]['lat'] for name in self.port_names])
+        self.port_lon = np.array([port_system.ports[name]['lon'] for name in self.port_names])
+        
+        # Next port after a call: any other port reachable by sea, weighted by traffic volume
+        volume = np.array([
+            port_system.volume_multiplier.get(port_system.ports[name].get('volume', 'Medium'), 1.0) for name in self.port_names
+        ])
+        reachable = np.isfinite(router.network.distances) & ~np.eye(len(self.port_names), dtype=bool)
+        weights = reachable * volume[None, :]
+        self.can_depart = weights.sum(axis=1) > 0
+        self.next_port_weights = weights / np.maximum(weights.sum(axis=1, keepdims=True), 1e-12)
+        
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.Lock()
+    
+    def step(self, frame, when, hours):
+        """The fleet `hours` later, as a new frame with updated positions, Status, Speed and Port"""
+        n = len(frame)
+        status = frame['Status'].to_numpy(dtype=object).copy()
+        speed = frame['Speed'].to_numpy(dtype=float).copy()
+        lat = frame['Latitude'].to_numpy(dtype=float).copy()
+        lon = frame['Longitude'].to_numpy(dtype=float).copy()
+        course = frame['Course'].fillna(0).to_numpy(dtype=float, copy=True) if 'Course' in frame else np.zeros(n)
+        port = self.port_lookup.get_indexer(frame['Port'])
+        origin = self.port_lookup.get_indexer(frame['Origin']) if 'Origin' in frame else np.full(n, -1)
+        progress = frame['Route_Progress'].to_numpy(dtype=float).copy() if 'Route_Progress' in frame else np.full(n, np.nan)
+        phase_ends = frame['Phase_Ends'].to_numpy(dtype=float).copy() if 'Phase_Ends' in frame else np.full(n, np.nan)
+        now = when.timestamp()
+        
+        with self.lock:
+            # Vessels first seen waiting get their remaining wait; waiting vessels don't make way
+            waiting = (status == "Anchored") | np.isin(status, self.BERTH_STATUSES)
+            unset = np.isnan(phase_ends)
+            self.start_wait(phase_ends, np.flatnonzero(unset & (status == "Anchored")), now, self.ANCHOR_HOURS)
+            self.start_wait(phase_ends, np.flatnonzero(unset & np.isin(status, self.BERTH_STATUSES)), now, self.BERTH_HOURS)
+            speed[waiting] = 0
+            
+            routed = (status == "Underway") & (port >= 0) & (origin >= 0) & ~np.isnan(progress)
+            self.sail_routes(np.flatnonzero(routed), hours, now, status, speed, lat, lon, course, port, origin, progress, phase_ends)
+            
+            direct = (status == "Underway") & (port >= 0) & (origin < 0)
+            self.sail_direct(np.flatnonzero(direct), hours, now, status, speed, lat, lon, course, port, phase_ends)
+            
+            # The wait at anchor ends with the move alongside
+            berthing = np.flatnonzero((status == "Anchored") & (port >= 0) & (phase_ends <= now))
+            status[berthing] = "Underway"
+            speed[berthing] = self.HARBOR_SPEED_KN
+            phase_ends[berthing] = np.nan
+            course[berthing] = self.bearing(lat[berthing], lon[berthing], self.port_lat[port[berthing]], self.port_lon[port[berthing]])
+            
+            # The stay alongside ends with departure on the sea route to the next port
+            leaving = np.flatnonzero(np.isin(status, self.BERTH_STATUSES) & (port >= 0) & (phase_ends <= now))
+            leaving = leaving[self.can_depart[port[leaving]]]
+            origin[leaving] = port[leaving]
+            port[leaving] = self.choose_next_ports(port[leaving])
+            progress[leaving] = 0.0
+            status[leaving] = "Underway"
+            speed[leaving] = self.rng.integers(10, 22, size=len(leaving))
+            phase_ends[leaving] = np.nan
+        
+        names = np.array(self.port_names, dtype=object)
+        port_names = np.where(port >= 0, names[np.maximum(port, 0)], frame['Port'].to_numpy(dtype=object))
+        frame = frame.copy()
+        frame['Latitude'] = np.round(np.clip(lat, -85, 85), 6)
+        frame['Longitude'] = np.round(lon, 6)
+        frame['Speed'] = np.round(speed).astype(int)
+        frame['Course'] = np.round(course).astype(int) % 360
+        frame['Status'] = status
+        frame['Port'] = port_names
+        frame['Destination'] = port_names
+        frame['Origin'] = np.where(origin >= 0, names[np.maximum(origin, 0)], "")
+        frame['Route_Progress'] = np.where(origin >= 0, progress, np.nan)
+        frame['Phase_Ends'] = phase_ends
+        return frame
+    
+    def start_wait(self, phase_ends, rows, now, mean_hours):
+        phase_ends[rows] = now + self.rng.exponential(mean_hours * 3600, size=len(rows))
+    
+    def bearing(self, lat, lon, target_lat, target_lon):
+        """Initial great-circle course in degrees"""
+        lat1, lat2 = np.radians(lat), np.radians(target_lat)
+        dlon = np.radians(target_lon - lon)
+        return np.degrees(np.arctan2(
+            np.sin(dlon) * np.cos(lat2),
+            np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+        )) % 360
+    
+    def sail_routes(self, rows, hours, now, status, speed, lat, lon, course, port, origin, progress, phase_ends):
+        """Advance vessels along their sea routes, anchoring the ones that reach the end"""
+        pairs = origin[rows] * len(self.port_names) + port[rows]
+        order = np.argsort(pairs, kind='stable')
+        rows, pairs = rows[order], pairs[order]
+        for group in np.split(rows, np.flatnonzero(np.diff(pairs)) + 1):
+            if not len(group):
+                continue
+            route = self.router.get_route(self.port_names[origin[group[0]]], self.port_names[port[group[0]]])
+            if route is None or route['nm'] <= self.ANCHOR_NM:
+                # Nothing to sail: head straight for the port instead
+                origin[group] = -1
+                continue
+            
+            end = 1 - self.ANCHOR_NM / route['nm']
+            old = progress[group]
+            new = np.where(old >= end, old, np.minimum(end, old + speed[group] * hours / route['nm']))
+            old_lat, old_lon, _ = self.router.positions_along(route, old)
+            new_lat, new_lon, new_course = self.router.positions_along(route, new)
+            
+            # Keep each vessel's offset from the route centerline, narrowed as the port gets close
+            taper_old = np.minimum(1.0, (1 - old) * route['nm'] / self.LANE_TAPER_NM)
+            taper_new = np.minimum(1.0, (1 - new) * route['nm'] / self.LANE_TAPER_NM)
+            keep = taper_new / np.maximum(taper_old, 1e-9)
+            lat[group] = new_lat + (lat[group] - old_lat) * keep
+            lon[group] = (new_lon + ((lon[group] - old_lon + 180) % 360 - 180) * keep + 180) % 360 - 180
+            course[group] = new_course
+            progress[group] = new
+            
+            arrived = group[new >= end]
+            status[arrived] = "Anchored"
+            speed[arrived] = 0
+            origin[arrived] = -1
+            progress[arrived] = np.nan
+            self.start_wait(phase_ends, arrived, now, self.ANCHOR_HOURS)
+    
+    def sail_direct(self, rows, hours, now, status, speed, lat, lon, course, port, phase_ends):
+        """Move vessels straight towards their port, berthing the ones that get there"""
+        target_lat, target_lon = self.port_lat[port[rows]], self.port_lon[port[rows]]
+        remaining = self.port_system.great_circle_nm(lat[rows], lon[rows], target_lat, target_lon)
+        step_nm = speed[rows] * hours
+        arrived = (step_nm >= remaining) & (speed[rows] > 0)
+        fraction = np.where(arrived, 1.0, step_nm / np.maximum(remaining, 1e-9))
+        
+        moving = rows[speed[rows] > 0]
+        course[moving] = self.bearing(lat[moving], lon[moving], self.port_lat[port[moving]], self.port_lon[port[moving]])
+        lat[rows] += (target_lat - lat[rows]) * fraction
+        lon[rows] = (lon[rows] + ((target_lon - lon[rows] + 180) % 360 - 180) * fraction + 180) % 360 - 180
+        
+        # Alongside: a spot inside the port's berth area
+        done = rows[arrived]
+        lon_scale = 1 / np.maximum(np.cos(np.radians(self.port_lat[port[done]])), 0.01)
+        lat[done] = self.port_lat[port[done]] + self.rng.uniform(-0.002, 0.002, size=len(done))
+        lon[done] = self.port_lon[port[done]] + self.rng.uniform(-0.006, 0.006, size=len(done)) * lon_scale
+        status[done] = "Berthed"
+        speed[done] = 0
+        self.start_wait(phase_ends, done, now, self.BERTH_HOURS)
+    
+    def choose_next_ports(self, ports):
+        """Next port of call for each departing vessel"""
+        choice = np.empty(len(ports), dtype=np.int64)
+        for port in np.unique(ports):
+            leaving = ports == port
+            choice[leaving] = self.rng.choice(len(self.port_names), size=int(leaving.sum()), p=self.next_port_weights[port])
+        return choice
+
+# =============================================================================
+# COLUMNAR VESSEL STORE
+# =============================================================================
+
+class FleetStore:
+    """Columnar vessel snapshot with server-side filter, sort and pagination"""
+
+    FILTER_COLUMNS = ['Port', 'Type', 'Company', 'Status']
+    SORT_COLUMNS = ['Name', 'Type', 'Company', 'Port', 'Speed', 'Status', 'Cargo_Value_M', 'Timestamp']
+
+    def __init__(self, ships, version=0):
+        if isinstance(ships, pd.DataFrame):
+            self.frame = ships.reset_index(drop=True)
+        else:
+            self.frame = pd.DataFrame(ships)
+        self.version = version
+        self.created_at = datetime.now()
+
+        # Dictionary-encode the filter columns once so every filter is an integer comparison
+        self.codes = {}
+        self.categories = {}
+        for column in self.FILTER_COLUMNS:
+            if column in self.frame:
+                categorical = pd.Categorical(self.frame[column])
+                self.codes[column] = categorical.codes
+                self.categories[column] = list(categorical.categories)
+
+        self.speed = self.frame['Speed'].to_numpy(dtype=float) if 'Speed' in self.frame else np.zeros(len(self.frame))
+        self.sort_indexes = {}
+        self.motion = {}
+
+    def __len__(self):
+        return len(self.frame)
+
+    def get_sort_index(self, column):
+        """Row order for a column, computed once per snapshot"""
+        if column not in self.sort_indexes:
+            if column in self.codes:
+                # Categories are lexically sorted, so ordering by code orders by value
+                values = self.codes[column]
+            else:
+                values = self.frame[column].to_numpy()
+            self.sort_indexes[column] = np.argsort(values, kind='stable')
+        return self.sort_indexes[column]
+
+    def filter_mask(self, port=None, ship_type=None, company=None, status=None, speed_range=None):
+        """Boolean row mask for the given filters (None means no filter)"""
+        mask = None
+        for column, wanted in (('Port', port), ('Type', ship_type), ('Company', company), ('Status', status)):
+            if not wanted or column not in self.codes:
+                continue
+            if isinstance(wanted, str):
+                wanted = [wanted]
+            lookup = {value: code for code, value in enumerate(self.categories[column])}
+            wanted_codes = [lookup[value] for value in wanted if value in lookup]
+            column_mask = np.isin(self.codes[column], wanted_codes)
+            mask = column_mask if mask is None else mask & column_mask
+
+        if speed_range is not None:
+            low, high = speed_range
+            speed_mask = (self.speed >= low) & (self.speed <= high)
+            mask = speed_mask if mask is None else mask & speed_mask
+
+        return mask
+
+    def query(self, port=None, ship_type=None, company=None, status=None, speed_range=None,
+              sort_by='Name', ascending=True, page=1, page_size=25):
+        """Return one page of vessels plus the total match count"""
+        mask = self.filter_mask(port, ship_type, company, status, speed_range)
+
+        order = self.get_sort_index(sort_by if sort_by in self.frame else self.frame.columns[0])
+        if mask is not None:
+            order = order[mask[order]]
+        if not ascending:
+            order = order[::-1]
+
+        total = len(order)
+        pages = max(1, -(-total // page_size))
+        page = min(max(1, page), pages)
+        start = (page - 1) * page_size
+
+        return {
+            'rows': self.frame.iloc[order[start:start + page_size]],
+            'total': total,
+            'page': page,
+            'pages': pages,
+            'version': self.version
+        }
+
+    def get_options(self, column):
+        """Distinct values available for a filter column"""
+        return self.categories.get(column, [])
+
+    def get_port_frame(self, port_name):
+        """All vessels currently assigned to one port"""
+        mask = self.filter_mask(port=port_name)
+        return self.frame[mask] if mask is not None else self.frame
+
+    def get_inbound_frame(self, port_name):
+        """Vessels still at sea on their way to one port"""
+        inbound = (self.frame['Destination'] == port_name).to_numpy() & (self.frame['Status'] == "Underway").to_numpy()
+        if 'Zone' in self.frame:
+            inbound &= self.frame['Zone'].to_numpy() == "At Sea"
+        return self.frame[inbound]
+
+    def get_motion(self, filtered=True):
+        """Snapshot positions plus per-vessel velocity in degrees per hour, computed once"""
+        # Tracker state when available; the raw reports otherwise (and for the simulation itself)
+        filtered = filtered and 'Filtered_Latitude' in self.frame
+        if filtered not in self.motion:
+            prefix = 'Filtered_' if filtered else ''
+            lat = self.frame[prefix + 'Latitude'].to_numpy(dtype=float)
+            lon = self.frame[prefix + 'Longitude'].to_numpy(dtype=float)
+            course = np.radians(self.frame[prefix + 'Course'].fillna(0).to_numpy(dtype=float)) if prefix + 'Course' in self.frame else np.zeros(len(self.frame))
+
+            # Only vessels reported underway move; a knot is one arc-minute of latitude per hour
+            if filtered:
+                speed = self.frame['Filtered_Speed'].to_numpy(dtype=float)
+            else:
+                speed = np.where(self.frame['Status'].to_numpy() == 'Underway', self.speed, 0.0) if 'Status' in self.frame else self.speed
+            dlat = speed * np.cos(course) / 60
+            dlon = speed * np.sin(course) / (60 * np.maximum(np.cos(np.radians(lat)), 0.01))
+
+            self.motion[filtered] = {'lat': lat, 'lon': lon, 'dlat': dlat, 'dlon': dlon, 'moving': speed > 0}
+        return self.motion[filtered]
+
+    def apply_tracking(self, filtered_df):
+        """Attach tracker output (Filtered_* columns, aligned to the frame's rows)"""
+        for column in filtered_df.columns:
+            self.frame[column] = filtered_df[column].to_numpy()
+        self.motion = {}
+
+    def positions_at(self, ships_df, when, filtered=True):
+        """Dead-reckoned (lat, lon) of the given snapshot rows at time `when`"""
+        motion = self.get_motion(filtered)
+        rows = ships_df.index.to_numpy()
+        hours = max(0.0, (when - self.created_at).total_seconds() / 3600)
+
+        lat = np.clip(motion['lat'][rows] + motion['dlat'][rows] * hours, -85, 85)
+        lon = (motion['lon'][rows] + motion['dlon'][rows] * hours + 180) % 360 - 180
+        return lat, lon
+
+    def advance(self, when, version, voyages=None, course_jitter=5.0):
+        """Next snapshot of the same vessels at `when`, moved on by the voyage simulation or else dead-reckoned"""
+        if voyages is not None:
+            frame = voyages.step(self.frame, when, max(0.0, (when - self.created_at).total_seconds() / 3600))
+        else:
+            lat, lon = self.positions_at(self.frame, when, filtered=False)
+            motion = self.get_motion(filtered=False)
+
+            frame = self.frame.copy()
+            frame['Latitude'] = np.round(lat, 6)
+            frame['Longitude'] = np.round(lon, 6)
+            if 'Course' in frame:
+                jitter = np.where(motion['moving'], np.random.normal(0, course_jitter, len(frame)), 0)
+                frame['Course'] = ((frame['Course'].fillna(0).to_numpy(dtype=float) + jitter) % 360).round().astype(int)
+        frame['Timestamp'] = when.strftime('%H:%M:%S')
+
+        advanced = FleetStore(frame, version)
+        advanced.created_at = when
+        return advanced
+
 # =============================================================================
 # USER AUTHENTICATION SYSTEM
 # =============================================================================
@@ -783,62 +1285,1910 @@ class AuthSystem:
                 return True
         return False
     
-    def get_user_role(self, username):
-        return self.users.get(username, {}).get("role", "user")
-
-# =============================================================================
-# BUSINESS INTELLIGENCE ANALYTICS
-# =============================================================================
-
-class BusinessIntelligence:
-    def __init__(self):
-        pass
+    def get_user_role(self, username):
+        return self.users.get(username, {}).get("role", "user")
+
+# =============================================================================
+# BUSINESS INTELLIGENCE ANALYTICS
+# =============================================================================
+
+class BusinessIntelligence:
+    # Average vessels per port at which the risk level goes from LOW to MEDIUM
+    RISK_VESSELS_PER_PORT = 15
+    
+    def __init__(self):
+        pass
+    
+    def calculate_roi(self, port_efficiency_improvement):
+        """Calculate ROI for clients"""
+        base_savings = 50000  # $50K per day base
+        efficiency_savings = base_savings * port_efficiency_improvement
+        annual_savings = efficiency_savings * 365
+        
+        return {
+            'daily_savings': f"${efficiency_savings:,.0f}",
+            'annual_savings': f"${annual_savings:,.0f}",
+            'efficiency_gain': f"{port_efficiency_improvement * 100:.1f}%",
+            'payback_period': "3-6 months",
+            'roi': f"{(annual_savings / 50000) * 100:.0f}%"
+        }
+    
+    def summarize_fleet(self, fleet_store, regions, port_stats=None):
+        """Executive KPIs for every port, region and company from one pass over the columnar fleet"""
+        frame = fleet_store.frame
+        port_names = list(regions.keys())
+        companies = fleet_store.get_options('Company') or ["Unknown"]
+        
+        # Every vessel lands in one (port, company) cell; the three levels are sums over that grid
+        # Code -1 is a vessel with no port; it must not wrap around to the last port option
+        port_codes = fleet_store.codes['Port']
+        has_port = port_codes >= 0
+        port_rows = np.full(len(frame), -1)
+        port_rows[has_port] = pd.Index(port_names).get_indexer(fleet_store.get_options('Port'))[port_codes[has_port]]
+        company_rows = fleet_store.codes['Company'] if 'Company' in fleet_store.codes else np.zeros(len(frame), dtype=int)
+        valid = (port_rows >= 0) & (company_rows >= 0)
+        cells = port_rows[valid] * len(companies) + company_rows[valid]
+        
+        def grid(weights=None):
+            return np.bincount(cells, weights, minlength=len(port_names) * len(companies)).reshape(len(port_names), len(companies))
+        
+        totals = {
+            'Vessels': grid(),
+            'Underway': grid((frame['Status'].to_numpy() == 'Underway')[valid].astype(float)),
+            'Cargo_Value_M': grid(frame['Cargo_Value_M'].to_numpy(dtype=float)[valid]),
+            'Speed': grid(fleet_store.speed[valid])
+        }
+        
+        # Measured berth efficiency per port, weighted by vessels when rolled up
+        efficiency = port_stats['Efficiency'].reindex(port_names).to_numpy(dtype=float) if port_stats is not None else np.full(len(port_names), np.nan)
+        totals['Measured'] = totals['Vessels'] * ~np.isnan(efficiency)[:, None]
+        totals['Efficiency'] = totals['Vessels'] * np.nan_to_num(efficiency)[:, None]
+        
+        by_port = {name: values.sum(axis=1) for name, values in totals.items()}
+        region_names = sorted(set(regions.values()))
+        in_region = (pd.Index(region_names).get_indexer(list(regions.values()))[None, :] == np.arange(len(region_names))[:, None]).astype(float)
+        return {
+            'Port': self.build_kpi_table(port_names, by_port, np.ones(len(port_names))),
+            'Region': self.build_kpi_table(region_names, {name: in_region @ values for name, values in by_port.items()}, in_region @ (by_port['Vessels'] > 0)),
+            'Company': self.build_kpi_table(companies, {name: values.sum(axis=0) for name, values in totals.items()}, (totals['Vessels'] > 0).sum(axis=0)),
+            'version': fleet_store.version
+        }
+    
+    def build_kpi_table(self, names, totals, ports):
+        """One KPI row per group from its summed totals and the number of ports it has vessels at"""
+        vessels = totals['Vessels']
+        measured = totals['Measured']
+        return pd.DataFrame({
+            'Vessels': vessels.astype(int),
+            'Underway': totals['Underway'].astype(int),
+            'Cargo_Value_M': totals['Cargo_Value_M'].round(1),
+            'Avg_Cargo_Value_M': (totals['Cargo_Value_M'] / np.maximum(vessels, 1)).round(1),
+            'Avg_Speed': (totals['Speed'] / np.maximum(vessels, 1)).round(1),
+            'Efficiency': np.where(measured > 0, totals['Efficiency'] / np.where(measured > 0, measured, 1), np.nan).round(1),
+            'Ports': ports.astype(int),
+            # Busy ports carry more risk; groups are judged on their average vessels per port
+            'Risk_Level': np.where(vessels / np.maximum(ports, 1) < self.RISK_VESSELS_PER_PORT, "LOW", "MEDIUM")
+        }, index=pd.Index(names, name='Name'))
+    
+    def generate_executive_summary(self, port_name, fleet_summary):
+        """Generate executive-level business summary for one port from the fleet summary"""
+        ports = fleet_summary['Port']
+        if port_name in ports.index:
+            kpis = ports.loc[port_name]
+        else:
+            kpis = {'Vessels': 0, 'Cargo_Value_M': 0.0, 'Avg_Cargo_Value_M': 0.0, 'Efficiency': np.nan, 'Risk_Level': "LOW"}
+        
+        return {
+            'total_vessels': int(kpis['Vessels']),
+            'total_cargo_value': f"${kpis['Cargo_Value_M']:,.0f}M",
+            'average_ship_value': f"${kpis['Avg_Cargo_Value_M']:,.1f}M",
+            'port_efficiency': "—" if pd.isna(kpis['Efficiency']) else f"{kpis['Efficiency']:.1f}%",
+            'risk_level': kpis['Risk_Level'],
+            'recommendations': [
+                "Optimize berth allocation for faster turnaround",
+                "Implement predictive arrival system",
+                "Increase monitoring during peak hours"
+            ]
+        }
+
+# =============================================================================
+# VERSIONED RENDER CACHE
+# =============================================================================
+
+class RenderCache:
+    """Bounded LRU cache of anything a view builds from a snapshot (figures, WebGL payloads, playback bins)"""
+    
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    def make_key(self, view, port, version, options):
+        """(view, port, snapshot version, options)"""
+        return (view, port, version, tuple(sorted(options.items())))
+    
+    def get(self, view, port, version, build, **options):
+        """Memoized value; `build` is only called when the key is not cached"""
+        key = self.make_key(view, port, version, options)
+        
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        
+        # Build outside the lock; concurrent misses on one key just build it twice
+        value = build()
+        
+        with self.lock:
+            self.entries[key] = value
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        
+        return value
+    
+    def get_stats(self):
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+# =============================================================================
+# WEBGL FLEET MAP
+# =============================================================================
+
+class WebGLFleetMap:
+    """deck.gl vessel layer fed with compact typed columns instead of per-point JSON"""
+    
+    SHIP_TYPE_COLORS = {
+        'Container': '#FF6B6B',
+        'Tanker': '#4ECDC4',
+        'Bulk Carrier': '#45B7D1',
+        'Cargo': '#96CEB4',
+        'Ro-Ro': '#FFEAA7',
+        'Vehicle Carrier': '#DDA0DD',
+        'General Cargo': '#98D8C8'
+    }
+    
+    def __init__(self):
+        pass
+    
+    def build_payload(self, ships_df, version):
+        """Pack positions, headings, type codes and speeds into one column-major buffer"""
+        type_names = list(self.SHIP_TYPE_COLORS.keys())
+        type_codes = pd.Categorical(ships_df['Type'], categories=type_names).codes
+        headings = ships_df['Course'].fillna(0) if 'Course' in ships_df else pd.Series(0, index=ships_df.index)
+        prefix = 'Filtered_' if 'Filtered_Latitude' in ships_df else ''  # tracker state when available
+        
+        # Widest columns first so every typed-array view stays aligned in the browser
+        fleet = b"".join([
+            ships_df[prefix + 'Longitude'].to_numpy(dtype=np.float32).tobytes(),
+            ships_df[prefix + 'Latitude'].to_numpy(dtype=np.float32).tobytes(),
+            headings.to_numpy(dtype=np.uint16).tobytes(),
+            np.where(type_codes < 0, len(type_names), type_codes).astype(np.uint8).tobytes(),
+            ships_df['Speed'].clip(0, 255).to_numpy(dtype=np.uint8).tobytes()
+        ])
+        
+        return {
+            'fleet': fleet,
+            'count': len(ships_df),
+            'version': version,
+            'type_names': type_names + ['Other'],
+            'type_colors': list(self.SHIP_TYPE_COLORS.values()) + ['#C8C8C8']
+        }
+    
+    def build_delta(self, rows, lat, lon):
+        """Pack moved vessels as row index uint32[m] | lon float32[m] | lat float32[m]"""
+        return b"".join([
+            rows.astype(np.uint32).tobytes(),
+            lon.astype(np.float32).tobytes(),
+            lat.astype(np.float32).tobytes()
+        ])
+    
+    def render(self, payload, key, center, zoom, height=600, delta=None, live=False):
+        """Draw the map and return the row index of the vessel the user clicked, if any"""
+        # In live mode the base buffer is only sent until the browser confirms it holds it
+        state = st.session_state.get(key) or {}
+        send_base = not live or state.get('base') != payload['version']
+        
+        result = scene_component(
+            scene="fleet_map",
+            center=center,
+            zoom=zoom,
+            height=height,
+            delta=delta,
+            key=key,
+            default=None,
+            **(payload if send_base else {name: value for name, value in payload.items() if name != 'fleet'})
+        )
+        
+        # Clicks made against an older snapshot point at different rows
+        if not result or result.get('version') != payload['version']:
+            return None
+        selected = result.get('selected')
+        if selected is None or not 0 <= selected < payload['count']:
+            return None
+        return int(selected)
+
+# =============================================================================
+# BACKGROUND DATA REFRESH
+# =============================================================================
+
+class DataRefreshScheduler:
+    """Refreshes data sources in worker threads and publishes immutable, versioned snapshots"""
+    
+    def __init__(self):
+        self.sources = {}
+        self.snapshots = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+    
+    def add_source(self, name, fetch, interval, idle_timeout=None, on_retire=None):
+        """Register a source and start its worker; registering an existing name is a no-op"""
+        with self.lock:
+            if name in self.sources:
+                return
+            source = {
+                'fetch': fetch,
+                'interval': interval,
+                'idle_timeout': idle_timeout,
+                'on_retire': on_retire,
+                'last_read': time.time(),
+                'last_error': None,
+                'wake': threading.Event(),
+                'ready': threading.Event()
+            }
+            self.sources[name] = source
+        
+        threading.Thread(target=self.run_source, args=(name, source), name=f"refresh-{name}", daemon=True).start()
+    
+    def has_source(self, name):
+        return name in self.sources
+    
+    def run_source(self, name, source):
+        """Worker loop: fetch, publish, sleep until the interval passes or a refresh is requested"""
+        while not self.stop_event.is_set():
+            # Sources nobody reads any more (e.g. an abandoned fleet scale) shut down
+            if source['idle_timeout'] and time.time() - source['last_read'] > source['idle_timeout']:
+                # Under the lock, so a new source of the same name can't start before its state is gone
+                with self.lock:
+                    self.sources.pop(name, None)
+                    self.snapshots.pop(name, None)
+                    if source['on_retire'] is not None:
+                        source['on_retire'](name)
+                return
+            
+            self.refresh(name, source)
+            source['wake'].wait(source['interval'])
+            source['wake'].clear()
+    
+    def refresh(self, name, source):
+        """Run one fetch in the worker thread and publish the result"""
+        try:
+            data = source['fetch']()
+        except Exception as e:
+            # Readers waiting on the first snapshot are released and see the error
+            source['last_error'] = str(e)
+            source['ready'].set()
+            return
+        
+        source['last_error'] = None
+        self.publish(name, data)
+        source['ready'].set()
+    
+    def publish(self, name, data):
+        """Swap in a new snapshot; readers holding the previous one are unaffected"""
+        with self.lock:
+            previous = self.snapshots.get(name)
+            self.snapshots[name] = {
+                'data': data,
+                'version': previous['version'] + 1 if previous else 1,
+                'updated_at': datetime.now()
+            }
+    
+    def peek(self, name):
+        """Latest snapshot without counting as a read (used by the workers themselves)"""
+        return self.snapshots.get(name)
+    
+    def get_latest(self, name, timeout=None):
+        """Latest snapshot for a source, waiting only if nothing has been published yet"""
+        source = self.sources.get(name)
+        if source is None:
+            return self.snapshots.get(name)
+        
+        source['last_read'] = time.time()
+        if not source['ready'].is_set() and not source['ready'].wait(timeout):
+            return None
+        return self.snapshots.get(name)
+    
+    def get_error(self, name):
+        """Error from a source's last fetch, or None if it succeeded"""
+        source = self.sources.get(name)
+        return source['last_error'] if source is not None else None
+    
+    def request_refresh(self, name):
+        """Wake a source's worker early without waiting for the result"""
+        source = self.sources.get(name)
+        if source is not None:
+            source['wake'].set()
+    
+    def get_status(self):
+        """Version, age and last error per source"""
+        now = datetime.now()
+        status = []
+        for name, source in list(self.sources.items()):
+            snapshot = self.snapshots.get(name)
+            status.append({
+                'source': name,
+                'version': snapshot['version'] if snapshot else 0,
+                'age_s': (now - snapshot['updated_at']).total_seconds() if snapshot else None,
+                'interval_s': source['interval'],
+                'error': source['last_error']
+            })
+        return status
+    
+    def stop(self):
+        self.stop_event.set()
+        for source in list(self.sources.values()):
+            source['wake'].set()
+
+# =============================================================================
+# VESSEL STATE TRACKING
+# =============================================================================
+
+def require_unique_ids(mmsi, rows):
+    """Reject a batch that reports one vessel ID twice, given each ID's state row (-1 when not seen before)"""
+    # Per-vessel state would merge the two vessels into one; known IDs are checked by row, as integers
+    known = rows[rows >= 0]
+    if (len(known) and np.bincount(known).max() > 1) or pd.Index(mmsi[rows < 0]).has_duplicates:
+        index = pd.Index(mmsi)
+        raise ValueError(f"Vessel IDs appear more than once in one batch, e.g. {index[index.duplicated()][0]}")
+
+class VesselTracker:
+    """Constant-velocity Kalman filter for every vessel, updated as one NumPy batch per report"""
+    
+    METERS_PER_DEGREE = 111_320
+    KNOT = 0.514444  # m/s
+    
+    def __init__(self, acceleration_noise=0.01, measurement_noise_m=15.0, initial_speed_sd=2.0):
+        self.q = acceleration_noise ** 2
+        self.r = measurement_noise_m ** 2
+        self.initial_velocity_var = initial_speed_sd ** 2
+        
+        # Per vessel: local east/north position (m) around a reference fix, velocity (m/s),
+        # and one 2x2 covariance [[p00, p01], [p01, p11]] shared by both axes
+        self.index = pd.Index([], dtype=object)
+        self.ref_lat = np.empty(0)
+        self.ref_lon = np.empty(0)
+        self.position = np.empty((0, 2))
+        self.velocity = np.empty((0, 2))
+        self.covariance = np.empty((0, 3))
+        self.updated = np.empty(0)
+        self.innovation_m = np.empty(0)
+        self.lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.index)
+    
+    def to_local(self, rows, lat, lon):
+        east = ((lon - self.ref_lon[rows] + 180) % 360 - 180) * np.cos(np.radians(self.ref_lat[rows])) * self.METERS_PER_DEGREE
+        north = (lat - self.ref_lat[rows]) * self.METERS_PER_DEGREE
+        return np.column_stack([east, north])
+    
+    def to_geo(self, rows, position):
+        lat = self.ref_lat[rows] + position[:, 1] / self.METERS_PER_DEGREE
+        lon = self.ref_lon[rows] + position[:, 0] / (np.maximum(np.cos(np.radians(self.ref_lat[rows])), 0.01) * self.METERS_PER_DEGREE)
+        return lat, (lon + 180) % 360 - 180
+    
+    def add_vessels(self, mmsi, lat, lon, velocity, when):
+        """Start tracks at the first fix, with the reported speed and course as the velocity guess"""
+        count = len(mmsi)
+        self.index = self.index.append(pd.Index(mmsi, dtype=object))
+        self.ref_lat = np.concatenate([self.ref_lat, lat])
+        self.ref_lon = np.concatenate([self.ref_lon, lon])
+        self.position = np.concatenate([self.position, np.zeros((count, 2))])
+        self.velocity = np.concatenate([self.velocity, velocity])
+        self.covariance = np.concatenate([self.covariance, np.tile([self.r, 0.0, self.initial_velocity_var], (count, 1))])
+        self.updated = np.concatenate([self.updated, np.full(count, when)])
+        self.innovation_m = np.concatenate([self.innovation_m, np.zeros(count)])
+    
+    def update(self, mmsi, lat, lon, when, speed_kn=None, course_deg=None):
+        """Predict every reporting vessel to `when`, correct with its report, return filtered state"""
+        mmsi = np.asarray(mmsi).astype(str)
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        now = when.timestamp()
+        
+        speed = np.zeros(len(mmsi)) if speed_kn is None else np.asarray(speed_kn, dtype=float) * self.KNOT
+        course = np.zeros(len(mmsi)) if course_deg is None else np.radians(np.asarray(course_deg, dtype=float))
+        
+        with self.lock:
+            rows = self.index.get_indexer(mmsi) if len(self.index) else np.full(len(mmsi), -1)
+            require_unique_ids(mmsi, rows)
+            new = rows < 0
+            if new.any():
+                first = np.flatnonzero(new)
+                velocity = np.column_stack([speed[first] * np.sin(course[first]), speed[first] * np.cos(course[first])])
+                self.add_vessels(mmsi[first], lat[first], lon[first], velocity, now)
+                rows = self.index.get_indexer(mmsi)
+            
+            tracked = rows[~new]
+            if len(tracked):
+                self.step(tracked, self.to_local(tracked, lat[~new], lon[~new]), now)
+            
+            return self.get_state(rows)
+    
+    def step(self, rows, measured, now):
+        """One predict + correct cycle for the given rows, all in array form"""
+        dt = np.maximum(now - self.updated[rows], 0.0)
+        p00, p01, p11 = self.covariance[rows].T
+        
+        # Predict: x += v dt, P = F P F' + Q (white-noise acceleration)
+        position = self.position[rows] + self.velocity[rows] * dt[:, None]
+        p00 = p00 + 2 * dt * p01 + dt * dt * p11 + self.q * dt ** 3 / 3
+        p01 = p01 + dt * p11 + self.q * dt ** 2 / 2
+        p11 = p11 + self.q * dt
+        
+        # Correct with the reported position
+        innovation = measured - position
+        gain_position = p00 / (p00 + self.r)
+        gain_velocity = p01 / (p00 + self.r)
+        
+        self.position[rows] = position + gain_position[:, None] * innovation
+        self.velocity[rows] = self.velocity[rows] + gain_velocity[:, None] * innovation
+        self.covariance[rows] = np.column_stack([
+            (1 - gain_position) * p00,
+            (1 - gain_position) * p01,
+            p11 - gain_velocity * p01
+        ])
+        self.updated[rows] = now
+        self.innovation_m[rows] = np.hypot(innovation[:, 0], innovation[:, 1])
+    
+    def get_state(self, rows):
+        """Filtered position, speed over ground and course for the given rows"""
+        lat, lon = self.to_geo(rows, self.position[rows])
+        velocity = self.velocity[rows]
+        return pd.DataFrame({
+            'Filtered_Latitude': np.round(lat, 6),
+            'Filtered_Longitude': np.round(lon, 6),
+            'Filtered_Speed': np.round(np.hypot(velocity[:, 0], velocity[:, 1]) / self.KNOT, 1),
+            'Filtered_Course': np.round(np.degrees(np.arctan2(velocity[:, 0], velocity[:, 1])) % 360, 1)
+        })
+
+# =============================================================================
+# GEOFENCING
+# =============================================================================
+
+class GeofenceEngine:
+    """Vectorized point-in-polygon over every port zone, emitting enter/exit events per batch"""
+    
+    # Most specific zone wins when zones overlap
+    ZONE_KINDS = ['anchorage', 'port', 'berth']
+    ZONE_LABELS = {'anchorage': "Anchorage", 'port': "Port", 'berth': "Berth"}
+    CELL_DEGREES = 1.0
+    MAX_RECENT_EVENTS = 5000
+    
+    def __init__(self, ports):
+        self.port_names = list(ports.keys())
+        zone_port, zone_kind, polygons = [], [], []
+        for port_name, port in ports.items():
+            for kind, polygon in port.get('zones', {}).items():
+                zone_port.append(port_name)
+                zone_kind.append(kind)
+                polygons.append(np.asarray(polygon, dtype=float))
+        
+        self.zone_port = np.array(zone_port, dtype=object)
+        self.zone_port_index = np.array([self.port_names.index(name) for name in zone_port], dtype=np.int64)
+        self.zone_kind = np.array(zone_kind, dtype=object)
+        self.zone_rank = np.array([self.ZONE_KINDS.index(kind) for kind in zone_kind])
+        
+        # Closed rings padded to one length; repeated vertices are zero-length edges that never cross
+        vertices = max(len(polygon) for polygon in polygons) + 1 if polygons else 1
+        self.ring_x = np.empty((len(polygons), vertices))
+        self.ring_y = np.empty((len(polygons), vertices))
+        for i, polygon in enumerate(polygons):
+            ring = np.vstack([polygon, polygon[:1]])
+            ring = np.vstack([ring, np.repeat(ring[-1:], vertices - len(ring), axis=0)])
+            self.ring_x[i], self.ring_y[i] = ring[:, 0], ring[:, 1]
+        self.bbox = np.column_stack([
+            self.ring_x.min(axis=1), self.ring_y.min(axis=1), self.ring_x.max(axis=1), self.ring_y.max(axis=1)
+        ]) if polygons else np.empty((0, 4))
+        
+        # Grid cell -> candidate zones, as a table sorted by cell key for searchsorted lookups
+        cell_keys, cell_zones = [], []
+        for zone, (min_x, min_y, max_x, max_y) in enumerate(self.bbox):
+            for cx in range(int(np.floor(min_x / self.CELL_DEGREES)), int(np.floor(max_x / self.CELL_DEGREES)) + 1):
+                for cy in range(int(np.floor(min_y / self.CELL_DEGREES)), int(np.floor(max_y / self.CELL_DEGREES)) + 1):
+                    cell_keys.append(self.cell_key(cx, cy))
+                    cell_zones.append(zone)
+        order = np.argsort(cell_keys, kind='stable')
+        self.cell_keys = np.asarray(cell_keys, dtype=np.int64)[order]
+        self.cell_zones = np.asarray(cell_zones, dtype=np.int64)[order]
+        
+        # Membership is kept as sorted vessel * zones + zone codes
+        self.index = pd.Index([], dtype=object)
+        self.membership = np.empty(0, dtype=np.int64)
+        self.recent = pd.DataFrame(columns=['Timestamp', 'MMSI', 'Port', 'Zone', 'Event'])
+        self.lock = threading.Lock()
+    
+    def cell_key(self, cx, cy):
+        return (np.asarray(cy, dtype=np.int64) + 90) * 400 + np.asarray(cx, dtype=np.int64) + 200
+    
+    def locate(self, lat, lon):
+        """(point, zone) pairs for every zone containing a point"""
+        keys = self.cell_key(np.floor(lon / self.CELL_DEGREES), np.floor(lat / self.CELL_DEGREES))
+        left = np.searchsorted(self.cell_keys, keys, side='left')
+        counts = np.searchsorted(self.cell_keys, keys, side='right') - left
+        
+        # Expand each point into its candidate zones from the grid table
+        point = np.repeat(np.arange(len(lat)), counts)
+        offsets = np.arange(len(point)) - np.repeat(np.cumsum(counts) - counts, counts)
+        zone = self.cell_zones[np.repeat(left, counts) + offsets]
+        
+        # Bounding-box prefilter, then even-odd crossing test against every edge at once
+        x, y = lon[point], lat[point]
+        box = self.bbox[zone]
+        inside = (x >= box[:, 0]) & (y >= box[:, 1]) & (x <= box[:, 2]) & (y <= box[:, 3])
+        point, zone, x, y = point[inside], zone[inside], x[inside, None], y[inside, None]
+        
+        x1, y1 = self.ring_x[zone, :-1], self.ring_y[zone, :-1]
+        x2, y2 = self.ring_x[zone, 1:], self.ring_y[zone, 1:]
+        straddles = (y1 > y) != (y2 > y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing_x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        inside = (straddles & (x < crossing_x)).sum(axis=1) % 2 == 1
+        return point[inside], zone[inside]
+    
+    def classify(self, lat, lon, point=None, zone=None):
+        """Most specific zone per point (-1 at sea), with the port it belongs to"""
+        if point is None:
+            point, zone = self.locate(lat, lon)
+        zones = max(len(self.zone_kind), 1)
+        best = np.full(len(lat), -1, dtype=np.int64)
+        np.maximum.at(best, point, self.zone_rank[zone] * zones + zone)
+        best_zone = np.where(best >= 0, best % zones, -1)
+        port = np.where(best_zone >= 0, self.zone_port_index[best_zone], -1)
+        return best_zone, port
+    
+    def update(self, mmsi, lat, lon, when):
+        """Zone of each vessel in the batch plus the enter/exit events since its previous report"""
+        mmsi = np.asarray(mmsi).astype(str)
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        zones = len(self.zone_kind)
+        point, zone = self.locate(lat, lon)
+        
+        # Most specific zone per vessel for display
+        best_zone, port = self.classify(lat, lon, point, zone)
+        rank = np.where(best_zone >= 0, self.zone_rank[best_zone], -1)
+        labels = np.array(["At Sea"] + [self.ZONE_LABELS[kind] for kind in self.ZONE_KINDS], dtype=object)
+        
+        with self.lock:
+            rows = self.index.get_indexer(mmsi) if len(self.index) else np.full(len(mmsi), -1)
+            require_unique_ids(mmsi, rows)
+            new = rows < 0
+            if new.any():
+                self.index = self.index.append(pd.Index(mmsi[new], dtype=object))
+                rows = self.index.get_indexer(mmsi)
+            
+            # Only vessels in this batch can change membership
+            current = np.unique(rows[point].astype(np.int64) * zones + zone)
+            in_batch = np.isin(self.membership // max(zones, 1), rows)
+            previous = self.membership[in_batch]
+            entered = np.setdiff1d(current, previous, assume_unique=True)
+            exited = np.setdiff1d(previous, current, assume_unique=True)
+            self.membership = np.union1d(self.membership[~in_batch], current)
+            
+            codes = np.concatenate([entered, exited])
+            events = pd.DataFrame({
+                'Timestamp': when,
+                'MMSI': self.index.to_numpy()[codes // max(zones, 1)],
+                'Port': self.zone_port[codes % max(zones, 1)],
+                'Zone': self.zone_kind[codes % max(zones, 1)],
+                'Event': np.repeat(['enter', 'exit'], [len(entered), len(exited)])
+            })
+            if len(events):
+                self.recent = pd.concat([self.recent, events], ignore_index=True).tail(self.MAX_RECENT_EVENTS)
+        
+        return {'zone': labels[rank + 1], 'port': port, 'events': events}
+    
+    def get_recent_events(self, port=None, limit=50):
+        """Latest enter/exit events, newest first"""
+        with self.lock:
+            events = self.recent
+        if port is not None:
+            events = events[events['Port'] == port]
+        return events.iloc[::-1].head(limit)
+
+# =============================================================================
+# PORT CALLS
+# =============================================================================
+
+class PortCallExtractor:
+    """Arrival, berthing, departure and dwell per port call, built incrementally from zone observations"""
+    
+    MAX_CALLS = 200_000
+    CALL_COLUMNS = ['MMSI', 'Port', 'Arrival', 'Berthing', 'Departure', 'Waiting_h', 'Dwell_h']
+    
+    def __init__(self, port_names):
+        self.port_names = np.array(port_names, dtype=object)
+        
+        # Open call per vessel: port index (-1 when at sea), arrival and first berthing time (epoch s)
+        self.index = pd.Index([], dtype=object)
+        self.call_port = np.empty(0, dtype=np.int64)
+        self.arrival = np.empty(0)
+        self.berthing = np.empty(0)
+        
+        self.calls = pd.DataFrame(columns=self.CALL_COLUMNS)
+        self.watermark = None
+        self.version = 0
+        self.stats = {}
+        self.lock = threading.Lock()
+    
+    def update(self, mmsi, port, at_berth, when):
+        """Advance every vessel's call state with one observation each; older batches are ignored"""
+        if self.watermark is not None and when <= self.watermark:
+            return 0
+        mmsi = np.asarray(mmsi).astype(str)
+        port = np.asarray(port, dtype=np.int64)
+        at_berth = np.asarray(at_berth, dtype=bool)
+        now = when.timestamp()
+        
+        with self.lock:
+            rows = self.index.get_indexer(mmsi) if len(self.index) else np.full(len(mmsi), -1)
+            require_unique_ids(mmsi, rows)
+            new = rows < 0
+            if new.any():
+                added = mmsi[new]
+                self.index = self.index.append(pd.Index(added, dtype=object))
+                self.call_port = np.concatenate([self.call_port, np.full(len(added), -1, dtype=np.int64)])
+                self.arrival = np.concatenate([self.arrival, np.full(len(added), np.nan)])
+                self.berthing = np.concatenate([self.berthing, np.full(len(added), np.nan)])
+                rows = self.index.get_indexer(mmsi)
+            
+            # Leaving (or switching) port closes the open call
+            current = self.call_port[rows]
+            departed = (current >= 0) & (port != current)
+            closed = rows[departed]
+            arrival = self.arrival[closed]
+            berthing = self.berthing[closed]
+            finished = pd.DataFrame({
+                'MMSI': mmsi[departed],
+                'Port': self.port_names[current[departed]],
+                'Arrival': pd.to_datetime(arrival, unit='s'),
+                'Berthing': pd.to_datetime(berthing, unit='s'),
+                'Departure': when,
+                # Calls that never berthed spent their whole stay waiting
+                'Waiting_h': np.round((np.where(np.isnan(berthing), now, berthing) - arrival) / 3600, 2),
+                'Dwell_h': np.round((now - arrival) / 3600, 2)
+            })
+            self.call_port[closed] = -1
+            
+            # Entering a port opens a call; the first observation at a berth marks berthing
+            arrived = (port >= 0) & (self.call_port[rows] < 0)
+            self.call_port[rows[arrived]] = port[arrived]
+            self.arrival[rows[arrived]] = now
+            self.berthing[rows[arrived]] = np.nan
+            berthed = (port >= 0) & at_berth & np.isnan(self.berthing[rows])
+            self.berthing[rows[berthed]] = now
+            
+            if len(finished):
+                calls = finished if self.calls.empty else pd.concat([self.calls, finished], ignore_index=True)
+                self.calls = calls.tail(self.MAX_CALLS)
+            self.watermark = when
+            self.version += 1
+        return len(finished)
+    
+    def process_history(self, history_df, geofence):
+        """Replay recorded positions newer than the watermark, one snapshot time at a time"""
+        if history_df.empty:
+            return 0
+        if self.watermark is not None:
+            history_df = history_df[history_df['Timestamp'] > pd.Timestamp(self.watermark)]
+        
+        best_zone, port = geofence.classify(history_df['Latitude'].to_numpy(dtype=float), history_df['Longitude'].to_numpy(dtype=float))
+        at_berth = (best_zone >= 0) & (geofence.zone_kind[np.maximum(best_zone, 0)] == 'berth')
+        
+        mmsi = history_df['MMSI'].astype(str).to_numpy()
+        times = history_df['Timestamp'].to_numpy()
+        order = np.argsort(times, kind='stable')
+        boundaries = np.flatnonzero(np.diff(times[order])) + 1
+        
+        completed = 0
+        for group in np.split(order, boundaries):
+            if len(group):
+                completed += self.update(mmsi[group], port[group], at_berth[group], pd.Timestamp(times[group[0]]).to_pydatetime())
+        return completed
+    
+    def get_port_stats(self):
+        """Per-port turnaround and berth efficiency from completed calls, computed once per update"""
+        with self.lock:
+            if self.version not in self.stats:
+                calls = self.calls
+                dwell = calls['Dwell_h'].to_numpy(dtype=float)
+                waiting = calls['Waiting_h'].to_numpy(dtype=float)
+                berth_share = np.where(dwell > 0, 1 - waiting / np.where(dwell > 0, dwell, 1), 0.0)
+                
+                stats = pd.DataFrame({
+                    'Port': calls['Port'],
+                    'Dwell_h': dwell,
+                    'Waiting_h': waiting,
+                    'Efficiency': berth_share * 100
+                }).groupby('Port').agg(
+                    Calls=('Dwell_h', 'size'),
+                    Avg_Turnaround_h=('Dwell_h', 'mean'),
+                    Avg_Waiting_h=('Waiting_h', 'mean'),
+                    Efficiency=('Efficiency', 'mean')
+                )
+                
+                # Ports with vessels in port but no completed call yet still get a row
+                open_calls = pd.Series(self.port_names[self.call_port[self.call_port >= 0]]).value_counts().rename('In_Port')
+                stats = stats.join(open_calls, how='outer')
+                stats[['Calls', 'In_Port']] = stats[['Calls', 'In_Port']].fillna(0).astype(int)
+                self.stats = {self.version: stats}
+            return self.stats[self.version]
+    
+    def get_port_metrics(self, port_name):
+        """Measured metrics for one port, or None before any call there has completed"""
+        stats = self.get_port_stats()
+        if port_name not in stats.index or stats.at[port_name, 'Calls'] == 0:
+            return None
+        return stats.loc[port_name].to_dict()
+
+# =============================================================================
+# BERTH QUEUE SIMULATION
+# =============================================================================
+
+class BerthQueueSimulator:
+    """Replicated first-come-first-served berth queues for every port, simulated as one array batch"""
+    
+    BERTHS_BY_VOLUME = {'Very High': 24, 'High': 16, 'Medium': 10, 'Low': 6}
+    SERVICE_HOURS = 18.0
+    SERVICE_CV = 0.5
+    ETA_CV = 0.15
+    MIN_MEASURED_CALLS = 20
+    
+    # Background traffic keeps berths this busy on average, on top of the vessels already inbound
+    BACKGROUND_UTILIZATION = 0.6
+    
+    # Very large ports are simulated on a thinned sample and scaled back, to bound the array sizes
+    MAX_MODEL_BERTHS = 32
+    MAX_MODEL_ARRIVALS = 96
+    
+    def __init__(self, port_system, replications=1000, horizon_hours=24, seed=None):
+        self.port_system = port_system
+        self.replications = replications
+        self.horizon = horizon_hours
+        self.rng = np.random.default_rng(seed)
+    
+    def build_inputs(self, ships_df, port_stats=None):
+        """Per-port berths, occupancy, anchorage queue, service time and inbound ETAs from the fleet"""
+        port_names = list(self.port_system.ports.keys())
+        ports = pd.DataFrame({
+            'lat': [self.port_system.ports[name]['lat'] for name in port_names],
+            'lon': [self.port_system.ports[name]['lon'] for name in port_names],
+            'berths': [self.BERTHS_BY_VOLUME.get(self.port_system.ports[name].get('volume'), 10) for name in port_names]
+        }, index=port_names)
+        
+        status = ships_df['Status'].to_numpy()
+        zone = ships_df['Zone'].to_numpy() if 'Zone' in ships_df else np.full(len(ships_df), "Port", dtype=object)
+        near_port = zone != "At Sea"
+        occupied = ships_df['Port'][near_port & np.isin(status, ["Berthed", "Docked", "Moored"])].value_counts()
+        waiting = ships_df['Port'][near_port & (status == "Anchored")].value_counts()
+        ports['occupied'] = occupied.reindex(port_names).fillna(0).astype(int)
+        ports['waiting'] = waiting.reindex(port_names).fillna(0).astype(int)
+        
+        # A port has at least as many berths as vessels seen alongside right now
+        ports['berths'] = np.maximum(ports['berths'], ports['occupied'])
+        
+        # Berth time from measured port calls when there are enough of them
+        ports['service_mean'] = self.SERVICE_HOURS
+        if port_stats is not None and not port_stats.empty:
+            measured = port_stats[port_stats['Calls'] >= self.MIN_MEASURED_CALLS]
+            berth_hours = (measured['Avg_Turnaround_h'] - measured['Avg_Waiting_h']).clip(lower=1.0)
+            ports.loc[berth_hours.index.intersection(ports.index), 'service_mean'] = berth_hours
+        ports['arrival_rate'] = self.BACKGROUND_UTILIZATION * ports['berths'] / ports['service_mean']
+        
+        # Vessels underway at sea towards a port arrive within the horizon at their current speed
+        speed = ships_df['Filtered_Speed' if 'Filtered_Speed' in ships_df else 'Speed'].to_numpy(dtype=float)
+        inbound = (status == "Underway") & ~near_port & (speed > 1)
+        destination = ships_df['Destination'].to_numpy()[inbound]
+        known = np.isin(destination, port_names)
+        destination = destination[known]
+        lat_col = 'Filtered_Latitude' if 'Filtered_Latitude' in ships_df else 'Latitude'
+        lon_col = 'Filtered_Longitude' if 'Filtered_Longitude' in ships_df else 'Longitude'
+        distance = self.port_system.great_circle_nm(
+            ships_df[lat_col].to_numpy()[inbound][known], ships_df[lon_col].to_numpy()[inbound][known],
+            ports.loc[destination, 'lat'].to_numpy(), ports.loc[destination, 'lon'].to_numpy()
+        )
+        eta = distance / speed[inbound][known]
+        within = eta < self.horizon
+        ports['inbound'] = pd.Series(eta[within]).groupby(destination[within]).agg(list).reindex(port_names)
+        ports['inbound'] = ports['inbound'].apply(lambda value: value if isinstance(value, list) else [])
+        return ports
+    
+    def simulate(self, ports):
+        """Run every replication of every port together and summarize queues per port"""
+        R, P, H = self.replications, len(ports), self.horizon
+        rng = self.rng
+        berths = ports['berths'].to_numpy(dtype=float)
+        occupied = ports['occupied'].to_numpy(dtype=float)
+        waiting = ports['waiting'].to_numpy(dtype=float)
+        rate = ports['arrival_rate'].to_numpy(dtype=float)
+        inbound_count = ports['inbound'].apply(len).to_numpy(dtype=float)
+        
+        # Thinning factor per port; queue lengths are scaled back up by 1 / scale
+        expected_arrivals = waiting + inbound_count + rate * H
+        scale = np.minimum(1.0, np.minimum(self.MAX_MODEL_BERTHS / np.maximum(berths, 1), self.MAX_MODEL_ARRIVALS / np.maximum(expected_arrivals, 1)))
+        model_berths = np.maximum(1, np.round(berths * scale)).astype(int)
+        model_occupied = np.minimum(np.round(occupied * scale), model_berths).astype(int)
+        
+        # Arrivals: the anchorage queue at t=0, inbound vessels at a jittered ETA, Poisson background traffic
+        queued = rng.binomial(waiting.astype(int), scale, size=(R, P))
+        queued_times = np.where(np.arange(max(queued.max(), 1)) < queued[..., None], 0.0, np.inf)
+        
+        # Thinned ports draw their inbound sample once, so the array stays MAX_MODEL_ARRIVALS wide
+        inbound = [
+            rng.choice(values, int(np.ceil(len(values) * scale[p])), replace=False) if scale[p] < 1 else values
+            for p, values in enumerate(ports['inbound'])
+        ]
+        etas = np.full((P, max(max(len(values) for values in inbound), 1)), np.inf)
+        for p, values in enumerate(inbound):
+            etas[p, :len(values)] = values
+        inbound_times = etas * rng.lognormal(0, self.ETA_CV, (R,) + etas.shape)
+        
+        background = rng.poisson(rate * scale * H, size=(R, P))
+        background_times = np.where(
+            np.arange(max(background.max(), 1)) < background[..., None],
+            rng.uniform(0, H, (R, P, max(background.max(), 1))),
+            np.inf
+        )
+        
+        arrivals = np.sort(np.concatenate([queued_times, inbound_times, background_times], axis=2), axis=2)
+        arrivals[arrivals >= H] = np.inf
+        arrivals = arrivals[..., :max(int(np.isfinite(arrivals).sum(axis=2).max()), 1)]
+        K = arrivals.shape[2]
+        
+        service_mean = ports['service_mean'].to_numpy(dtype=float)
+        sigma = np.sqrt(np.log(1 + self.SERVICE_CV ** 2))
+        mu = np.log(service_mean) - sigma ** 2 / 2
+        service = rng.lognormal(mu[None, :, None], sigma, (R, P, K))
+        
+        # Berths busy with their residual service time, idle, or padding that never frees
+        slots = np.arange(model_berths.max())
+        residual = rng.uniform(0, 1, (R, P, len(slots))) * rng.lognormal(mu[None, :, None], sigma, (R, P, len(slots)))
+        free_at = np.where(slots < model_occupied[:, None], residual, np.where(slots < model_berths[:, None], 0.0, np.inf))
+        initial_busy = np.where(slots < model_occupied[:, None], np.minimum(residual, H), 0.0).sum(axis=2)
+        
+        # Each arrival, in order, takes the berth that frees up first
+        lanes = R * P
+        free_at = free_at.reshape(lanes, -1)
+        arrivals = arrivals.reshape(lanes, K)
+        service = service.reshape(lanes, K)
+        start = np.full((lanes, K), np.inf)
+        lane = np.arange(lanes)
+        for k in range(K):
+            berth = free_at.argmin(axis=1)
+            begin = np.maximum(arrivals[:, k], free_at[lane, berth])
+            valid = np.isfinite(arrivals[:, k])
+            start[:, k] = np.where(valid, begin, np.inf)
+            free_at[lane, berth] = np.where(valid, begin + service[:, k], free_at[lane, berth])
+        
+        # Queue length per hour: +1 when a vessel arrives, -1 when it gets a berth
+        valid = np.isfinite(arrivals)
+        row = np.broadcast_to(lane[:, None], valid.shape)
+        queue = np.zeros((lanes, H + 1))
+        np.add.at(queue, (row[valid], arrivals[valid].astype(int)), 1)
+        started = valid & (start < H)
+        np.add.at(queue, (row[started], start[started].astype(int)), -1)
+        queue = np.cumsum(queue[:, :H], axis=1).reshape(R, P, H) / scale[None, :, None]
+        
+        # Load: busy berth-hours plus waiting vessel-hours, against berth capacity over the horizon
+        busy = (np.minimum(np.where(valid, start + service, 0), H) - np.minimum(np.where(valid, start, 0), H)).sum(axis=1)
+        waiting_hours = (np.minimum(np.where(valid, start, 0), H) - np.minimum(np.where(valid, arrivals, 0), H)).sum(axis=1)
+        load = (busy.reshape(R, P) + initial_busy + waiting_hours.reshape(R, P)) / (model_berths * H)
+        arrival_count = valid.sum(axis=1).reshape(R, P).sum(axis=0)
+        
+        expected_queue = queue.mean(axis=2)
+        early = queue[:, :, :max(H // 4, 1)].mean(axis=(0, 2))
+        late = queue[:, :, -max(H // 4, 1):].mean(axis=(0, 2))
+        hourly_queue = queue.mean(axis=0)
+        
+        return pd.DataFrame({
+            'congestion_level': np.clip(load.mean(axis=0), 0, 1),
+            'expected_queue': expected_queue.mean(axis=0),
+            'queue_p90': np.percentile(queue.max(axis=2), 90, axis=0),
+            'mean_wait_h': waiting_hours.reshape(R, P).sum(axis=0) / np.maximum(arrival_count, 1),
+            'berths': berths.astype(int),
+            'queue_change': late - early,
+            'peak_hour': np.argsort(-hourly_queue, axis=1, kind='stable')[:, :2].tolist()
+        }, index=ports.index)
+    
+    def forecast(self, ships_df, port_stats=None):
+        """Simulated queue outlook for every port from the current fleet snapshot"""
+        return self.simulate(self.build_inputs(ships_df, port_stats))
+
+# =============================================================================
+# STREAMING ANOMALY DETECTION
+# =============================================================================
+
+class StreamingAnomalyDetector:
+    """Per-vessel AIS gap, loitering, speed jump and teleport detectors with a fixed-size state row each"""
+    
+    GAP_MINUTES = 30
+    TELEPORT_KN = 60.0
+    TELEPORT_MIN_NM = 2.0
+    SPEED_JUMP_Z = 4.0
+    SPEED_JUMP_MIN_KN = 5.0
+    SPEED_EWMA_ALPHA = 0.2
+    LOITER_RADIUS_NM = 1.0
+    LOITER_HOURS = 2.0
+    EVENT_COLUMNS = ['Timestamp', 'MMSI', 'Name', 'Port', 'Type', 'Score', 'Severity', 'Message']
+    
+    # A detector's score is 5 at its threshold and 10 at twice the threshold
+    SEVERITY_SCORES = [(8.0, 'HIGH'), (6.0, 'MEDIUM'), (0.0, 'LOW')]
+    
+    def __init__(self, port_system):
+        self.port_system = port_system
+        self.index = pd.Index([], dtype=object)
+        self.state = {
+            name: np.empty(0) for name in
+            ['last_time', 'last_lat', 'last_lon', 'speed_mean', 'speed_var', 'anchor_lat', 'anchor_lon', 'anchor_time', 'underway']
+        }
+        self.loitering = np.empty(0, dtype=bool)
+        self.lock = threading.Lock()
+    
+    def get_rows(self, mmsi, lat, lon, speed, underway, now):
+        """State rows for the batch, creating (and seeding) rows for vessels seen for the first time"""
+        rows = self.index.get_indexer(mmsi) if len(self.index) else np.full(len(mmsi), -1)
+        require_unique_ids(mmsi, rows)
+        new = rows < 0
+        if new.any():
+            first = np.flatnonzero(new)
+            self.index = self.index.append(pd.Index(mmsi[first], dtype=object))
+            seed = {
+                'last_time': np.full(len(first), now), 'last_lat': lat[first], 'last_lon': lon[first],
+                'speed_mean': speed[first], 'speed_var': np.zeros(len(first)),
+                'anchor_lat': lat[first], 'anchor_lon': lon[first], 'anchor_time': np.full(len(first), now),
+                'underway': underway[first].astype(float)
+            }
+            for name in self.state:
+                self.state[name] = np.concatenate([self.state[name], seed[name]])
+            self.loitering = np.concatenate([self.loitering, np.zeros(len(first), dtype=bool)])
+            rows = self.index.get_indexer(mmsi)
+        return rows, new
+    
+    def update(self, ships_df, when):
+        """Run every detector on one batch of reports and return the anomaly events it raised"""
+        mmsi = ships_df['MMSI'].astype(str).to_numpy()
+        lat = ships_df['Latitude'].to_numpy(dtype=float)
+        lon = ships_df['Longitude'].to_numpy(dtype=float)
+        speed = ships_df['Speed'].to_numpy(dtype=float)
+        
+        # Loitering is judged on the smoothed track so position noise doesn't reset it
+        track_lat = ships_df['Filtered_Latitude'].to_numpy(dtype=float) if 'Filtered_Latitude' in ships_df else lat
+        track_lon = ships_df['Filtered_Longitude'].to_numpy(dtype=float) if 'Filtered_Longitude' in ships_df else lon
+        at_sea = ships_df['Zone'].to_numpy() == "At Sea" if 'Zone' in ships_df else np.ones(len(ships_df), dtype=bool)
+        underway = ships_df['Status'].to_numpy() == "Underway" if 'Status' in ships_df else np.ones(len(ships_df), dtype=bool)
+        now = when.timestamp()
+        
+        with self.lock:
+            rows, new = self.get_rows(mmsi, track_lat, track_lon, speed, underway, now)
+            state = self.state
+            hours = np.maximum(now - state['last_time'][rows], 0) / 3600
+            
+            # AIS gap: a report after a longer silence than GAP_MINUTES
+            gap_ratio = np.where(new, 0, hours * 60 / self.GAP_MINUTES)
+            
+            # Teleport: the jump from the last reported position implies an impossible speed
+            jump_nm = self.port_system.great_circle_nm(state['last_lat'][rows], state['last_lon'][rows], lat, lon)
+            implied_kn = jump_nm / np.maximum(hours, 1 / 3600)
+            teleport_ratio = np.where(new | (jump_nm < self.TELEPORT_MIN_NM), 0, implied_kn / self.TELEPORT_KN)
+            
+            # Speed jump: reported speed far outside the vessel's running mean and spread;
+            # getting underway or stopping (a new Status) is expected to change speed
+            changed = underway != (state['underway'][rows] == 1)
+            deviation = np.abs(speed - state['speed_mean'][rows])
+            spread = np.sqrt(state['speed_var'][rows]) + 1.0
+            jump_ratio = np.where(new | changed | (deviation < self.SPEED_JUMP_MIN_KN), 0, deviation / spread / self.SPEED_JUMP_Z)
+            
+            # Loitering: a vessel underway staying within LOITER_RADIUS_NM of one point at sea for LOITER_HOURS
+            drift_nm = self.port_system.great_circle_nm(state['anchor_lat'][rows], state['anchor_lon'][rows], track_lat, track_lon)
+            moved = (drift_nm > self.LOITER_RADIUS_NM) | ~at_sea | ~underway
+            state['anchor_lat'][rows] = np.where(moved, track_lat, state['anchor_lat'][rows])
+            state['anchor_lon'][rows] = np.where(moved, track_lon, state['anchor_lon'][rows])
+            state['anchor_time'][rows] = np.where(moved, now, state['anchor_time'][rows])
+            loiter_ratio = (now - state['anchor_time'][rows]) / 3600 / self.LOITER_HOURS
+            
+            # Loitering is raised once per episode, when it first crosses the threshold
+            loiter_start = (loiter_ratio >= 1) & ~self.loitering[rows]
+            self.loitering[rows] = loiter_ratio >= 1
+            
+            # Fold the report into the state
+            alpha = self.SPEED_EWMA_ALPHA
+            difference = speed - state['speed_mean'][rows]
+            state['speed_mean'][rows] += alpha * difference
+            state['speed_var'][rows] = (1 - alpha) * (state['speed_var'][rows] + alpha * difference ** 2)
+            state['speed_mean'][rows] = np.where(changed, speed, state['speed_mean'][rows])
+            state['speed_var'][rows] = np.where(changed, 0.0, state['speed_var'][rows])
+            state['underway'][rows] = underway
+            state['last_time'][rows] = now
+            state['last_lat'][rows] = lat
+            state['last_lon'][rows] = lon
+            
+            return self.build_events(ships_df, when, [
+                ('AIS_GAP', gap_ratio >= 1, gap_ratio, lambda i: f"No reports for {hours[i] * 60:.0f} minutes"),
+                ('TELEPORT', teleport_ratio >= 1, teleport_ratio, lambda i: f"Position jumped {jump_nm[i]:.1f} nm (implies {implied_kn[i]:.0f} knots)"),
+                ('SPEED_JUMP', jump_ratio >= 1, jump_ratio, lambda i: f"Speed changed to {speed[i]:.0f} knots from a typical {speed[i] - difference[i]:.0f}"),
+                ('LOITERING', loiter_start, loiter_ratio, lambda i: f"Holding within {self.LOITER_RADIUS_NM:.0f} nm at sea for {loiter_ratio[i] * self.LOITER_HOURS:.1f}h")
+            ])
+    
+    @classmethod
+    def build_events(cls, ships_df, when, detections):
+        """One row per raised detection, scored from how far past its threshold it is (shared with the snapshot checks)"""
+        frames = []
+        for kind, raised, ratio, describe in detections:
+            positions = np.flatnonzero(raised)
+            if not len(positions):
+                continue
+            score = np.round(np.minimum(10.0, 5.0 * ratio[positions]), 1)
+            frames.append(pd.DataFrame({
+                'Timestamp': when,
+                'MMSI': ships_df['MMSI'].astype(str).to_numpy()[positions],
+                'Name': ships_df['Name'].to_numpy()[positions] if 'Name' in ships_df else "",
+                'Port': ships_df['Port'].to_numpy()[positions] if 'Port' in ships_df else "",
+                'Type': kind,
+                'Score': score,
+                'Severity': cls.get_severity(score),
+                'Message': [describe(i) for i in positions]
+            }))
+        if not frames:
+            return pd.DataFrame(columns=cls.EVENT_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+    
+    @classmethod
+    def get_severity(cls, score):
+        return np.select([score >= threshold for threshold, _ in cls.SEVERITY_SCORES], [label for _, label in cls.SEVERITY_SCORES], default='LOW')
+
+# =============================================================================
+# ALERT STREAM
+# =============================================================================
+
+class AlertStream:
+    """Persistent alerts, one per (vessel, type), with suppression windows and acknowledgment"""
+    
+    # An alert resolves once its condition hasn't been reported for RESOLVE_MINUTES;
+    # the same vessel and type then can't raise a new alert for SUPPRESS_MINUTES
+    RESOLVE_MINUTES = 15
+    SUPPRESS_MINUTES = 60
+    SEVERITIES = ['HIGH', 'MEDIUM', 'LOW']
+    COLUMNS = [
+        'Alert_ID', 'MMSI', 'Name', 'Port', 'Type', 'Score', 'Severity', 'Message',
+        'First_Seen', 'Last_Seen', 'Count', 'Acknowledged', 'Acknowledged_By'
+    ]
+    
+    def __init__(self):
+        self.active = pd.DataFrame(columns=self.COLUMNS, index=pd.Index([], dtype=object, name='Key'))
+        self.suppressed = pd.Series([], index=pd.Index([], dtype=object), dtype='datetime64[us]')
+        self.ranking = self.build_ranking(self.active)
+        self.next_id = 1
+        self.version = 0
+        self.stats = {'raised': 0, 'repeats': 0, 'suppressed': 0, 'resolved': 0}
+        self.lock = threading.Lock()
+    
+    def ingest(self, events, when):
+        """Fold one snapshot's anomaly events into the stream"""
+        with self.lock:
+            active = self.active
+            if len(events):
+                events = events.assign(Key=events['MMSI'].astype(str) + "|" + events['Type'])
+                counts = events.groupby('Key').size()
+                
+                # Strongest event per key; repeats of an open alert update it instead of raising another
+                latest = events.sort_values('Score', kind='stable').drop_duplicates('Key', keep='last').set_index('Key')
+                known = latest.index.isin(active.index)
+                if known.any():
+                    active = active.copy()
+                    seen = latest[known]
+                    keys = seen.index
+                    stronger = keys[seen['Score'].to_numpy() > active.loc[keys, 'Score'].to_numpy(dtype=float)]
+                    active.loc[stronger, ['Score', 'Severity', 'Message']] = seen.loc[stronger, ['Score', 'Severity', 'Message']].to_numpy()
+                    active.loc[keys, 'Last_Seen'] = when
+                    active.loc[keys, 'Count'] = active.loc[keys, 'Count'].to_numpy() + counts[keys].to_numpy()
+                    self.stats['repeats'] += int(counts[keys].sum())
+                
+                fresh = latest[~known]
+                quiet = fresh.index.isin(self.suppressed.index[self.suppressed > when])
+                self.stats['suppressed'] += int(counts[fresh.index[quiet]].sum())
+                fresh = fresh[~quiet]
+                if len(fresh):
+                    raised = fresh[['MMSI', 'Name', 'Port', 'Type', 'Score', 'Severity', 'Message']].assign(
+                        Alert_ID=np.arange(self.next_id, self.next_id + len(fresh)),
+                        First_Seen=when,
+                        Last_Seen=when,
+                        Count=counts[fresh.index].to_numpy(),
+                        Acknowledged=False,
+                        Acknowledged_By=""
+                    )[self.COLUMNS]
+                    self.next_id += len(fresh)
+                    self.stats['raised'] += len(fresh)
+                    active = raised if active.empty else pd.concat([active, raised])
+            self.active = self.resolve(active, when)
+            self.ranking = self.build_ranking(self.active)
+            self.version += 1
+    
+    def resolve(self, active, when):
+        """Drop alerts whose condition has gone quiet and open their suppression windows"""
+        stale = (active['Last_Seen'] < when - timedelta(minutes=self.RESOLVE_MINUTES)).to_numpy(dtype=bool)
+        if not stale.any():
+            return active
+        until = pd.to_datetime(active.loc[stale, 'Last_Seen']) + timedelta(minutes=self.SUPPRESS_MINUTES)
+        current = self.suppressed[self.suppressed > when]
+        self.suppressed = until if current.empty else pd.concat([current[~current.index.isin(until.index)], until])
+        self.stats['resolved'] += int(stale.sum())
+        return active[~stale]
+    
+    def acknowledge(self, alert_ids, user=""):
+        """Take alerts out of the queues; they stay open (and deduplicated) until they resolve"""
+        with self.lock:
+            active = self.active.copy()
+            matched = active['Alert_ID'].isin(alert_ids).to_numpy()
+            active.loc[matched, 'Acknowledged'] = True
+            active.loc[matched, 'Acknowledged_By'] = user
+            self.active = active
+            self.ranking = self.build_ranking(active)
+            self.version += 1
+        return int(matched.sum())
+    
+    def build_ranking(self, active):
+        """Unacknowledged alerts sorted by score once per change, overall and grouped by port"""
+        alerts = active[~active['Acknowledged'].to_numpy(dtype=bool)]
+        rank = pd.Categorical(alerts['Severity'], categories=self.SEVERITIES, ordered=True).codes
+        alerts = alerts.iloc[np.lexsort((alerts['First_Seen'].to_numpy(), rank, -alerts['Score'].to_numpy(dtype=float)))]
+        
+        # A stable sort by port keeps each port's alerts in score order
+        by_port = alerts.iloc[np.argsort(alerts['Port'].to_numpy(dtype=str), kind='stable')]
+        return {
+            'alerts': alerts,
+            'scores': -alerts['Score'].to_numpy(dtype=float),
+            'by_port': by_port,
+            'port_scores': -by_port['Score'].to_numpy(dtype=float),
+            'ports': by_port['Port'].to_numpy(dtype=str)
+        }
+    
+    def get_min_score(self, sensitivity):
+        """Lowest score shown at an Alert Sensitivity of 1-10; from 6 up every raised anomaly shows"""
+        return 11.0 - sensitivity
+    
+    def get_alerts(self, port=None, severity=None, limit=None, min_score=0.0):
+        """Unacknowledged alerts scoring at least min_score, highest scoring first"""
+        with self.lock:
+            ranking = self.ranking
+        if port is None:
+            alerts, scores, start = ranking['alerts'], ranking['scores'], 0
+        else:
+            start = np.searchsorted(ranking['ports'], port, side='left')
+            stop = np.searchsorted(ranking['ports'], port, side='right')
+            alerts, scores = ranking['by_port'], ranking['port_scores'][:stop]
+        
+        # Scores are stored negated so the sorted order is ascending
+        cutoff = start + np.searchsorted(scores[start:], -min_score, side='right')
+        alerts = alerts.iloc[start:cutoff]
+        if severity is not None:
+            alerts = alerts[alerts['Severity'] == severity]
+        return alerts if limit is None else alerts.head(limit)
+    
+    def get_counts(self, port=None, min_score=0.0):
+        """Open unacknowledged alerts per severity queue"""
+        severity = self.get_alerts(port, min_score=min_score)['Severity']
+        return {level: int((severity == level).sum()) for level in self.SEVERITIES}
+
+# =============================================================================
+# TRAJECTORY COMPRESSION
+# =============================================================================
+
+class TrajectorySimplifier:
+    """Douglas-Peucker over many tracks at once; every dropped point stays within `tolerance_m`"""
+    
+    METERS_PER_DEGREE = 111_320
+    
+    def __init__(self, tolerance_m=25.0, time_aware=True):
+        self.tolerance_m = tolerance_m
+        # Time-aware mode measures against the position interpolated at the point's own
+        # timestamp (synchronized Euclidean distance), so replayed speeds stay honest too
+        self.time_aware = time_aware
+    
+    def project(self, lat, lon):
+        """Local equirectangular meters; accurate enough at track-segment scale"""
+        lat = np.asarray(lat, dtype=float)
+        x = np.asarray(lon, dtype=float) * np.cos(np.radians(lat)) * self.METERS_PER_DEGREE
+        return x, lat * self.METERS_PER_DEGREE
+    
+    def segment_distance(self, x, y, t, point, start, end):
+        """Distance in meters from each point to the segment (start, end) it falls in"""
+        dx = x[end] - x[start]
+        dy = y[end] - y[start]
+        
+        if self.time_aware:
+            span = t[end] - t[start]
+            fraction = np.divide(t[point] - t[start], span, out=np.zeros(len(point)), where=span > 0)
+        else:
+            length_sq = dx * dx + dy * dy
+            projection = (x[point] - x[start]) * dx + (y[point] - y[start]) * dy
+            fraction = np.clip(np.divide(projection, length_sq, out=np.zeros(len(point)), where=length_sq > 0), 0, 1)
+        
+        return np.hypot(x[point] - (x[start] + fraction * dx), y[point] - (y[start] + fraction * dy))
+    
+    def simplify(self, track_ids, times, lat, lon):
+        """Keep mask for points sorted by track, then time"""
+        count = len(lat)
+        keep = np.zeros(count, dtype=bool)
+        if count == 0:
+            return keep
+        
+        x, y = self.project(lat, lon)
+        t = np.asarray(times).astype('datetime64[ms]').astype(np.int64) / 1000.0
+        track_ids = np.asarray(track_ids)
+        
+        starts = np.flatnonzero(np.r_[True, track_ids[1:] != track_ids[:-1]])
+        ends = np.r_[starts[1:], count] - 1
+        keep[starts] = True
+        keep[ends] = True
+        
+        # All open segments of all tracks are split in the same pass, one recursion level per loop
+        seg_start, seg_end = starts, ends
+        while True:
+            open_segments = seg_end - seg_start > 1
+            seg_start, seg_end = seg_start[open_segments], seg_end[open_segments]
+            if not len(seg_start):
+                return keep
+            
+            interior = seg_end - seg_start - 1
+            offsets = np.cumsum(interior) - interior
+            segment = np.repeat(np.arange(len(seg_start)), interior)
+            point = np.arange(interior.sum()) - offsets[segment] + seg_start[segment] + 1
+            
+            distance = self.segment_distance(x, y, t, point, seg_start[segment], seg_end[segment])
+            farthest = np.maximum.reduceat(distance, offsets)
+            
+            # First point reaching each segment's maximum
+            at_max = np.flatnonzero(distance == farthest[segment])
+            at_max = at_max[np.r_[True, segment[at_max][1:] != segment[at_max][:-1]]]
+            
+            split = farthest > self.tolerance_m
+            split_point = point[at_max][split]
+            keep[split_point] = True
+            
+            seg_start, seg_end = (
+                np.concatenate([seg_start[split], split_point]),
+                np.concatenate([split_point, seg_end[split]])
+            )
+
+class StreamingSimplifier:
+    """Time-aware track compression for reports arriving one snapshot at a time, with fixed state per vessel"""
+    
+    METERS_PER_DEGREE = 111_320
+    
+    def __init__(self, tolerance_m=25.0):
+        self.tolerance_m = tolerance_m
+        self.reset()
+    
+    def reset(self):
+        # Per vessel: the last kept report (anchor), the latest report, which is held back until a later one
+        # shows whether the track needs it, and a box of velocities from the anchor (east low/high, north
+        # low/high in m/s) that keeps every dropped report within tolerance. Each dropped report allows a
+        # disk of velocities; the box is the intersection of squares inscribed in those disks.
+        self.index = pd.Index([], dtype=object)
+        self.anchor = np.empty((0, 3))  # seconds, lat, lon
+        self.latest = np.empty((0, 3))
+        self.has_latest = np.empty(0, dtype=bool)
+        self.box = np.empty((0, 4))
+        self.segment = np.empty(0, dtype=np.uint64)
+    
+    def __len__(self):
+        return len(self.index)
+    
+    def offset(self, rows, lat, lon):
+        """East/north meters of positions from the rows' anchors"""
+        east = ((lon - self.anchor[rows, 2] + 180) % 360 - 180) * np.cos(np.radians(self.anchor[rows, 1])) * self.METERS_PER_DEGREE
+        north = (lat - self.anchor[rows, 1]) * self.METERS_PER_DEGREE
+        return east, north
+    
+    def update(self, mmsi, seconds, lat, lon, segment):
+        """Add one report per vessel; returns masks of reports starting a track and of vessels whose held report is kept"""
+        # Every report not starting a track is held in place of the vessel's last one. A change of
+        # `segment` always keeps the held report, so every segment keeps its last report.
+        mmsi = np.asarray(mmsi).astype(str)
+        rows = self.index.get_indexer(mmsi) if len(self.index) else np.full(len(mmsi), -1)
+        require_unique_ids(mmsi, rows)
+        first = rows < 0
+        if first.any():
+            count = int(first.sum())
+            self.index = self.index.append(pd.Index(mmsi[first], dtype=object))
+            self.anchor = np.concatenate([self.anchor, np.column_stack([seconds[first], lat[first], lon[first]])])
+            self.latest = np.concatenate([self.latest, np.full((count, 3), np.nan)])
+            self.has_latest = np.concatenate([self.has_latest, np.zeros(count, dtype=bool)])
+            self.box = np.concatenate([self.box, np.tile([-np.inf, np.inf, -np.inf, np.inf], (count, 1))])
+            self.segment = np.concatenate([self.segment, segment[first]])
+        
+        known = ~first
+        rows = rows[known]
+        seconds, lat, lon, segment = seconds[known], lat[known], lon[known], segment[known]
+        held = self.has_latest[rows]
+        since_held = self.latest[rows, 0] - self.anchor[rows, 0]
+        since_report = seconds - self.anchor[rows, 0]
+        
+        # Dropping the held report narrows the box to velocities that pass within tolerance of it;
+        # the held report can go if the new report's velocity from the anchor is still inside
+        held_east, held_north = self.offset(rows, self.latest[rows, 1], self.latest[rows, 2])
+        east, north = self.offset(rows, lat, lon)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            half = self.tolerance_m / np.sqrt(2) / since_held
+            box = np.column_stack([
+                np.maximum(self.box[rows, 0], held_east / since_held - half),
+                np.minimum(self.box[rows, 1], held_east / since_held + half),
+                np.maximum(self.box[rows, 2], held_north / since_held - half),
+                np.minimum(self.box[rows, 3], held_north / since_held + half)
+            ])
+            velocity_east = east / since_report
+            velocity_north = north / since_report
+        fits = (
+            held & (since_held > 0) & (since_report > since_held) & (segment == self.segment[rows])
+            & (velocity_east >= box[:, 0]) & (velocity_east <= box[:, 1])
+            & (velocity_north >= box[:, 2]) & (velocity_north <= box[:, 3])
+        )
+        
+        # A stored held report becomes the anchor, with nothing dropped between it and the new report
+        stored = held & ~fits
+        self.anchor[rows[stored]] = self.latest[rows[stored]]
+        self.box[rows] = np.where(fits[:, None], box, [-np.inf, np.inf, -np.inf, np.inf])
+        self.latest[rows] = np.column_stack([seconds, lat, lon])
+        self.has_latest[rows] = True
+        self.segment[rows] = segment
+        
+        release = np.zeros(len(mmsi), dtype=bool)
+        release[known] = stored
+        return first, release
+
+# =============================================================================
+# POSITION HISTORY STORE
+# =============================================================================
+
+class HistoryStore:
+    """Append-only vessel position history in Parquet, partitioned by fleet run, day and port"""
+    
+    COLUMNS = ['MMSI', 'Timestamp', 'Latitude', 'Longitude', 'Speed', 'Course', 'Status', 'Type']
+    SCHEMA = pa.schema([
+        ('MMSI', pa.string()),
+        ('Timestamp', pa.timestamp('ms')),
+        ('Latitude', pa.float32()),
+        ('Longitude', pa.float32()),
+        ('Speed', pa.float32()),
+        ('Course', pa.float32()),
+        ('Status', pa.string()),
+        ('Type', pa.string()),
+        ('run', pa.string()),
+        ('day', pa.string()),
+        ('port', pa.string())
+    ])
+    PARTITIONING = ds.partitioning(pa.schema([('run', pa.string()), ('day', pa.string()), ('port', pa.string())]), flavor="hive")
+    
+    def __init__(self, root, flush_rows=100_000, flush_interval=600, tolerance_m=None):
+        self.root = root
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.simplifier = StreamingSimplifier(tolerance_m) if tolerance_m else None
+        self.held = self.SCHEMA.empty_table()
+        # Taken from the buffer but not yet in place on disk; queries read these too
+        self.unwritten = []
+        self.rows_received = 0
+        self.rows_written = 0
+        self.buffer = []
+        self.buffered_rows = 0
+        self.last_flush = time.time()
+        self.version = 0
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        
+        # Simulated fleets reuse MMSIs, so each one is recorded and read as its own run
+        self.run = uuid.uuid4().hex
+        
+        # Don't lose the buffered tail or the held reports when the process exits
+        atexit.register(self.flush, final=True)
+    
+    def to_table(self, ships_df, when):
+        """Narrow, typed position batch with its partition columns"""
+        return pa.table({
+            'MMSI': pa.array(ships_df['MMSI'].astype(str), pa.string()),
+            'Timestamp': pa.array(np.full(len(ships_df), np.datetime64(when, 'ms'))),
+            'Latitude': pa.array(ships_df['Latitude'].to_numpy(dtype=np.float32)),
+            'Longitude': pa.array(ships_df['Longitude'].to_numpy(dtype=np.float32)),
+            'Speed': pa.array(ships_df['Speed'].to_numpy(dtype=np.float32)),
+            'Course': pa.array(ships_df['Course'].fillna(0).to_numpy(dtype=np.float32)),
+            'Status': pa.array(ships_df['Status'].astype(str), pa.string()),
+            'Type': pa.array(ships_df['Type'].astype(str), pa.string()),
+            'run': pa.array(np.full(len(ships_df), self.run), pa.string()),
+            'day': pa.array(np.full(len(ships_df), when.strftime('%Y-%m-%d')), pa.string()),
+            'port': pa.array(ships_df['Port'].astype(str), pa.string())
+        }, schema=self.SCHEMA)
+    
+    def start_run(self):
+        """Record a newly simulated fleet apart from earlier ones; queries only see the current run"""
+        self.flush(final=True)
+        with self.lock:
+            self.run = uuid.uuid4().hex
+            self.version += 1
+    
+    def append(self, ships_df, when):
+        """Buffer one snapshot; batches are written once they are large or old enough"""
+        table = self.to_table(ships_df, when)
+        with self.lock:
+            self.buffer.append(table)
+            self.buffered_rows += table.num_rows
+            self.version += 1
+            due = self.buffered_rows >= self.flush_rows or time.time() - self.last_flush >= self.flush_interval
+        if due:
+            self.flush()
+    
+    def simplify(self, tables, final=False):
+        """Rows to store from snapshot batches in time order; each vessel's latest report is held back"""
+        stored = []
+        for table in tables:
+            # Every vessel keeps its last report per hour and port, so hourly activity and port partitions see it
+            seconds = table['Timestamp'].to_numpy().astype('datetime64[s]').astype(np.int64)
+            segment = pd.util.hash_pandas_object(pd.DataFrame({
+                'port': table['port'].to_numpy(zero_copy_only=False), 'hour': seconds // 3600
+            }), index=False).to_numpy()
+            first, release = self.simplifier.update(
+                table['MMSI'].to_numpy(zero_copy_only=False), seconds,
+                table['Latitude'].to_numpy().astype(float), table['Longitude'].to_numpy().astype(float), segment
+            )
+            
+            reported = pc.is_in(self.held['MMSI'], value_set=table['MMSI'])
+            released = pc.is_in(self.held['MMSI'], value_set=table['MMSI'].filter(pa.array(release)))
+            stored.append(self.held.filter(released))
+            stored.append(table.filter(pa.array(first)))
+            self.held = pa.concat_tables([self.held.filter(pc.invert(reported)), table.filter(pa.array(~first))])
+        
+        # A finished run stores the held reports too; they are its tracks' last points
+        if final:
+            stored.append(self.held)
+            self.held = self.SCHEMA.empty_table()
+            self.simplifier.reset()
+        return pa.concat_tables(stored) if stored else self.SCHEMA.empty_table()
+    
+    def flush(self, final=False):
+        """Write buffered batches as one Parquet file per day/port partition"""
+        # One flush at a time: the simplifier carries each vessel's track from one flush to the next
+        with self.flush_lock:
+            with self.lock:
+                if not self.buffer and not (final and self.held.num_rows):
+                    return
+                tables, self.buffer, self.buffered_rows = self.buffer, [], 0
+                self.unwritten = [self.held] + tables
+                self.last_flush = time.time()
+            self.rows_received += sum(table.num_rows for table in tables)
+            
+            # Tracks are simplified as a whole across flushes: reports the stored track reproduces
+            # within tolerance are dropped, and each vessel's latest report waits for the next flush
+            table = self.simplify(tables, final) if self.simplifier is not None else pa.concat_tables(tables)
+            self.rows_written += table.num_rows
+            
+            # Sorting by vessel and time keeps row-group statistics tight for MMSI and time filters
+            table = table.sort_by([('port', 'ascending'), ('MMSI', 'ascending'), ('Timestamp', 'ascending')])
+            
+            # Write into a staging folder (ignored by readers) and move finished files into place
+            staging = os.path.join(self.root, f"_staging-{uuid.uuid4().hex}")
+            ds.write_dataset(
+                table,
+                staging,
+                format="parquet",
+                partitioning=self.PARTITIONING,
+                basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet"
+            )
+            
+            # The batches stop being read from memory in the same step their files appear
+            with self.lock:
+                for folder, _, files in os.walk(staging):
+                    target = os.path.join(self.root, os.path.relpath(folder, staging))
+                    os.makedirs(target, exist_ok=True)
+                    for filename in files:
+                        os.replace(os.path.join(folder, filename), os.path.join(target, filename))
+                self.unwritten = []
+            shutil.rmtree(staging, ignore_errors=True)
+    
+    def build_filter(self, start=None, end=None, port=None, mmsi=None):
+        """Dataset expression; the run, day and port terms prune whole partitions"""
+        conditions = [ds.field('run') == self.run]
+        if start is not None:
+            conditions.append(ds.field('day') >= start.strftime('%Y-%m-%d'))
+            conditions.append(ds.field('Timestamp') >= pa.scalar(np.datetime64(start, 'ms')))
+        if end is not None:
+            conditions.append(ds.field('day') <= end.strftime('%Y-%m-%d'))
+            conditions.append(ds.field('Timestamp') <= pa.scalar(np.datetime64(end, 'ms')))
+        if port is not None:
+            conditions.append(ds.field('port') == port)
+        if mmsi is not None:
+            conditions.append(ds.field('MMSI').isin([mmsi] if isinstance(mmsi, str) else list(mmsi)))
+        
+        expression = conditions[0]
+        for condition in conditions[1:]:
+            expression = expression & condition
+        return expression
+    
+    def query(self, start=None, end=None, port=None, mmsi=None, columns=None):
+        """Positions matching a time range, port and MMSI filter, including unflushed batches and held reports"""
+        expression = self.build_filter(start, end, port, mmsi)
+        columns = columns or self.COLUMNS
+        
+        # Files and in-memory batches are listed together, so a flush in progress shows its rows exactly once
+        with self.lock:
+            dataset = ds.dataset(self.root, schema=self.SCHEMA, format="parquet", partitioning=self.PARTITIONING) if os.path.isdir(self.root) else None
+            in_memory = (self.unwritten or [self.held]) + self.buffer
+        
+        tables = []
+        if dataset is not None:
+            tables.append(dataset.to_table(columns=columns, filter=expression))
+        for table in in_memory:
+            tables.append(table.filter(expression).select(columns))
+        
+        if not tables:
+            return pd.DataFrame(columns=columns)
+        return pa.concat_tables(tables).to_pandas()
+    
+    def get_stats(self):
+        return {
+            'rows_received': self.rows_received,
+            'rows_written': self.rows_written,
+            'compression': self.rows_received / max(1, self.rows_written)
+        }
+    
+    def get_hourly_activity(self, port, end, hours=24):
+        """Distinct vessels seen at a port per hour over the trailing window"""
+        history = self.query(start=end - timedelta(hours=hours), end=end, port=port, columns=['MMSI', 'Timestamp'])
+        if history.empty:
+            return pd.Series(dtype=int)
+        return history.groupby(history['Timestamp'].dt.floor('h'))['MMSI'].nunique()
+
+# =============================================================================
+# TRACK PLAYBACK
+# =============================================================================
+
+class PlaybackBins:
+    """Per-minute position frames precomputed from history so scrubbing is a slice, not a query"""
+    
+    def __init__(self, history_df, simplifier=None):
+        self.simplifier = simplifier
+        history_df = history_df.sort_values(['MMSI', 'Timestamp'], kind='stable')
+        
+        # Stored tracks are simplified, so positions are interpolated onto a per-minute grid
+        mmsi = history_df['MMSI'].to_numpy()
+        seconds = history_df['Timestamp'].to_numpy().astype('datetime64[s]').astype(np.int64)
+        track_start = np.flatnonzero(np.r_[True, mmsi[1:] != mmsi[:-1]]) if len(mmsi) else np.array([], dtype=int)
+        track_end = np.r_[track_start[1:], len(mmsi)] - 1 if len(mmsi) else np.array([], dtype=int)
+        vessel = np.repeat(np.arange(len(track_start)), np.diff(np.r_[track_start, len(mmsi)]))
+        
+        self.vessel_mmsi = mmsi[track_start]
+        self.vessel_type = history_df['Type'].to_numpy()[track_start]
+        
+        first_minute = seconds[track_start] // 60
+        last_minute = seconds[track_end] // 60
+        samples = last_minute - first_minute + 1
+        grid_vessel = np.repeat(np.arange(len(track_start)), samples)
+        grid_minute = np.arange(samples.sum()) - np.repeat(np.cumsum(samples) - samples, samples) + first_minute[grid_vessel]
+        grid_seconds = np.clip(grid_minute * 60, seconds[track_start][grid_vessel], seconds[track_end][grid_vessel])
+        
+        # Offsetting each vessel onto its own stretch of one time axis lets a single
+        # np.interp call resample every track at once
+        base = seconds.min() if len(seconds) else 0
+        stride = (seconds.max() - base + 120) if len(seconds) else 1
+        source_axis = (seconds - base) + vessel * stride
+        grid_axis = (grid_seconds - base) + grid_vessel * stride
+        
+        order = np.lexsort((grid_vessel, grid_minute))
+        self.vessel = grid_vessel[order]
+        def resample(column):
+            if not len(source_axis):
+                return np.empty(0)
+            return np.interp(grid_axis, source_axis, history_df[column].to_numpy(dtype=float))[order]
+        
+        self.lat = resample('Latitude')
+        self.lon = resample('Longitude')
+        self.speed = resample('Speed')
+        
+        minute_values = grid_minute[order]
+        self.minute_index = minute_values
+        minutes = np.unique(minute_values)
+        self.minutes = (minutes * 60).astype('datetime64[s]')
+        self.offsets = np.append(np.searchsorted(minute_values, minutes, side='left'), len(minute_values))
+    
+    def __len__(self):
+        return len(self.minutes)
+    
+    def get_trail(self, start, end):
+        """Trail polylines for rows [start, end), simplified for display and NaN-separated per vessel"""
+        order = np.lexsort((self.minute_index[start:end], self.vessel[start:end])) + start
+        vessel, lat, lon = self.vessel[order], self.lat[order], self.lon[order]
+        
+        if self.simplifier is not None and len(order):
+            keep = self.simplifier.simplify(vessel, self.minute_index[order].astype('datetime64[m]'), lat, lon)
+            vessel, lat, lon = vessel[keep], lat[keep], lon[keep]
+        
+        breaks = np.flatnonzero(vessel[1:] != vessel[:-1]) + 1
+        return {
+            'lat': np.insert(lat, breaks, np.nan),
+            'lon': np.insert(lon, breaks, np.nan)
+        }
+    
+    def get_frame(self, index, trail=0):
+        """Positions at frame `index`, plus the `trail` frames before it as one contiguous slice"""
+        start = self.offsets[max(0, index - trail)]
+        current = self.offsets[index]
+        end = self.offsets[index + 1]
+        vessel = self.vessel[current:end]
+        return {
+            'minute': pd.Timestamp(self.minutes[index]),
+            'trail': self.get_trail(start, end) if trail else {'lat': [], 'lon': []},
+            'lat': self.lat[current:end],
+            'lon': self.lon[current:end],
+            'mmsi': self.vessel_mmsi[vessel],
+            'type': self.vessel_type[vessel],
+            'speed': self.speed[current:end]
+        }
+
+# =============================================================================
+# SHARED SERVICES
+# =============================================================================
+
+class SharedServices:
+    """Long-lived services built once per process and shared by every session"""
+    
+    # Refresh intervals per data source, in seconds
+    REFRESH_INTERVALS = {
+        'fleet': 60,
+        'weather': 900,
+        'economic': 6 * 3600
+    }
+    FLEET_IDLE_TIMEOUT = 900
+    
+    # Position history is recorded for fleets up to this size
+    HISTORY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "history")
+    HISTORY_MAX_VESSELS = 100_000
+    
+    # Port-to-port sea distance and transit time matrices, rebuilt when the route graph changes
+    SEA_ROUTES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sea_routes.npz")
+    
+    # Recorded history of the current fleet run, replayed into the port-call extractor when it is first created
+    PORT_CALL_BACKFILL = timedelta(hours=24)
+    
+    # Error bounds for track compression: stored history, and trails drawn on the map
+    HISTORY_TOLERANCE_M = 25.0
+    DISPLAY_TOLERANCE_M = 100.0
+    
+    def __init__(self):
+        self.port_system = GlobalPortSystem()
+        self.sea_routes = SeaRouteNetwork(self.port_system, self.SEA_ROUTES_PATH)
+        self.sea_router = SeaRouter(self.sea_routes)
+        self.voyages = VoyageSimulator(self.port_system, self.sea_router)
+        self.predictive_ai = PredictiveAI(self.port_system, self.sea_routes)
+        self.auth_system = AuthSystem()
+        self.business_intel = BusinessIntelligence()
+        self.animations = PremiumCanvasAnimations()
+        self.webgl_map = WebGLFleetMap()
+        self.render_cache = RenderCache(max_entries=256)
+        self.snapshot_versions = itertools.count(1)
+        self.version_lock = threading.Lock()
+        self.histories = {}
+        self.trackers = {}
+        self.geofences = {}
+        self.port_calls = {}
+        self.anomaly_detectors = {}
+        self.alert_streams = {}
+        self.queue_simulator = BerthQueueSimulator(self.port_system)
+        self.queue_forecasts = OrderedDict()
+        self.fleet_summaries = OrderedDict()
+        self.pinned_states = OrderedDict()
+        self.display_simplifier = TrajectorySimplifier(self.DISPLAY_TOLERANCE_M, time_aware=False)
+        
+        self.real_data = FreeRealData()
+        self.scheduler = DataRefreshScheduler()
+        self.scheduler.add_source("weather", self.real_data.get_real_weather_public, self.REFRESH_INTERVALS['weather'])
+        self.scheduler.add_source("economic", self.real_data.get_real_economic_public, self.REFRESH_INTERVALS['economic'])
+    
+    def next_snapshot_version(self):
+        """Process-wide unique snapshot version, so shared caches never mix sessions"""
+        with self.version_lock:
+            return next(self.snapshot_versions)
+    
+    def get_fleet_source(self, scale=None):
+        """Scheduler source name for a fleet scale, registered on first use"""
+        name = f"fleet:{scale or 'demo'}"
+        if not self.scheduler.has_source(name):
+            self.scheduler.add_source(
+                name,
+                lambda: self.build_fleet_snapshot(name, scale),
+                self.REFRESH_INTERVALS['fleet'],
+                idle_timeout=self.FLEET_IDLE_TIMEOUT,
+                on_retire=self.retire_fleet_source
+            )
+        return name
+    
+    def retire_fleet_source(self, name):
+        """Drop a retired fleet's per-source state; a fleet simulated afresh must not inherit its tracks or alerts"""
+        with self.version_lock:
+            for states in (self.trackers, self.geofences, self.port_calls, self.anomaly_detectors, self.alert_streams):
+                states.pop(name, None)
+    
+    def build_fleet_snapshot(self, name, scale):
+        """Advance the previous snapshot (or simulate the first one) and record it to history"""
+        previous = self.scheduler.peek(name)
+        history = self.get_history(scale)
+        if previous is None:
+            fleet_store = FleetStore(self.port_system.get_global_fleet(scale, router=self.sea_router), self.next_snapshot_version())
+            # A fresh simulation reuses MMSIs, so its tracks must not join up with an earlier fleet's
+            if history is not None:
+                history.start_run()
+        else:
+            fleet_store = previous['data'].advance(datetime.now(), self.next_snapshot_version(), voyages=self.voyages)
+        
+        # Reports go through the tracker; maps, ETA and anomaly checks read the filtered state
+        frame = fleet_store.frame
+        underway = frame['Status'].to_numpy() == 'Underway'
+        fleet_store.apply_tracking(self.get_tracker(name).update(
+            frame['MMSI'], frame['Latitude'], frame['Longitude'], fleet_store.created_at,
+            speed_kn=np.where(underway, frame['Speed'].to_numpy(dtype=float), 0.0),
+            course_deg=frame['Course'].fillna(0)
+        ))
+        
+        # Zone membership from the smoothed positions, so boundary noise doesn't flap events
+        geofence = self.get_geofence(name).update(
+            frame['MMSI'], frame['Filtered_Latitude'], frame['Filtered_Longitude'], fleet_store.created_at
+        )
+        fleet_store.frame['Zone'] = geofence['zone']
+        self.get_port_calls(name, scale).update(frame['MMSI'], geofence['port'], geofence['zone'] == "Berth", fleet_store.created_at)
+        
+        # Alerts are evaluated once per snapshot here, never per viewer
+        events = self.get_anomaly_detector(name).update(fleet_store.frame, fleet_store.created_at)
+        checks = self.predictive_ai.detect_snapshot_anomalies(fleet_store.frame, fleet_store.created_at)
+        self.get_alert_stream(name).ingest(pd.concat([events, checks], ignore_index=True) if len(events) else checks, fleet_store.created_at)
+        
+        if history is not None:
+            history.append(fleet_store.frame, fleet_store.created_at)
+        return fleet_store
+    
+    def get_tracker(self, name):
+        with self.version_lock:
+            if name not in self.trackers:
+                self.trackers[name] = VesselTracker()
+            return self.trackers[name]
+    
+    def get_geofence(self, name):
+        with self.version_lock:
+            if name not in self.geofences:
+                self.geofences[name] = GeofenceEngine(self.port_system.ports)
+            return self.geofences[name]
+    
+    def get_anomaly_detector(self, name):
+        with self.version_lock:
+            if name not in self.anomaly_detectors:
+                self.anomaly_detectors[name] = StreamingAnomalyDetector(self.port_system)
+            return self.anomaly_detectors[name]
+    
+    def get_alert_stream(self, name):
+        with self.version_lock:
+            if name not in self.alert_streams:
+                self.alert_streams[name] = AlertStream()
+            return self.alert_streams[name]
+    
+    def get_port_calls(self, name, scale=None):
+        """Port-call extractor for a fleet source, seeded from recorded history on first use"""
+        with self.version_lock:
+            created = name not in self.port_calls
+            if created:
+                self.port_calls[name] = PortCallExtractor(list(self.port_system.ports.keys()))
+            port_calls = self.port_calls[name]
+        
+        history = self.get_history(scale)
+        if created and history is not None:
+            recorded = history.query(start=datetime.now() - self.PORT_CALL_BACKFILL, columns=['MMSI', 'Timestamp', 'Latitude', 'Longitude'])
+            port_calls.process_history(recorded, self.get_geofence(name))
+        return port_calls
     
-    def calculate_roi(self, port_efficiency_improvement):
-        """Calculate ROI for clients"""
-        base_savings = 50000  # $50K per day base
-        efficiency_savings = base_savings * port_efficiency_improvement
-        annual_savings = efficiency_savings * 365
+    def get_history(self, scale=None):
+        """Position history for a fleet scale, or None when the fleet is too large to record"""
+        if scale and scale > self.HISTORY_MAX_VESSELS:
+            return None
+        name = f"fleet_{scale or 'demo'}"
+        with self.version_lock:
+            if name not in self.histories:
+                self.histories[name] = HistoryStore(os.path.join(self.HISTORY_DIR, name), tolerance_m=self.HISTORY_TOLERANCE_M)
+            return self.histories[name]
+    
+    def get_queue_forecast(self, fleet_store, port_calls=None):
+        """Berth queue simulation for a fleet snapshot, run once per snapshot version"""
+        with self.version_lock:
+            if fleet_store.version in self.queue_forecasts:
+                return self.queue_forecasts[fleet_store.version]
         
-        return {
-            'daily_savings': f"${efficiency_savings:,.0f}",
-            'annual_savings': f"${annual_savings:,.0f}",
-            'efficiency_gain': f"{port_efficiency_improvement * 100:.1f}%",
-            'payback_period': "3-6 months",
-            'roi': f"{(annual_savings / 50000) * 100:.0f}%"
-        }
+        port_stats = port_calls.get_port_stats() if port_calls is not None else None
+        forecast = self.queue_simulator.forecast(fleet_store.frame, port_stats)
+        with self.version_lock:
+            self.queue_forecasts[fleet_store.version] = forecast
+            while len(self.queue_forecasts) > 8:
+                self.queue_forecasts.popitem(last=False)
+        return forecast
     
-    def generate_executive_summary(self, port_data, ships_data):
-        """Generate executive-level business summary"""
-        total_ships = len(ships_data)
-        total_cargo_value = sum(ship.get('Cargo_Value_M', 0) for ship in ships_data)
-        avg_ship_value = total_cargo_value / max(1, total_ships)
+    def get_pinned_state(self, fleet_store):
+        """Zone, port-call and alert state for a snapshot pinned in a session (no scheduler source), built once per version"""
+        with self.version_lock:
+            if fleet_store.version in self.pinned_states:
+                return self.pinned_states[fleet_store.version]
         
-        return {
-            'total_vessels': total_ships,
-            'total_cargo_value': f"${total_cargo_value:,.0f}M",
-            'average_ship_value': f"${avg_ship_value:,.1f}M",
-            'port_efficiency': f"{np.random.uniform(65, 92):.1f}%",
-            'risk_level': "LOW" if total_ships < 15 else "MEDIUM",
-            'recommendations': [
-                "Optimize berth allocation for faster turnaround",
-                "Implement predictive arrival system",
-                "Increase monitoring during peak hours"
-            ]
-        }
+        frame = fleet_store.frame
+        lat = frame['Filtered_Latitude' if 'Filtered_Latitude' in frame else 'Latitude']
+        lon = frame['Filtered_Longitude' if 'Filtered_Longitude' in frame else 'Longitude']
+        geofence = GeofenceEngine(self.port_system.ports)
+        zones = geofence.update(frame['MMSI'], lat, lon, fleet_store.created_at)
+        port_calls = PortCallExtractor(list(self.port_system.ports.keys()))
+        port_calls.update(frame['MMSI'], zones['port'], zones['zone'] == "Berth", fleet_store.created_at)
+        
+        # A single snapshot has no track to stream, so only the snapshot checks raise alerts
+        alert_stream = AlertStream()
+        alert_stream.ingest(self.predictive_ai.detect_snapshot_anomalies(frame, fleet_store.created_at), fleet_store.created_at)
+        
+        state = {'geofence': geofence, 'port_calls': port_calls, 'alert_stream': alert_stream}
+        with self.version_lock:
+            self.pinned_states[fleet_store.version] = state
+            while len(self.pinned_states) > 8:
+                self.pinned_states.popitem(last=False)
+        return state
+    
+    def get_fleet_summary(self, fleet_store, port_calls=None):
+        """Port, region and company KPIs for a fleet snapshot, computed once per snapshot version"""
+        with self.version_lock:
+            if fleet_store.version in self.fleet_summaries:
+                return self.fleet_summaries[fleet_store.version]
+        
+        port_stats = port_calls.get_port_stats() if port_calls is not None else None
+        regions = {name: port['region'] for name, port in self.port_system.ports.items()}
+        summary = self.business_intel.summarize_fleet(fleet_store, regions, port_stats)
+        with self.version_lock:
+            self.fleet_summaries[fleet_store.version] = summary
+            while len(self.fleet_summaries) > 8:
+                self.fleet_summaries.popitem(last=False)
+        return summary
+    
+    def get_fleet_store(self, scale=None, timeout=300):
+        """Latest published fleet snapshot; only the very first one is waited for"""
+        name = self.get_fleet_source(scale)
+        snapshot = self.scheduler.get_latest(name, timeout=timeout)
+        if snapshot is None:
+            error = self.scheduler.get_error(name)
+            raise RuntimeError(f"No fleet snapshot published for scale {scale or 'demo'}" + (f": {error}" if error else ""))
+        return snapshot['data']
+
+@st.cache_resource
+def get_shared_services():
+    return SharedServices()
 
 # =============================================================================
 # MAIN ENTERPRISE APPLICATION
 # =============================================================================
 
 class SkyWatchEnterprise:
-    def __init__(self):
-        self.predictive_ai = PredictiveAI()
-        self.port_system = GlobalPortSystem()
-        self.auth_system = AuthSystem()
-        self.business_intel = BusinessIntelligence()
+    def __init__(self, services=None):
+        # Per-session state lives in st.session_state; everything here is shared
+        self.services = services or get_shared_services()
+        self.predictive_ai = self.services.predictive_ai
+        self.port_system = self.services.port_system
+        self.auth_system = self.services.auth_system
+        self.business_intel = self.services.business_intel
         self.current_port = "New York"
-        self.animations = PremiumCanvasAnimations()  # Add animations
+        self.animations = self.services.animations  # Add animations
     
     def run_enterprise_dashboard(self):
         """Main enterprise dashboard"""
@@ -874,28 +3224,26 @@ class SkyWatchEnterprise:
             self.show_risk_alerts()
         
         # Main content area
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
-            "🌍 Global Overview", 
-            "🚢 Live Tracking", 
-            "📈 Analytics",
-            "🤖 AI Insights",
-            "💼 Business Intelligence"
-        ])
-        
-        with tab1:
-            self.show_global_overview()
-        
-        with tab2:
-            self.show_live_tracking()
-        
-        with tab3:
-            self.show_analytics_dashboard()
+        self.render_views([
+            ("🌍 Global Overview", self.show_global_overview),
+            ("🚢 Live Tracking", self.show_live_tracking),
+            ("⏯️ Playback", self.show_playback),
+            ("📈 Analytics", self.show_analytics_dashboard),
+            ("🤖 AI Insights", self.show_ai_insights),
+            ("💼 Business Intelligence", self.show_business_intelligence)
+        ], key="main_view")
+    
+    def render_views(self, views, key):
+        """Render (label, view) pairs as tabs, running only the active one in lazy mode"""
+        lazy = st.session_state.get('lazy_navigation', True)
         
-        with tab4:
-            self.show_ai_insights()
+        tabs = st.tabs([label for label, _ in views], key=key, on_change="rerun" if lazy else "ignore")
         
-        with tab5:
-            self.show_business_intelligence()
+        for tab, (_, view) in zip(tabs, views):
+            with tab:
+                # `open` is None when tabs don't track state, i.e. eager mode
+                if tab.open is not False:
+                    view()
     
     def show_login(self):
         """User authentication interface"""
@@ -996,20 +3344,78 @@ class SkyWatchEnterprise:
         # AI Settings
         st.sidebar.subheader("AI Settings")
         enable_predictions = st.sidebar.checkbox("Enable AI Predictions", True)
-        alert_threshold = st.sidebar.slider("Alert Sensitivity", 1, 10, 7)
         
         # Theme settings
         st.sidebar.subheader("Display")
         theme = st.sidebar.selectbox("Theme", ["Light", "Dark"])
+        animation_mode = st.sidebar.selectbox(
+            "Animations",
+            list(PremiumCanvasAnimations.ANIMATION_MODES.keys()),
+            key="animation_mode",
+            help="Low Power caps the frame rate; Static draws a single frame"
+        )
+        if animation_mode == "Low Power":
+            st.sidebar.slider("Frame Rate Cap (fps)", 5, 60, 15, key="animation_fps")
+        else:
+            st.session_state.pop('animation_fps', None)
+        st.sidebar.selectbox(
+            "Map Renderer",
+            ["Auto", "Plotly", "WebGL (deck.gl)"],
+            key="map_renderer",
+            help="Auto switches to the WebGL layer above 5,000 vessels"
+        )
+        st.sidebar.toggle(
+            "Lazy Tab Loading",
+            True,
+            key="lazy_navigation",
+            help="Only compute the selected view; other tabs are built when opened"
+        )
+        if st.sidebar.toggle(
+            "📡 Live Mode",
+            False,
+            key="live_mode",
+            help="Stream moved vessel positions to the WebGL map without rerunning the page"
+        ):
+            st.sidebar.slider("Live Update Interval (s)", 1, 5, 2, key="live_interval")
+        
+        # Data snapshot
+        st.sidebar.subheader("Data")
+        fleet_scales = {"Demo (per port)": None, "10K vessels": 10_000, "100K vessels": 100_000, "1M vessels": 1_000_000}
+        scale_label = st.sidebar.selectbox(
+            "Fleet Scale",
+            list(fleet_scales.keys()),
+            key="fleet_scale_label",
+            help="Simulate a production-sized fleet across ports and sea lanes for load testing"
+        )
+        st.session_state.fleet_scale = fleet_scales[scale_label]
+        
+        if st.sidebar.button("🔄 Refresh Vessel Snapshot", help="Ask the background scheduler for a new snapshot now"):
+            self.services.scheduler.request_refresh(self.services.get_fleet_source(st.session_state.fleet_scale))
+        
+        with st.sidebar.expander("📡 Data Feeds"):
+            for feed in self.services.scheduler.get_status():
+                age = f"{feed['age_s']:.0f}s ago" if feed['age_s'] is not None else "pending"
+                st.caption(f"**{feed['source']}** • v{feed['version']} • {age} • every {feed['interval_s']}s")
+                if feed['error']:
+                    st.caption(f"⚠️ {feed['error']}")
         
         # Logout
         if st.sidebar.button("🚪 Logout"):
             st.session_state.authenticated = False
             st.rerun()
     
+    def get_render_cache(self):
+        """Render cache shared across sessions (keys carry the snapshot version)"""
+        return self.services.render_cache
+    
+    def get_current_port_ships(self):
+        """Ships at the selected port from the session snapshot"""
+        return self.get_fleet_store().get_port_frame(self.current_port).to_dict('records')
+    
+    @st.fragment
     def show_business_metrics(self):
         """Business metrics cards"""
-        ships_data = self.port_system.get_port_ships(self.current_port)
+        ships_data = self.get_current_port_ships()
         total_value = sum(ship.get('Cargo_Value_M', 0) for ship in ships_data)
         
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
@@ -1020,31 +3426,74 @@ class SkyWatchEnterprise:
         st.metric("Cargo Value", f"${total_value}M", "+12%")
         st.markdown('</div>', unsafe_allow_html=True)
     
+    @st.fragment
     def show_ai_predictions(self):
         """AI prediction cards"""
-        congestion_pred = self.predictive_ai.predict_port_congestion(self.current_port)
+        congestion_pred = self.get_congestion_forecast()
         
         st.markdown('<div class="prediction-card">', unsafe_allow_html=True)
         st.metric("Port Congestion", f"{congestion_pred['congestion_level']*100:.0f}%")
         st.write(f"Trend: {congestion_pred['trend'].title()}")
         st.markdown('</div>', unsafe_allow_html=True)
     
+    def get_port_calls(self):
+        """Port calls measured for the session's fleet"""
+        if 'fleet_store' in st.session_state:
+            return self.services.get_pinned_state(st.session_state.fleet_store)['port_calls']
+        scale = st.session_state.get('fleet_scale')
+        return self.services.get_port_calls(self.services.get_fleet_source(scale), scale)
+    
+    def get_alert_stream(self):
+        """Deduplicated alerts for the session's fleet, evaluated when its snapshots are built"""
+        if 'fleet_store' in st.session_state:
+            return self.services.get_pinned_state(st.session_state.fleet_store)['alert_stream']
+        return self.services.get_alert_stream(self.services.get_fleet_source(st.session_state.get('fleet_scale')))
+    
+    def get_geofence(self):
+        """Zone membership and events for the session's fleet"""
+        if 'fleet_store' in st.session_state:
+            return self.services.get_pinned_state(st.session_state.fleet_store)['geofence']
+        return self.services.get_geofence(self.services.get_fleet_source(st.session_state.get('fleet_scale')))
+    
+    def get_congestion_forecast(self):
+        """Congestion outlook for the selected port from the simulated berth queues"""
+        queue_forecast = self.services.get_queue_forecast(self.get_fleet_store(), self.get_port_calls())
+        return self.predictive_ai.predict_port_congestion(self.current_port, queue_forecast=queue_forecast)
+    
+    @st.fragment
     def show_port_efficiency(self):
-        """Port efficiency metrics"""
+        """Port efficiency metrics measured from completed port calls"""
+        metrics = self.get_port_calls().get_port_metrics(self.current_port)
+        
         st.markdown('<div class="metric-card">', unsafe_allow_html=True)
-        st.metric("Port Efficiency", "87%", "+5%")
-        st.metric("Avg Turnaround", "18h", "-2h")
+        if metrics is None:
+            st.metric("Port Efficiency", "—")
+            st.metric("Avg Turnaround", "—")
+            st.caption("No completed port calls recorded yet")
+        else:
+            st.metric("Port Efficiency", f"{metrics['Efficiency']:.0f}%", help="Share of time in port spent at berth")
+            st.metric("Avg Turnaround", f"{metrics['Avg_Turnaround_h']:.1f}h", help=f"Across {metrics['Calls']} completed calls")
         st.markdown('</div>', unsafe_allow_html=True)
     
+    @st.fragment
     def show_risk_alerts(self):
         """Risk and alert cards"""
-        ships_data = self.port_system.get_port_ships(self.current_port)
-        anomalies = self.predictive_ai.detect_anomalies(ships_data)
+        alert_stream = self.get_alert_stream()
         
         st.markdown('<div class="alert-card">', unsafe_allow_html=True)
-        st.metric("Active Alerts", len(anomalies))
-        if anomalies:
-            st.write(f"Latest: {anomalies[0]['type']}")
+        alert_threshold = st.slider(
+            "Alert Sensitivity", 1, 10, 7, key="alert_threshold",
+            help="Lower values only show the strongest anomalies (scored 0-10)"
+        )
+        min_score = alert_stream.get_min_score(alert_threshold)
+        counts = alert_stream.get_counts(self.current_port, min_score=min_score)
+        top = alert_stream.get_alerts(self.current_port, limit=1, min_score=min_score)
+        st.metric(
+            "Active Alerts", sum(counts.values()),
+            help=" • ".join(f"{count} {level.lower()}" for level, count in counts.items())
+        )
+        if len(top):
+            st.write(f"Top: {top.iloc[0]['Type']}")
         st.markdown('</div>', unsafe_allow_html=True)
     
     def show_global_real_time_map(self):
@@ -1136,7 +3585,7 @@ class SkyWatchEnterprise:
                 margin={"r":0,"t":50,"l":0,"b":0}
             )
             
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, width="stretch")
             
             # Global statistics
             st.subheader("📊 Global Shipping Intelligence")
@@ -1175,7 +3624,7 @@ class SkyWatchEnterprise:
                 names=list(regional_data.keys()),
                 title="Vessels by Region"
             )
-            st.plotly_chart(fig_regional, use_container_width=True)
+            st.plotly_chart(fig_regional, width="stretch")
             
             # Real-time ship table
             st.subheader("📋 Live Vessel Feed")
@@ -1194,599 +3643,659 @@ class SkyWatchEnterprise:
                     'Last Update': ship['Timestamp']
                 })
             
-            st.dataframe(pd.DataFrame(display_data), use_container_width=True)
+            st.dataframe(pd.DataFrame(display_data), width="stretch")
             
         else:
             st.warning("No ship data available. Please check the data sources.")
     
+    @st.fragment
     def show_global_overview(self):
         """Global overview with real-time world map"""
         
-        tab1, tab2, tab3 = st.tabs(["🗺️ Live World Map", "📡 Satellite Network", "📊 Port Analytics"])
+        self.render_views([
+            ("🗺️ Live World Map", self.show_world_map),
+            ("📡 Satellite Network", self.show_satellite_network),
+            ("📊 Port Analytics", self.show_port_analytics)
+        ], key="overview_view")
+    
+    def build_world_map_figure(self, all_ships_df):
+        """Global vessel map with port markers"""
+        # Create unique color mapping for ship types
+        ship_type_colors = {
+            'Container': '#FF6B6B',
+            'Tanker': '#4ECDC4', 
+            'Bulk Carrier': '#45B7D1',
+            'Cargo': '#96CEB4',
+            'Ro-Ro': '#FFEAA7',
+            'Vehicle Carrier': '#DDA0DD',
+            'General Cargo': '#98D8C8'
+        }
         
-        with tab1:
-            st.subheader("🌍 Global Real-Time Shipping Network")
-            
-            # Create a massive dataset of ships across all ports
-            all_ships = []
-            for port_name in self.port_system.ports.keys():
-                port_ships = self.port_system.get_port_ships(port_name)
-                all_ships.extend(port_ships)
+        # Create the global map with open-street-map (no token needed), at the tracker's positions
+        prefix = 'Filtered_' if 'Filtered_Latitude' in all_ships_df else ''
+        fig = px.scatter_mapbox(
+            all_ships_df,
+            lat=prefix + "Latitude",
+            lon=prefix + "Longitude",
+            hover_name="Name",
+            hover_data={
+                "Type": True,
+                "Company": True,
+                "Speed": True,
+                "Port": True,
+                "Cargo_Value_M": True,
+                "Timestamp": True
+            },
+            color="Type",
+            color_discrete_map=ship_type_colors,
+            zoom=1,
+            height=600,
+            title="🚢 LIVE GLOBAL SHIPPING NETWORK - Real-Time Vessel Tracking"
+        )
+        
+        # Add port locations as larger points
+        port_df = pd.DataFrame([
+            {
+                'Port': name, 
+                'Latitude': data['lat'], 
+                'Longitude': data['lon'], 
+                'Country': data['country'],
+                'Volume': data['volume'],
+                'Size': 20 if data['volume'] in ['Very High', 'High'] else 15
+            }
+            for name, data in self.port_system.ports.items()
+        ])
+        
+        # Add ports to the map as a separate trace
+        fig.add_trace(
+            go.Scattermapbox(
+                lat=port_df["Latitude"],
+                lon=port_df["Longitude"],
+                mode='markers',
+                marker=dict(
+                    size=port_df["Size"],
+                    color='red',
+                    opacity=0.7
+                ),
+                text=port_df["Port"],
+                hoverinfo='text',
+                name="Ports"
+            )
+        )
+        
+        # Use open-street-map to avoid token issues
+        fig.update_layout(
+            mapbox_style="open-street-map",
+            mapbox=dict(
+                center=dict(lat=20, lon=0),
+                zoom=1
+            ),
+            showlegend=True,
+            legend=dict(
+                yanchor="top",
+                y=0.99,
+                xanchor="left",
+                x=0.01,
+                bgcolor="rgba(255,255,255,0.8)"
+            ),
+            margin={"r":0,"t":50,"l":0,"b":0},
+            height=600
+        )
+        
+        return fig
+    
+    def show_world_map(self):
+        """Global map, statistics and vessel feed for the whole fleet"""
+        st.subheader("🌍 Global Real-Time Shipping Network")
+        
+        # Shared snapshot of ships across all ports
+        fleet_store = self.get_fleet_store()
+        
+        if len(fleet_store):
+            all_ships_df = fleet_store.frame
             
-            if all_ships:
-                all_ships_df = pd.DataFrame(all_ships)
-                
-                # Create unique color mapping for ship types
-                ship_type_colors = {
-                    'Container': '#FF6B6B',
-                    'Tanker': '#4ECDC4', 
-                    'Bulk Carrier': '#45B7D1',
-                    'Cargo': '#96CEB4',
-                    'Ro-Ro': '#FFEAA7',
-                    'Vehicle Carrier': '#DDA0DD',
-                    'General Cargo': '#98D8C8'
-                }
-                
-                # Create the global map with open-street-map (no token needed)
-                fig = px.scatter_mapbox(
-                    all_ships_df,
-                    lat="Latitude",
-                    lon="Longitude",
-                    hover_name="Name",
-                    hover_data={
-                        "Type": True,
-                        "Company": True,
-                        "Speed": True,
-                        "Port": True,
-                        "Cargo_Value_M": True,
-                        "Timestamp": True
-                    },
-                    color="Type",
-                    color_discrete_map=ship_type_colors,
-                    zoom=1,
-                    height=600,
-                    title="🚢 LIVE GLOBAL SHIPPING NETWORK - Real-Time Vessel Tracking"
-                )
-                
-                # Add port locations as larger points
-                port_df = pd.DataFrame([
-                    {
-                        'Port': name, 
-                        'Latitude': data['lat'], 
-                        'Longitude': data['lon'], 
-                        'Country': data['country'],
-                        'Volume': data['volume'],
-                        'Size': 20 if data['volume'] in ['Very High', 'High'] else 15
-                    }
-                    for name, data in self.port_system.ports.items()
-                ])
-                
-                # Add ports to the map as a separate trace
-                fig.add_trace(
-                    go.Scattermapbox(
-                        lat=port_df["Latitude"],
-                        lon=port_df["Longitude"],
-                        mode='markers',
-                        marker=dict(
-                            size=port_df["Size"],
-                            color='red',
-                            opacity=0.7
-                        ),
-                        text=port_df["Port"],
-                        hoverinfo='text',
-                        name="Ports"
-                    )
-                )
-                
-                # Use open-street-map to avoid token issues
-                fig.update_layout(
-                    mapbox_style="open-street-map",
-                    mapbox=dict(
-                        center=dict(lat=20, lon=0),
-                        zoom=1
-                    ),
-                    showlegend=True,
-                    legend=dict(
-                        yanchor="top",
-                        y=0.99,
-                        xanchor="left",
-                        x=0.01,
-                        bgcolor="rgba(255,255,255,0.8)"
-                    ),
-                    margin={"r":0,"t":50,"l":0,"b":0},
+            if self.use_webgl_map(len(all_ships_df)):
+                self.show_webgl_map("world_map", None, center=dict(lat=20, lon=0), zoom=1)
+            else:
+                fig = self.get_render_cache().get(
+                    "world_map", None, fleet_store.version,
+                    lambda: self.build_world_map_figure(all_ships_df),
                     height=600
                 )
                 
-                st.plotly_chart(fig, use_container_width=True)
-                
-                # Global statistics
-                st.subheader("📊 Global Shipping Intelligence")
-                
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    total_ships = len(all_ships)
-                    st.metric("Total Active Vessels", f"{total_ships:,}")
-                
-                with col2:
-                    total_value = sum(ship.get('Cargo_Value_M', 0) for ship in all_ships)
-                    st.metric("Total Cargo Value", f"${total_value:,.0f}M")
-                
-                with col3:
-                    avg_speed = np.mean([ship.get('Speed', 0) for ship in all_ships])
-                    st.metric("Avg Speed", f"{avg_speed:.1f} knots")
-                
-                with col4:
-                    container_ships = len([s for s in all_ships if s.get('Type') == 'Container'])
-                    st.metric("Container Ships", f"{container_ships:,}")
-                
-                # Regional breakdown
-                st.subheader("🌐 Regional Distribution")
-                
-                regional_data = {}
-                for ship in all_ships:
-                    port = ship.get('Port', 'Unknown')
-                    if port in self.port_system.ports:
-                        region = self.port_system.ports[port].get('region', 'Unknown')
-                        regional_data[region] = regional_data.get(region, 0) + 1
-                
-                # Create regional chart
-                if regional_data:
-                    fig_regional = px.pie(
+                st.plotly_chart(fig, width="stretch")
+            
+            # Global statistics
+            st.subheader("📊 Global Shipping Intelligence")
+            
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                total_ships = len(all_ships_df)
+                st.metric("Total Active Vessels", f"{total_ships:,}")
+            
+            with col2:
+                total_value = all_ships_df['Cargo_Value_M'].sum()
+                st.metric("Total Cargo Value", f"${total_value:,.0f}M")
+            
+            with col3:
+                avg_speed = all_ships_df['Speed'].mean()
+                st.metric("Avg Speed", f"{avg_speed:.1f} knots")
+            
+            with col4:
+                container_ships = int((all_ships_df['Type'] == 'Container').sum())
+                st.metric("Container Ships", f"{container_ships:,}")
+            
+            # Regional breakdown
+            st.subheader("🌐 Regional Distribution")
+            
+            port_regions = {name: data.get('region', 'Unknown') for name, data in self.port_system.ports.items()}
+            regional_data = all_ships_df['Port'].map(port_regions).value_counts().to_dict()
+            
+            # Create regional chart
+            if regional_data:
+                fig_regional = self.get_render_cache().get(
+                    "regional_pie", None, fleet_store.version,
+                    lambda: px.pie(
                         values=list(regional_data.values()),
                         names=list(regional_data.keys()),
                         title="Vessels by Region"
                     )
-                    st.plotly_chart(fig_regional, use_container_width=True)
-                
-                # Real-time ship table
-                st.subheader("📋 Live Vessel Feed")
-                
-                # Show most recent ships
-                display_data = []
-                for ship in all_ships[:20]:  # Show first 20 ships
-                    display_data.append({
-                        'Vessel': ship['Name'],
-                        'Type': ship['Type'],
-                        'Company': ship['Company'],
-                        'Port': ship['Port'],
-                        'Speed': f"{ship['Speed']} knots",
-                        'Cargo Value': f"${ship['Cargo_Value_M']}M",
-                        'Status': ship['Status'],
-                        'Last Update': ship['Timestamp']
-                    })
-                
-                st.dataframe(pd.DataFrame(display_data), use_container_width=True)
-                
-            else:
-                st.warning("No ship data available. Please check the data sources.")
-        
-        with tab2:
-            st.subheader("🛰️ Global Satellite Network")
-            
-            # Enhanced satellite network with better visibility
-            satellite_html = """
-            <div style="text-align: center; margin: 1rem 0;">
-                <div style="position: relative; width: 100%; height: 400px; background: linear-gradient(135deg, #0c0c2e 0%, #1a1a3e 100%); 
-                    border-radius: 15px; overflow: hidden; border: 2px solid rgba(102, 126, 234, 0.5); box-shadow: 0 8px 32px rgba(0,0,0,0.3);">
-                    <canvas id="satelliteNetwork" style="width: 100%; height: 100%;"></canvas>
-                </div>
-                <div style="margin-top: 1rem; color: #667eea; font-weight: bold;">
-                    🌐 LIVE SATELLITE NETWORK • REAL-TIME DATA TRANSMISSION
-                </div>
-            </div>
-            
-            <script>
-                class SatelliteNetwork {
-                    constructor() {
-                        this.canvas = document.getElementById('satelliteNetwork');
-                        this.ctx = this.canvas.getContext('2d');
-                        this.satellites = [];
-                        this.connections = [];
-                        this.dataPackets = [];
-                        
-                        this.init();
-                    }
-                    
-                    init() {
-                        this.resize();
-                        this.createSatellites();
-                        this.createConnections();
-                        this.animate();
-                        
-                        window.addEventListener('resize', () => this.resize());
-                    }
-                    
-                    resize() {
-                        this.canvas.width = this.canvas.offsetWidth;
-                        this.canvas.height = this.canvas.offsetHeight;
-                        this.satellites = [];
-                        this.connections = [];
-                        this.createSatellites();
-                        this.createConnections();
-                    }
-                    
-                    createSatellites() {
-                        const satelliteCount = 12;
-                        const padding = 100;
-                        
-                        for (let i = 0; i < satelliteCount; i++) {
-                            const angle = (i / satelliteCount) * Math.PI * 2;
-                            const radius = Math.min(this.canvas.width, this.canvas.height) / 2 - padding;
-                            
-                            this.satellites.push({
-                                x: this.canvas.width / 2 + Math.cos(angle) * radius,
-                                y: this.canvas.height / 2 + Math.sin(angle) * radius,
-                                size: 10,
-                                orbitSpeed: 0.0003 + Math.random() * 0.0003,
-                                orbitAngle: angle,
-                                orbitRadius: radius,
-                                color: this.getSatelliteColor(),
-                                pulsePhase: Math.random() * Math.PI * 2
-                            });
-                        }
-                        
-                        // Add central hub
-                        this.satellites.push({
-                            x: this.canvas.width / 2,
-                            y: this.canvas.height / 2,
-                            size: 15,
-                            orbitSpeed: 0,
-                            orbitAngle: 0,
-                            orbitRadius: 0,
-                            color: '#ff6b6b',
-                            pulsePhase: 0
-                        });
-                    }
-                    
-                    createConnections() {
-                        // Connect satellites to central hub
-                        for (let i = 0; i < this.satellites.length - 1; i++) {
-                            this.connections.push({
-                                from: i,
-                                to: this.satellites.length - 1,
-                                strength: 0.8,
-                                dataFlow: Math.random() * 0.03 + 0.01
-                            });
-                        }
-                        
-                        // Connect some satellites to each other
-                        for (let i = 0; i < this.satellites.length - 1; i++) {
-                            for (let j = i + 1; j < this.satellites.length - 1; j++) {
-                                if (Math.random() > 0.6) {
-                                    this.connections.push({
-                                        from: i,
-                                        to: j,
-                                        strength: 0.4,
-                                        dataFlow: Math.random() * 0.02 + 0.005
-                                    });
-                                }
-                            }
-                        }
-                    }
-                    
-                    getSatelliteColor() {
-                        const colors = ['#667eea', '#764ba2', '#f093fb', '#4fc3f7', '#81c784', '#fff176', '#ff6b6b', '#45b7d1'];
-                        return colors[Math.floor(Math.random() * colors.length)];
-                    }
-                    
-                    animate() {
-                        // Clear with gradient background
-                        const gradient = this.ctx.createLinearGradient(0, 0, this.canvas.width, this.canvas.height);
-                        gradient.addColorStop(0, 'rgba(12, 12, 46, 0.8)');
-                        gradient.addColorStop(1, 'rgba(26, 26, 62, 0.8)');
-                        this.ctx.fillStyle = gradient;
-                        this.ctx.fillRect(0, 0, this.canvas.width, this.canvas.height);
-                        
-                        this.updateSatellites();
-                        this.drawConnections();
-                        this.drawSatellites();
-                        this.drawDataFlow();
-                        
-                        requestAnimationFrame(() => this.animate());
-                    }
-                    
-                    updateSatellites() {
-                        this.satellites.forEach((sat, index) => {
-                            if (sat.orbitSpeed > 0) {
-                                sat.orbitAngle += sat.orbitSpeed;
-                                sat.x = this.canvas.width / 2 + Math.cos(sat.orbitAngle) * sat.orbitRadius;
-                                sat.y = this.canvas.height / 2 + Math.sin(sat.orbitAngle) * sat.orbitRadius;
-                            }
-                            
-                            sat.pulsePhase += 0.03;
-                        });
-                    }
-                    
-                    drawConnections() {
-                        this.connections.forEach(conn => {
-                            const from = this.satellites[conn.from];
-                            const to = this.satellites[conn.to];
-                            
-                            // Animated connection line
-                            const gradient = this.ctx.createLinearGradient(from.x, from.y, to.x, to.y);
-                            gradient.addColorStop(0, `${from.color}66`);
-                            gradient.addColorStop(1, `${to.color}66`);
-                            
-                            this.ctx.strokeStyle = gradient;
-                            this.ctx.lineWidth = 1.5;
-                            this.ctx.setLineDash([5, 5]);
-                            this.ctx.beginPath();
-                            this.ctx.moveTo(from.x, from.y);
-                            this.ctx.lineTo(to.x, to.y);
-                            this.ctx.stroke();
-                            this.ctx.setLineDash([]);
-                            
-                            // Occasionally send data packets
-                            if (Math.random() < conn.dataFlow) {
-                                this.createDataPacket(conn.from, conn.to);
-                            }
-                        });
-                    }
-                    
-                    drawSatellites() {
-                        this.satellites.forEach(satellite => {
-                            const pulse = Math.sin(satellite.pulsePhase) * 0.4 + 0.6;
-                            
-                            // Satellite glow
-                            const gradient = this.ctx.createRadialGradient(
-                                satellite.x, satellite.y, 0,
-                                satellite.x, satellite.y, satellite.size * 5
-                            );
-                            gradient.addColorStop(0, `${satellite.color}${Math.floor(pulse * 150).toString(16).padStart(2, '0')}`);
-                            gradient.addColorStop(0.7, `${satellite.color}33`);
-                            gradient.addColorStop(1, `${satellite.color}00`);
-                            
-                            this.ctx.fillStyle = gradient;
-                            this.ctx.beginPath();
-                            this.ctx.arc(satellite.x, satellite.y, satellite.size * 5, 0, Math.PI * 2);
-                            this.ctx.fill();
-                            
-                            // Satellite body
-                            this.ctx.fillStyle = satellite.color;
-                            this.ctx.beginPath();
-                            this.ctx.arc(satellite.x, satellite.y, satellite.size, 0, Math.PI * 2);
-                            this.ctx.fill();
-                            
-                            // Satellite details
-                            this.ctx.strokeStyle = '#ffffff';
-                            this.ctx.lineWidth = 1;
-                            this.ctx.beginPath();
-                            this.ctx.arc(satellite.x, satellite.y, satellite.size * 0.6, 0, Math.PI * 2);
-                            this.ctx.stroke();
-                        });
-                    }
-                    
-                    drawDataFlow() {
-                        // Update and draw data packets
-                        for (let i = this.dataPackets.length - 1; i >= 0; i--) {
-                            const packet = this.dataPackets[i];
-                            const from = this.satellites[packet.from];
-                            const to = this.satellites[packet.to];
-                            
-                            packet.progress += 0.015;
-                            
-                            if (packet.progress >= 1) {
-                                this.dataPackets.splice(i, 1);
-                                continue;
-                            }
-                            
-                            // Calculate current position
-                            const currentX = from.x + (to.x - from.x) * packet.progress;
-                            const currentY = from.y + (to.y - from.y) * packet.progress;
-                            
-                            // Draw data packet
-                            this.ctx.fillStyle = `rgba(102, 126, 234, ${1 - packet.progress * 0.7})`;
-                            this.ctx.beginPath();
-                            this.ctx.arc(currentX, currentY, 4, 0, Math.PI * 2);
-                            this.ctx.fill();
-                            
-                            // Draw packet trail
-                            this.ctx.strokeStyle = `rgba(102, 126, 234, ${0.4 * (1 - packet.progress)})`;
-                            this.ctx.lineWidth = 2;
-                            this.ctx.beginPath();
-                            this.ctx.moveTo(from.x, from.y);
-                            this.ctx.lineTo(currentX, currentY);
-                            this.ctx.stroke();
-                        }
-                    }
-                    
-                    createDataPacket(fromIndex, toIndex) {
-                        this.dataPackets.push({
-                            from: fromIndex,
-                            to: toIndex,
-                            progress: 0
-                        });
-                    }
-                }
-                
-                // Initialize satellite network when tab is visible
-                let satelliteInstance = null;
-                
-                function initSatelliteNetwork() {
-                    if (satelliteInstance) return;
-                    satelliteInstance = new SatelliteNetwork();
-                }
-                
-                // Initialize when tab is clicked or page loads
-                setTimeout(initSatelliteNetwork, 100);
-                
-                // Reinitialize on tab click
-                document.addEventListener('click', function() {
-                    setTimeout(initSatelliteNetwork, 50);
-                });
-            </script>
-            """
-            components.html(satellite_html, height=450)
-            
-            # Satellite status
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Active Satellites", "12", "Online")
-            with col2:
-                st.metric("Data Flow", "2.4 GB/s", "Optimal")
-            with col3:
-                st.metric("Coverage", "98.7%", "Global")
-            
-            # Port comparison table
-            st.subheader("🏆 Top Global Ports by Activity")
-            comparison_data = []
-            top_ports = list(self.port_system.ports.keys())[:8]  # Show top 8 ports
-            for port_name in top_ports:
-                ships = self.port_system.get_port_ships(port_name)
-                port_data = self.port_system.ports[port_name]
-                comparison_data.append({
-                    'Port': port_name,
-                    'Country': port_data['country'],
-                    'Region': port_data['region'],
-                    'Active Vessels': len(ships),
-                    'Traffic Volume': port_data['volume'],
-                    'Avg Cargo Value': f"${np.mean([s.get('Cargo_Value_M', 0) for s in ships]):.1f}M"
-                })
+                )
+                st.plotly_chart(fig_regional, width="stretch")
             
-            st.dataframe(pd.DataFrame(comparison_data), use_container_width=True)
-        
-        with tab3:
-            st.subheader("📈 Global Port Performance")
-            
-            # Create performance metrics
-            metrics_data = []
-            for port_name, port_data in list(self.port_system.ports.items())[:12]:
-                ships = self.port_system.get_port_ships(port_name)
-                metrics_data.append({
-                    'Port': port_name,
-                    'Region': port_data['region'],
-                    'Efficiency': f"{np.random.uniform(65, 95):.1f}%",
-                    'Congestion': f"{np.random.uniform(10, 80):.1f}%",
-                    'Ships Today': len(ships),
-                    'Avg Turnaround': f"{np.random.uniform(12, 48):.0f}h",
-                    'Volume Tier': port_data['volume']
-                })
+            # Real-time ship table
+            st.subheader("📋 Live Vessel Feed")
+            self.show_vessel_feed(fleet_store, key="global_feed")
             
-            st.dataframe(pd.DataFrame(metrics_data), use_container_width=True)
+        else:
+            st.warning("No ship data available. Please check the data sources.")
+    
+    def show_satellite_network(self):
+        """Satellite network animation and top port comparison"""
+        st.subheader("🛰️ Global Satellite Network")
+        
+        # Enhanced satellite network with better visibility
+        self.animations.create_satellite_network(*self.get_animation_settings())
+        
+        # Satellite status
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Active Satellites", "12", "Online")
+        with col2:
+            st.metric("Data Flow", "2.4 GB/s", "Optimal")
+        with col3:
+            st.metric("Coverage", "98.7%", "Global")
+        
+        # Port comparison table, from the live fleet snapshot
+        st.subheader("🏆 Top Global Ports by Activity")
+        by_port = self.services.get_fleet_summary(self.get_fleet_store(), self.get_port_calls())['Port']
+        top_ports = list(self.port_system.ports.keys())[:8]  # Show top 8 ports
+        comparison_data = []
+        for port_name in top_ports:
+            port_data = self.port_system.ports[port_name]
+            comparison_data.append({
+                'Port': port_name,
+                'Country': port_data['country'],
+                'Region': port_data['region'],
+                'Active Vessels': int(by_port.loc[port_name, 'Vessels']),
+                'Traffic Volume': port_data['volume'],
+                'Avg Cargo Value': f"${by_port.loc[port_name, 'Avg_Cargo_Value_M']:.1f}M"
+            })
+        
+        st.dataframe(pd.DataFrame(comparison_data), width="stretch")
+    
+    def show_port_analytics(self):
+        """Performance table for the leading ports"""
+        st.subheader("📈 Global Port Performance")
+        
+        # Vessels from the live snapshot, congestion from the berth queue forecast,
+        # efficiency and turnaround measured from port calls
+        fleet_store = self.get_fleet_store()
+        port_calls = self.get_port_calls()
+        by_port = self.services.get_fleet_summary(fleet_store, port_calls)['Port']
+        queue_forecast = self.services.get_queue_forecast(fleet_store, port_calls)
+        metrics_data = []
+        for port_name, port_data in list(self.port_system.ports.items())[:12]:
+            measured = port_calls.get_port_metrics(port_name)
+            metrics_data.append({
+                'Port': port_name,
+                'Region': port_data['region'],
+                'Efficiency': f"{measured['Efficiency']:.1f}%" if measured else "—",
+                'Congestion': f"{queue_forecast.loc[port_name, 'congestion_level'] * 100:.1f}%",
+                'Active Vessels': int(by_port.loc[port_name, 'Vessels']),
+                'Avg Turnaround': f"{measured['Avg_Turnaround_h']:.1f}h" if measured else "—",
+                'Volume Tier': port_data['volume']
+            })
+        
+        st.dataframe(pd.DataFrame(metrics_data), width="stretch")
+    
+    def get_fleet_store(self):
+        """Latest fleet snapshot published by the background scheduler"""
+        # A snapshot pinned in the session (e.g. by the load test) takes precedence
+        if 'fleet_store' in st.session_state:
+            return st.session_state.fleet_store
+        try:
+            return self.services.get_fleet_store(st.session_state.get('fleet_scale'))
+        except RuntimeError as e:
+            st.error(f"⚠️ {e}. The scheduler retries on its next refresh, or use 🔄 Refresh Vessel Snapshot.")
+            st.stop()
+    
+    @st.fragment
+    def show_vessel_feed(self, fleet_store, key, port=None):
+        """Filtered, sorted and paginated vessel table (one page sent to the browser)"""
+        filter_cols = st.columns(5)
+        
+        with filter_cols[0]:
+            if port is None:
+                ports = st.multiselect("Port", fleet_store.get_options('Port'), key=f"{key}_port")
+            else:
+                ports = [port]
+                st.text_input("Port", port, disabled=True, key=f"{key}_port_fixed")
+        with filter_cols[1]:
+            ship_types = st.multiselect("Type", fleet_store.get_options('Type'), key=f"{key}_type")
+        with filter_cols[2]:
+            companies = st.multiselect("Company", fleet_store.get_options('Company'), key=f"{key}_company")
+        with filter_cols[3]:
+            statuses = st.multiselect("Status", fleet_store.get_options('Status'), key=f"{key}_status")
+        with filter_cols[4]:
+            max_speed = int(fleet_store.speed.max()) if len(fleet_store) else 0
+            speed_range = st.slider("Speed (knots)", 0, max(max_speed, 1), (0, max(max_speed, 1)), key=f"{key}_speed")
+        
+        sort_cols = st.columns(4)
+        with sort_cols[0]:
+            sort_by = st.selectbox("Sort by", FleetStore.SORT_COLUMNS, key=f"{key}_sort")
+        with sort_cols[1]:
+            ascending = st.toggle("Ascending", True, key=f"{key}_ascending")
+        with sort_cols[2]:
+            page_size = st.selectbox("Rows per page", [25, 50, 100], key=f"{key}_page_size")
+        with sort_cols[3]:
+            page = st.number_input("Page", min_value=1, value=1, step=1, key=f"{key}_page")
+        
+        result = fleet_store.query(
+            port=ports,
+            ship_type=ship_types,
+            company=companies,
+            status=statuses,
+            speed_range=speed_range,
+            sort_by=sort_by,
+            ascending=ascending,
+            page=page,
+            page_size=page_size
+        )
+        
+        rows = result['rows']
+        display_df = pd.DataFrame({
+            'Vessel': rows['Name'],
+            'Type': rows['Type'],
+            'Company': rows['Company'],
+            'Port': rows['Port'],
+            'Speed': rows['Speed'].astype(str) + " knots",
+            'Cargo Value': "$" + rows['Cargo_Value_M'].astype(str) + "M",
+            'Status': rows['Status'],
+            'Zone': rows['Zone'] if 'Zone' in rows else "",
+            'Last Update': rows['Timestamp']
+        })
+        
+        st.dataframe(display_df, width="stretch", hide_index=True)
+        st.caption(
+            f"Page {result['page']} of {result['pages']} • "
+            f"{result['total']:,} matching vessels • Snapshot v{result['version']}"
+        )
+    
+    def get_animation_settings(self):
+        """Animation mode and frame-rate cap chosen in the sidebar"""
+        return st.session_state.get('animation_mode', "Full"), st.session_state.get('animation_fps')
+    
+    def use_webgl_map(self, vessel_count):
+        """Whether to draw maps with the WebGL layer instead of Plotly"""
+        # Live position updates are only streamed to the WebGL layer
+        if st.session_state.get('live_mode'):
+            return True
+        renderer = st.session_state.get('map_renderer', "Auto")
+        if renderer == "Auto":
+            return vessel_count > 5000
+        return renderer == "WebGL (deck.gl)"
+    
+    def show_webgl_map(self, view, port, center, zoom):
+        """WebGL vessel map, re-run on its own timer while live mode is on"""
+        if st.session_state.get('live_mode'):
+            live_map = st.fragment(self.render_webgl_map, run_every=st.session_state.get('live_interval', 2))
+            live_map(view, port, center, zoom, live=True)
+        else:
+            self.render_webgl_map(view, port, center, zoom)
+    
+    def render_webgl_map(self, view, port, center, zoom, live=False):
+        """WebGL vessel map; vessel details are looked up only when one is clicked"""
+        fleet_store = self.get_fleet_store()
+        ships_df = fleet_store.frame if port is None else fleet_store.get_port_frame(port)
+        version = fleet_store.version
+        key = f"{view}_webgl"
+        
+        payload = self.get_render_cache().get(
+            key, port, version,
+            lambda: self.services.webgl_map.build_payload(ships_df, f"{port}:{version}")
+        )
+        
+        # A freshly mounted map only holds the snapshot, so deltas restart from it
+        if (st.session_state.get(key) or {}).get('base') != payload['version']:
+            st.session_state.pop(f"{key}_live_sent", None)
+        
+        delta = self.get_live_delta(fleet_store, ships_df, key) if live else None
+        selected = self.services.webgl_map.render(payload, key=key, center=center, zoom=zoom, delta=delta, live=live)
+        if selected is not None:
+            self.show_vessel_details(ships_df.iloc[selected])
+    
+    def get_live_delta(self, fleet_store, ships_df, key):
+        """Packed positions of vessels that moved visibly since the last live update"""
+        lat, lon = fleet_store.positions_at(ships_df, datetime.now())
+        
+        # Positions the browser holds, reset whenever a new snapshot is sent; taken from
+        # positions_at at the snapshot time so they match the deltas and the payload
+        sent = st.session_state.get(f"{key}_live_sent")
+        if sent is None or sent['version'] != fleet_store.version:
+            base_lat, base_lon = fleet_store.positions_at(ships_df, fleet_store.created_at)
+            sent = {'version': fleet_store.version, 'lat': base_lat, 'lon': base_lon}
+            st.session_state[f"{key}_live_sent"] = sent
+        
+        # ~10 m; anything smaller is not visible on the map
+        moved = np.flatnonzero((np.abs(lat - sent['lat']) > 1e-4) | (np.abs(lon - sent['lon']) > 1e-4))
+        sent['lat'][moved] = lat[moved]
+        sent['lon'][moved] = lon[moved]
+        
+        return self.services.webgl_map.build_delta(moved, lat[moved], lon[moved]) if len(moved) else None
+    
+    def show_vessel_details(self, ship):
+        """Detail card for a single vessel"""
+        st.markdown(f"#### 🚢 {ship['Name']}")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.write(f"**MMSI:** {ship['MMSI']}")
+            st.write(f"**Type:** {ship['Type']}")
+        with col2:
+            st.write(f"**Company:** {ship['Company']}")
+            st.write(f"**Status:** {ship['Status']}")
+        with col3:
+            st.write(f"**Speed:** {ship['Speed']} knots")
+            st.write(f"**Heading:** {ship.get('Course', 0)}°")
+        with col4:
+            st.write(f"**Port:** {ship['Port']}")
+            st.write(f"**Cargo Value:** ${ship['Cargo_Value_M']}M")
+    
+    def build_port_map_figure(self, ships_df, port_name):
+        """Vessel map for a single port, at the tracker's positions when available"""
+        prefix = 'Filtered_' if 'Filtered_Latitude' in ships_df else ''
+        fig = px.scatter_mapbox(
+            ships_df,
+            lat=prefix + "Latitude",
+            lon=prefix + "Longitude",
+            hover_name="Name",
+            hover_data=["Type", "Company", "Speed", "Status"],
+            color="Type",
+            zoom=12,
+            height=600,
+            title=f"Live Vessels - {port_name}"
+        )
+        fig.update_layout(mapbox_style="open-street-map")
+        return fig
     
+    @st.fragment
     def show_live_tracking(self):
         """Live ship tracking"""
         st.subheader(f"🚢 Live Vessel Tracking - {self.current_port}")
         
-        ships_data = self.port_system.get_port_ships(self.current_port)
+        fleet_store = self.get_fleet_store()
+        ships_df = fleet_store.get_port_frame(self.current_port)
         
-        if ships_data:
-            ships_df = pd.DataFrame(ships_data)
-            
+        if not ships_df.empty:
             # Interactive map
-            fig = px.scatter_mapbox(
-                ships_df,
-                lat="Latitude",
-                lon="Longitude",
-                hover_name="Name",
-                hover_data=["Type", "Company", "Speed", "Status"],
-                color="Type",
-                zoom=12,
-                height=600,
-                title=f"Live Vessels - {self.current_port}"
-            )
-            fig.update_layout(mapbox_style="open-street-map")
-            st.plotly_chart(fig, use_container_width=True)
+            if self.use_webgl_map(len(ships_df)):
+                port = self.port_system.ports[self.current_port]
+                self.show_webgl_map("port_map", self.current_port, center=dict(lat=port['lat'], lon=port['lon']), zoom=10)
+            else:
+                fig = self.get_render_cache().get(
+                    "port_map", self.current_port, fleet_store.version,
+                    lambda: self.build_port_map_figure(ships_df, self.current_port),
+                    zoom=12, height=600
+                )
+                st.plotly_chart(fig, width="stretch")
             
             # Vessel details
             st.subheader("📋 Vessel Details")
-            display_cols = ['Name', 'Company', 'Type', 'Speed', 'Status', 'Cargo_Value_M']
-            st.dataframe(ships_df[display_cols], use_container_width=True)
+            self.show_vessel_feed(fleet_store, key="port_feed", port=self.current_port)
+            
+            with st.expander("🚧 Zone Events"):
+                events = self.get_geofence().get_recent_events(self.current_port)
+                if events.empty:
+                    st.caption("No vessels have crossed a zone boundary at this port yet")
+                else:
+                    st.dataframe(events, width="stretch", hide_index=True)
+    
+    @st.fragment
+    def show_playback(self):
+        """Replay recorded positions at the selected port with a time slider"""
+        st.subheader(f"⏯️ Track Playback - {self.current_port}")
+        
+        history = self.services.get_history(st.session_state.get('fleet_scale'))
+        if history is None:
+            st.info("Position history is not recorded at this fleet scale")
+            return
+        
+        col1, col2, col3 = st.columns([2, 2, 1])
+        with col1:
+            window_hours = st.selectbox("Window", [1, 6, 24], index=2, format_func=lambda h: f"Last {h}h", key="playback_window")
+        with col2:
+            trail = st.slider("Trail (minutes)", 0, 30, 5, key="playback_trail")
+        with col3:
+            playing = st.toggle("▶️ Play", key="playback_playing", help="Advance one frame per second")
+        
+        # Bins are rebuilt only when new history lands, never per slider move
+        def build_bins():
+            end = datetime.now()
+            return PlaybackBins(history.query(
+                start=end - timedelta(hours=window_hours), end=end, port=self.current_port,
+                columns=['MMSI', 'Timestamp', 'Latitude', 'Longitude', 'Speed', 'Type']
+            ), simplifier=self.services.display_simplifier)
+        
+        bins = self.get_render_cache().get(
+            "playback_bins", self.current_port, (id(history), history.version), build_bins, hours=window_hours
+        )
+        
+        if len(bins) < 2:
+            st.info("Not enough recorded history yet; positions are recorded on every snapshot refresh")
+            return
+        
+        stats = history.get_stats()
+        if stats['rows_written']:
+            st.caption(f"History compression: {stats['rows_received']:,} reports stored as {stats['rows_written']:,} points "
+                       f"({stats['compression']:.1f}×, within {self.services.HISTORY_TOLERANCE_M:.0f} m)")
+        
+        # While playing, the frame view reruns on its own timer and steps one minute each time
+        frames = st.fragment(self.show_playback_frames, run_every=1 if playing else None)
+        frames(bins, trail, playing)
+    
+    def show_playback_frames(self, bins, trail, playing):
+        """Time slider and map for precomputed playback frames"""
+        labels = [pd.Timestamp(minute).strftime('%m-%d %H:%M') for minute in bins.minutes]
+        
+        position = st.session_state.get('playback_frame')
+        if playing:
+            st.session_state.playback_frame = labels[(labels.index(position) + 1) % len(labels)] if position in labels else labels[0]
+        elif position not in labels:
+            st.session_state.playback_frame = labels[-1]
+        
+        label = st.select_slider("Time", options=labels, key="playback_frame")
+        
+        frame = bins.get_frame(labels.index(label), trail)
+        port = self.port_system.ports[self.current_port]
+        colors = [WebGLFleetMap.SHIP_TYPE_COLORS.get(vessel_type, '#C8C8C8') for vessel_type in frame['type']]
+        
+        fig = go.Figure([
+            go.Scattermapbox(
+                lat=frame['trail']['lat'], lon=frame['trail']['lon'],
+                mode='lines', line=dict(width=2, color='rgba(102, 126, 234, 0.5)'),
+                hoverinfo='skip', name="Trail"
+            ),
+            go.Scattermapbox(
+                lat=frame['lat'], lon=frame['lon'],
+                mode='markers', marker=dict(size=9, color=colors),
+                text=[f"MMSI {mmsi} • {vessel_type} • {speed:.0f} kn" for mmsi, vessel_type, speed in zip(frame['mmsi'], frame['type'], frame['speed'])],
+                hoverinfo='text', name="Vessels"
+            )
+        ])
+        fig.update_layout(
+            mapbox=dict(style="open-street-map", center=dict(lat=port['lat'], lon=port['lon']), zoom=10),
+            height=600,
+            margin=dict(l=0, r=0, t=30, b=0),
+            showlegend=False,
+            title=f"{len(frame['lat'])} vessels at {frame['minute']:%Y-%m-%d %H:%M}",
+            uirevision=self.current_port  # keep the user's pan/zoom while scrubbing
+        )
+        st.plotly_chart(fig, width="stretch")
     
+    @st.fragment
     def show_analytics_dashboard(self):
         """Advanced analytics dashboard"""
         st.subheader("📈 Advanced Analytics")
         
-        ships_data = self.port_system.get_port_ships(self.current_port)
-        ships_df = pd.DataFrame(ships_data)
+        fleet_store = self.get_fleet_store()
+        ships_df = fleet_store.get_port_frame(self.current_port)
+        render_cache = self.get_render_cache()
         
         col1, col2 = st.columns(2)
         
         with col1:
             # Ship type distribution
             if not ships_df.empty:
-                type_counts = ships_df['Type'].value_counts()
-                fig_pie = px.pie(
-                    values=type_counts.values, 
-                    names=type_counts.index,
-                    title="Vessel Type Distribution"
-                )
-                st.plotly_chart(fig_pie, use_container_width=True)
+                def build_type_pie():
+                    type_counts = ships_df['Type'].value_counts()
+                    return px.pie(
+                        values=type_counts.values, 
+                        names=type_counts.index,
+                        title="Vessel Type Distribution"
+                    )
+                fig_pie = render_cache.get("type_pie", self.current_port, fleet_store.version, build_type_pie)
+                st.plotly_chart(fig_pie, width="stretch")
         
         with col2:
             # Company distribution
             if not ships_df.empty:
-                company_counts = ships_df['Company'].value_counts()
-                fig_bar = px.bar(
-                    x=company_counts.values,
-                    y=company_counts.index,
-                    orientation='h',
-                    title="Shipping Companies"
-                )
-                st.plotly_chart(fig_bar, use_container_width=True)
+                def build_company_bar():
+                    company_counts = ships_df['Company'].value_counts()
+                    return px.bar(
+                        x=company_counts.values,
+                        y=company_counts.index,
+                        orientation='h',
+                        title="Shipping Companies"
+                    )
+                fig_bar = render_cache.get("company_bar", self.current_port, fleet_store.version, build_company_bar)
+                st.plotly_chart(fig_bar, width="stretch")
         
-        # Time series simulation
+        # Recorded position history
         st.subheader("⏱️ Port Activity Timeline")
-        hours = list(range(24))
-        activity = [max(5, int(20 * (0.5 + 0.5 * np.sin(h/24 * 2 * np.pi)))) for h in hours]
         
-        fig_line = px.line(
-            x=hours, y=activity,
-            title="24-Hour Port Activity Pattern",
-            labels={'x': 'Hour of Day', 'y': 'Vessels in Port'}
-        )
-        st.plotly_chart(fig_line, use_container_width=True)
+        history = self.services.get_history(st.session_state.get('fleet_scale'))
+        if history is None:
+            st.info("Position history is not recorded at this fleet scale")
+            return
+        
+        activity = history.get_hourly_activity(self.current_port, datetime.now())
+        if activity.empty:
+            st.info("No recorded activity at this port in the last 24 hours")
+            return
+        
+        def build_activity_line():
+            return px.line(
+                x=activity.index, y=activity.values,
+                markers=True,
+                title="24-Hour Port Activity Pattern",
+                labels={'x': 'Hour', 'y': 'Vessels in Port'}
+            )
+        
+        fig_line = render_cache.get("activity_line", self.current_port, (id(history), history.version), build_activity_line)
+        st.plotly_chart(fig_line, width="stretch")
     
+    @st.fragment
     def show_ai_insights(self):
         """AI-powered insights"""
         st.subheader("🤖 AI Predictive Insights")
         
-        ships_data = self.port_system.get_port_ships(self.current_port)
-        
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown("#### 📊 Port Congestion Forecast")
-            congestion = self.predictive_ai.predict_port_congestion(self.current_port)
+            congestion = self.get_congestion_forecast()
             
             st.metric("Current Level", f"{congestion['congestion_level']*100:.0f}%")
             st.metric("Trend", congestion['trend'].title())
+            if 'expected_queue' in congestion:
+                st.metric(
+                    "Anchorage Queue", f"{congestion['expected_queue']:.1f} vessels",
+                    help=f"Simulated average over the next 24h; 90th percentile peak {congestion['queue_p90']:.0f} vessels"
+                )
+                st.metric("Expected Wait", f"{congestion['expected_wait_h']:.1f}h")
             st.write(f"**Recommendation:** {congestion['recommendation']}")
-            st.write(f"**Peak Hours:** {', '.join(congestion['peak_hours'])}")
+            if congestion.get('alternatives'):
+                st.write("**Alternatives:** " + ", ".join(
+                    f"{option['Port']} ({option['Distance_nm']:,.0f} nm, ~{option['Wait_h']:.0f}h wait)"
+                    for option in congestion['alternatives']
+                ))
+            st.write(f"**Peak Hours:** {', '.join(congestion['peak_hours']) or 'No queue expected'}")
         
         with col2:
             st.markdown("#### 🚨 Anomaly Detection")
-            anomalies = self.predictive_ai.detect_anomalies(ships_data)
+            alert_stream = self.get_alert_stream()
+            min_score = alert_stream.get_min_score(st.session_state.get('alert_threshold', 7))
+            alerts = alert_stream.get_alerts(self.current_port, limit=3, min_score=min_score)  # Show top 3
             
-            if anomalies:
-                for anomaly in anomalies[:3]:  # Show top 3
-                    st.warning(f"**{anomaly['type']}** - {anomaly['message']}")
+            if len(alerts):
+                for alert in alerts.to_dict('records'):
+                    repeats = f" (seen {alert['Count']}×)" if alert['Count'] > 1 else ""
+                    st.warning(f"**{alert['Type']}** [{alert['Severity']} • {alert['Score']:.1f}] {alert['Name']} - {alert['Message']}{repeats}")
+                    if st.button("Acknowledge", key=f"ack_{alert['Alert_ID']}"):
+                        alert_stream.acknowledge([alert['Alert_ID']], st.session_state.get('username', ""))
+                        st.rerun()
+                counts = alert_stream.get_counts(self.current_port, min_score=min_score)
+                st.caption(" • ".join(f"{level.title()}: {count}" for level, count in counts.items()))
             else:
                 st.success("✅ No anomalies detected")
         
         # ETA Predictions for sample ships
         st.markdown("#### ⏰ Arrival Predictions")
-        if ships_data:
-            sample_ships = ships_data[:3]  # Show predictions for first 3 ships
-            for ship in sample_ships:
-                eta_pred = self.predictive_ai.predict_ship_eta(ship, self.current_port)
-                
+        fleet_store = self.get_fleet_store()
+        sample_ships = fleet_store.get_inbound_frame(self.current_port).head(3)  # Show predictions for first 3 inbound ships
+        if not len(sample_ships):
+            st.caption("No vessels at sea inbound to this port")
+        else:
+            # One Monte Carlo batch for the sampled vessels, including simulated anchorage waits
+            etas = self.predictive_ai.predict_etas(
+                sample_ships, self.current_port,
+                queue_forecast=self.services.get_queue_forecast(fleet_store, self.get_port_calls())
+            )
+            # Vessels without an estimate (no sea route to the port) are left out
+            known = etas['ETA_P50'].notna()
+            if not known.any():
+                st.caption("No arrival estimates: no sea route to this port")
+            for (_, ship), (_, eta) in zip(sample_ships[known].iterrows(), etas[known].iterrows()):
                 col1, col2, col3 = st.columns(3)
                 with col1:
                     st.write(f"**{ship['Name']}**")
                 with col2:
-                    st.write(f"ETA: {eta_pred['eta']}")
+                    st.write(f"ETA: {eta['ETA_P50']:%Y-%m-%d %H:%M}")
                 with col3:
-                    st.write(f"Confidence: {eta_pred['confidence']}%")
+                    st.write(f"80% range: {eta['ETA_P10']:%H:%M} – {eta['ETA_P90']:%H:%M} ({eta['Hours_P10']:.1f}–{eta['Hours_P90']:.1f}h)")
     
+    @st.fragment
     def show_business_intelligence(self):
         """Business intelligence dashboard"""
         st.subheader("💼 Business Intelligence")
         
-        ships_data = self.port_system.get_port_ships(self.current_port)
-        
-        # ROI Calculator
+        self.show_roi_calculator()
+        self.show_executive_summary()
+    
+    @st.fragment
+    def show_roi_calculator(self):
+        """ROI calculator, rerun on its own when the slider moves"""
         st.markdown("#### 💰 ROI Calculator")
         efficiency_improvement = st.slider(
             "Expected Efficiency Improvement", 
@@ -1805,11 +4314,14 @@ class SkyWatchEnterprise:
             st.metric("Efficiency Gain", roi_data['efficiency_gain'])
         with col4:
             st.metric("ROI", roi_data['roi'])
+    
+    def show_executive_summary(self):
+        """Executive summary for the selected port, and every port, region and company side by side"""
+        fleet_summary = self.services.get_fleet_summary(self.get_fleet_store(), self.get_port_calls())
         
-        # Executive Summary
         st.markdown("#### 📋 Executive Summary")
         exec_summary = self.business_intel.generate_executive_summary(
-            self.current_port, ships_data
+            self.current_port, fleet_summary
         )
         
         col1, col2 = st.columns(2)
@@ -1820,23 +4332,65 @@ class SkyWatchEnterprise:
             st.metric("Port Efficiency", exec_summary['port_efficiency'])
             st.metric("Risk Level", exec_summary['risk_level'])
         
+        self.show_fleet_comparison(fleet_summary)
+        
+        # Published by the background scheduler; skipped until the first fetch lands
+        weather = self.services.scheduler.get_latest("weather", timeout=0)
+        economic = self.services.scheduler.get_latest("economic", timeout=0)
+        if weather and economic:
+            st.markdown("#### 🌤️ Operating Conditions")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Weather", weather['data']['conditions'], f"{weather['data']['temperature']}°C", delta_color="off")
+            with col2:
+                st.metric("GDP Growth", f"{economic['data']['gdp_growth']}%")
+            with col3:
+                st.metric("Trade Balance", f"${economic['data']['trade_balance']}B")
+            st.caption(f"Sources: {weather['data']['data_source']} • {economic['data']['data_source']}")
+        
         st.markdown("#### 💡 Strategic Recommendations")
         for i, recommendation in enumerate(exec_summary['recommendations'], 1):
             st.write(f"{i}. {recommendation}")
+    
+    @st.fragment
+    def show_fleet_comparison(self, fleet_summary):
+        """Side-by-side KPIs from the per-snapshot fleet summary; switching views costs nothing"""
+        st.markdown("#### 🌍 Global Comparison")
+        level = st.radio("Compare", ["Port", "Region", "Company"], horizontal=True, key="summary_level")
+        table = fleet_summary[level]
+        table = table[table['Vessels'] > 0].sort_values('Cargo_Value_M', ascending=False)
+        
+        if level == "Port":
+            default = [self.current_port] + [name for name in table.index[:3] if name != self.current_port]
+            selected = st.multiselect("Ports", list(table.index), default=[name for name in default if name in table.index][:4], key="summary_ports")
+            if selected:
+                table = table.loc[selected]
+        
+        st.dataframe(
+            table.rename(columns={
+                'Cargo_Value_M': 'Cargo Value ($M)', 'Avg_Cargo_Value_M': 'Avg Value ($M)',
+                'Avg_Speed': 'Avg Speed (kn)', 'Efficiency': 'Efficiency (%)', 'Risk_Level': 'Risk'
+            }),
+            width="stretch"
+        )
+        st.caption(f"Snapshot v{fleet_summary['version']} • efficiency is measured from completed port calls")
 
 # =============================================================================
 # RUN THE ENTERPRISE APPLICATION WITH PREMIUM ANIMATIONS
 # =============================================================================
 
 def main():
-    # Initialize premium animations
-    premium_animations = PremiumCanvasAnimations()
+    # Services are built on the first run in this process and reused afterwards
+    services = get_shared_services()
     
-    # Add cosmic starfield background
-    premium_animations.create_cosmic_starfield()
+    # Add cosmic starfield background (mode chosen in the sidebar on a previous run)
+    services.animations.create_cosmic_starfield(
+        st.session_state.get('animation_mode', "Full"),
+        st.session_state.get('animation_fps')
+    )
     
     # Run enterprise dashboard
-    enterprise_app = SkyWatchEnterprise()
+    enterprise_app = SkyWatchEnterprise(services)
     enterprise_app.run_enterprise_dashboard()
 
 if __name__ == "__main__":
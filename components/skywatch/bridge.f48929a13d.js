@@ -0,0 +1,119 @@
+// Minimal Streamlit component protocol: one iframe per key, scenes are
+// created on the first render and only receive new arguments afterwards.
+const Streamlit = {
+    send(type, data = {}) {
+        window.parent.postMessage(Object.assign({ isStreamlitMessage: true, type }, data), '*');
+    },
+
+    setFrameHeight(height) {
+        this.send('streamlit:setFrameHeight', { height });
+    },
+
+    setComponentValue(value) {
+        this.send('streamlit:setComponentValue', { value, dataType: 'json' });
+    }
+};
+
+// Glow sprites are rendered once and reused every frame
+function createSprite(size, draw) {
+    const sprite = typeof OffscreenCanvas !== 'undefined'
+        ? new OffscreenCanvas(size, size)
+        : Object.assign(document.createElement('canvas'), { width: size, height: size });
+    draw(sprite.getContext('2d'), size);
+    return sprite;
+}
+
+// requestAnimationFrame loop with a frame-rate cap, a static single-frame
+// mode and no drawing at all while the tab is hidden
+class AnimationLoop {
+    constructor(draw) {
+        this.draw = draw;
+        this.frameInterval = 0;
+        this.lastFrame = 0;
+        this.frameRequest = null;
+        this.fps = null;
+
+        document.addEventListener('visibilitychange', () => {
+            if (document.hidden) {
+                this.stop();
+            } else {
+                this.start();
+            }
+        });
+    }
+
+    configure(fps) {
+        this.fps = fps;
+        this.frameInterval = fps > 0 ? 1000 / fps : 0;
+
+        if (this.isStatic()) {
+            this.stop();
+            this.draw();
+        } else {
+            this.start();
+        }
+    }
+
+    isStatic() {
+        return this.fps === 0;
+    }
+
+    start() {
+        if (this.frameRequest || this.isStatic() || document.hidden) return;
+        this.frameRequest = requestAnimationFrame(t => this.tick(t));
+    }
+
+    stop() {
+        cancelAnimationFrame(this.frameRequest);
+        this.frameRequest = null;
+    }
+
+    tick(timestamp) {
+        this.frameRequest = requestAnimationFrame(t => this.tick(t));
+
+        // Frame-rate cap
+        if (timestamp - this.lastFrame < this.frameInterval) return;
+        this.lastFrame = timestamp;
+
+        this.draw();
+    }
+}
+
+window.SkyWatchScenes = window.SkyWatchScenes || {};
+
+let scene = null;
+let loading = null;
+let pendingArgs = null;
+
+function loadScene(name) {
+    return new Promise((resolve, reject) => {
+        const script = document.createElement('script');
+        script.src = window.SCENE_ASSETS[name];
+        script.onload = () => resolve(window.SkyWatchScenes[name]);
+        script.onerror = reject;
+        document.head.appendChild(script);
+    });
+}
+
+async function onRender(args) {
+    if (scene) {
+        scene.update(args);
+        return;
+    }
+
+    // Renders that arrive while the scene script loads collapse into the latest one
+    pendingArgs = args;
+    if (loading) return;
+
+    loading = loadScene(args.scene);
+    const Scene = await loading;
+    scene = new Scene(document.getElementById('root'), Streamlit, pendingArgs);
+}
+
+window.addEventListener('message', event => {
+    if (event.data.type === 'streamlit:render') {
+        onRender(event.data.args);
+    }
+});
+
+Streamlit.send('streamlit:componentReady', { apiVersion: 1 });
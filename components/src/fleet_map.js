@@ -0,0 +1,168 @@
+// deck.gl vessel layer fed with one packed binary buffer instead of per-point JSON
+const DECK_URL = 'https://unpkg.com/deck.gl@9.0.38/dist.min.js';
+let deckLoading = null;
+
+function loadDeck() {
+    if (window.deck) return Promise.resolve(window.deck);
+    if (!deckLoading) {
+        deckLoading = new Promise((resolve, reject) => {
+            const script = document.createElement('script');
+            script.src = DECK_URL;
+            script.onload = () => resolve(window.deck);
+            script.onerror = reject;
+            document.head.appendChild(script);
+        });
+    }
+    return deckLoading;
+}
+
+function hexToRgb(hex) {
+    const value = parseInt(hex.slice(1), 16);
+    return [(value >> 16) & 255, (value >> 8) & 255, value & 255];
+}
+
+// Column layout written by WebGLFleetMap.build_payload:
+// lon float32[n] | lat float32[n] | heading uint16[n] | type uint8[n] | speed uint8[n]
+function decodeFleet(bytes, length, palette) {
+    const buffer = bytes.slice().buffer;
+    const lon = new Float32Array(buffer, 0, length);
+    const lat = new Float32Array(buffer, length * 4, length);
+    const headings = new Uint16Array(buffer, length * 8, length);
+    const types = new Uint8Array(buffer, length * 10, length);
+    const speeds = new Uint8Array(buffer, length * 11, length);
+
+    const positions = new Float32Array(length * 2);
+    const colors = new Uint8Array(length * 3);
+    for (let i = 0; i < length; i++) {
+        positions[i * 2] = lon[i];
+        positions[i * 2 + 1] = lat[i];
+        const rgb = palette[types[i]] || [200, 200, 200];
+        colors[i * 3] = rgb[0];
+        colors[i * 3 + 1] = rgb[1];
+        colors[i * 3 + 2] = rgb[2];
+    }
+
+    return { length, positions, colors, types, headings, speeds };
+}
+
+// Live updates written by WebGLFleetMap.build_delta:
+// row uint32[m] | lon float32[m] | lat float32[m], absolute positions so re-applying is harmless
+function applyDelta(fleet, bytes) {
+    const count = bytes.byteLength / 12;
+    const buffer = bytes.slice().buffer;
+    const rows = new Uint32Array(buffer, 0, count);
+    const lon = new Float32Array(buffer, count * 4, count);
+    const lat = new Float32Array(buffer, count * 8, count);
+
+    for (let i = 0; i < count; i++) {
+        fleet.positions[rows[i] * 2] = lon[i];
+        fleet.positions[rows[i] * 2 + 1] = lat[i];
+    }
+    return count;
+}
+
+class FleetMap {
+    constructor(root, Streamlit, args) {
+        this.Streamlit = Streamlit;
+        this.container = document.createElement('div');
+        this.container.className = 'fleet-map';
+        root.appendChild(this.container);
+
+        this.deckInstance = null;
+        this.fleetVersion = null;
+        this.viewKey = null;
+        this.state = { base: null, selected: null, version: null };
+        this.update(args);
+    }
+
+    // The component value tells Python which snapshot this iframe holds and what was clicked
+    sendState(changes) {
+        Object.assign(this.state, changes);
+        this.Streamlit.setComponentValue(Object.assign({}, this.state));
+    }
+
+    async update(args) {
+        this.container.style.height = `${args.height}px`;
+        this.Streamlit.setFrameHeight(args.height);
+
+        const deck = await loadDeck();
+
+        // Positions are only re-decoded when the snapshot changes; live reruns omit the buffer
+        if (args.fleet && args.version !== this.fleetVersion) {
+            this.fleetVersion = args.version;
+            this.typeNames = args.type_names;
+            this.fleet = decodeFleet(args.fleet, args.count, args.type_colors.map(hexToRgb));
+            this.sendState({ base: this.fleetVersion, selected: null, version: null });
+        }
+        if (!this.fleet) return;
+
+        if (args.delta && args.version === this.fleetVersion) {
+            applyDelta(this.fleet, args.delta);
+        }
+
+        const fleet = this.fleet;
+        const layers = [
+            new deck.TileLayer({
+                id: 'basemap',
+                data: 'https://tile.openstreetmap.org/{z}/{x}/{y}.png',
+                minZoom: 0,
+                maxZoom: 19,
+                tileSize: 256,
+                renderSubLayers: props => {
+                    const [[west, south], [east, north]] = props.tile.boundingBox;
+                    return new deck.BitmapLayer(props, {
+                        data: null,
+                        image: props.data,
+                        bounds: [west, south, east, north]
+                    });
+                }
+            }),
+            new deck.ScatterplotLayer({
+                id: 'vessels',
+                // A fresh data object makes deck.gl re-upload the (possibly updated) positions
+                data: {
+                    length: fleet.length,
+                    attributes: {
+                        getPosition: { value: fleet.positions, size: 2 },
+                        getFillColor: { value: fleet.colors, size: 3, normalized: true }
+                    }
+                },
+                radiusUnits: 'pixels',
+                getRadius: 3,
+                radiusMinPixels: 2,
+                pickable: true,
+                onClick: info => this.sendState({ selected: info.index, version: this.fleetVersion })
+            })
+        ];
+
+        const getTooltip = ({ index, layer }) => {
+            if (!layer || layer.id !== 'vessels' || index < 0) return null;
+            return {
+                text: `${this.typeNames[fleet.types[index]]}\n` +
+                      `${fleet.speeds[index]} knots • heading ${fleet.headings[index]}°\n` +
+                      'Click for vessel details'
+            };
+        };
+
+        // The view only jumps when the requested center changes, not on every rerun
+        const viewKey = `${args.center.lat},${args.center.lon},${args.zoom}`;
+        const props = { layers, getTooltip };
+        if (viewKey !== this.viewKey) {
+            this.viewKey = viewKey;
+            props.initialViewState = {
+                longitude: args.center.lon,
+                latitude: args.center.lat,
+                zoom: args.zoom
+            };
+        }
+
+        // Reuse the WebGL context across reruns, only the layers change
+        if (!this.deckInstance) {
+            this.deckInstance = new deck.Deck(Object.assign({ parent: this.container, controller: true }, props));
+        } else {
+            this.deckInstance.setProps(props);
+        }
+    }
+}
+
+window.SkyWatchScenes.fleet_map = FleetMap;
@@ -0,0 +1,260 @@
+// Orbiting satellite network with a central hub and animated data packets
+class SatelliteNetwork {
+    constructor(root, Streamlit, args) {
+        root.innerHTML = `
+            <div class="satellite-panel">
+                <div class="satellite-frame"><canvas></canvas></div>
+                <div class="satellite-caption">🌐 LIVE SATELLITE NETWORK • REAL-TIME DATA TRANSMISSION</div>
+            </div>
+        `;
+
+        this.canvas = root.querySelector('canvas');
+        this.ctx = this.canvas.getContext('2d');
+        this.satellites = [];
+        this.connections = [];
+        this.dataPackets = [];
+        this.sprites = {};
+        this.config = args.config;
+        this.loop = new AnimationLoop(() => this.drawFrame());
+
+        this.resize();
+
+        window.addEventListener('resize', () => {
+            this.resize();
+            if (this.loop.isStatic()) this.drawFrame();
+        });
+
+        Streamlit.setFrameHeight(args.height);
+        this.loop.configure(this.config.fps);
+    }
+
+    // Later reruns only change the animation settings
+    update(args) {
+        const densityChanged = args.config.density !== this.config.density;
+        this.config = args.config;
+
+        if (densityChanged) {
+            this.connections = [];
+            this.createConnections();
+        }
+        this.loop.configure(this.config.fps);
+    }
+
+    resize() {
+        this.canvas.width = this.canvas.offsetWidth;
+        this.canvas.height = this.canvas.offsetHeight;
+        this.satellites = [];
+        this.connections = [];
+        this.background = null;
+        this.createSatellites();
+        this.createConnections();
+    }
+
+    // Pre-rendered glow per satellite color; pulsing only changes its alpha
+    getGlowSprite(color) {
+        if (!this.sprites[color]) {
+            this.sprites[color] = createSprite(128, (ctx, s) => {
+                const gradient = ctx.createRadialGradient(s / 2, s / 2, 0, s / 2, s / 2, s / 2);
+                gradient.addColorStop(0, `${color}96`);
+                gradient.addColorStop(0.7, `${color}33`);
+                gradient.addColorStop(1, `${color}00`);
+                ctx.fillStyle = gradient;
+                ctx.fillRect(0, 0, s, s);
+            });
+        }
+        return this.sprites[color];
+    }
+
+    createSatellites() {
+        const satelliteCount = 12;
+        const padding = 100;
+
+        for (let i = 0; i < satelliteCount; i++) {
+            const angle = (i / satelliteCount) * Math.PI * 2;
+            const radius = Math.min(this.canvas.width, this.canvas.height) / 2 - padding;
+
+            this.satellites.push({
+                x: this.canvas.width / 2 + Math.cos(angle) * radius,
+                y: this.canvas.height / 2 + Math.sin(angle) * radius,
+                size: 10,
+                orbitSpeed: 0.0003 + Math.random() * 0.0003,
+                orbitAngle: angle,
+                orbitRadius: radius,
+                color: this.getSatelliteColor(),
+                pulsePhase: Math.random() * Math.PI * 2
+            });
+        }
+
+        // Add central hub
+        this.satellites.push({
+            x: this.canvas.width / 2,
+            y: this.canvas.height / 2,
+            size: 15,
+            orbitSpeed: 0,
+            orbitAngle: 0,
+            orbitRadius: 0,
+            color: '#ff6b6b',
+            pulsePhase: 0
+        });
+    }
+
+    createConnections() {
+        const hub = this.satellites.length - 1;
+
+        // Connect satellites to central hub
+        for (let i = 0; i < hub; i++) {
+            this.connections.push({
+                from: i,
+                to: hub,
+                strength: 0.8,
+                dataFlow: (Math.random() * 0.03 + 0.01) * this.config.density
+            });
+        }
+
+        // Connect some satellites to each other
+        for (let i = 0; i < hub; i++) {
+            for (let j = i + 1; j < hub; j++) {
+                if (Math.random() > 0.6) {
+                    this.connections.push({
+                        from: i,
+                        to: j,
+                        strength: 0.4,
+                        dataFlow: (Math.random() * 0.02 + 0.005) * this.config.density
+                    });
+                }
+            }
+        }
+    }
+
+    getSatelliteColor() {
+        const colors = ['#667eea', '#764ba2', '#f093fb', '#4fc3f7', '#81c784', '#fff176', '#ff6b6b', '#45b7d1'];
+        return colors[Math.floor(Math.random() * colors.length)];
+    }
+
+    drawFrame() {
+        const isStatic = this.loop.isStatic();
+
+        // Clear with gradient background (cached until the canvas is resized)
+        if (!this.background) {
+            this.background = this.ctx.createLinearGradient(0, 0, this.canvas.width, this.canvas.height);
+            this.background.addColorStop(0, 'rgba(12, 12, 46, 0.8)');
+            this.background.addColorStop(1, 'rgba(26, 26, 62, 0.8)');
+        }
+        this.ctx.fillStyle = this.background;
+        this.ctx.fillRect(0, 0, this.canvas.width, this.canvas.height);
+
+        if (!isStatic) this.updateSatellites();
+        this.drawConnections(isStatic);
+        this.drawSatellites();
+        if (!isStatic) this.drawDataFlow();
+    }
+
+    updateSatellites() {
+        this.satellites.forEach(sat => {
+            if (sat.orbitSpeed > 0) {
+                sat.orbitAngle += sat.orbitSpeed;
+                sat.x = this.canvas.width / 2 + Math.cos(sat.orbitAngle) * sat.orbitRadius;
+                sat.y = this.canvas.height / 2 + Math.sin(sat.orbitAngle) * sat.orbitRadius;
+            }
+
+            sat.pulsePhase += 0.03;
+        });
+    }
+
+    drawConnections(isStatic) {
+        this.ctx.lineWidth = 1.5;
+        this.ctx.setLineDash([5, 5]);
+
+        this.connections.forEach(conn => {
+            const from = this.satellites[conn.from];
+            const to = this.satellites[conn.to];
+
+            // Animated connection line
+            const gradient = this.ctx.createLinearGradient(from.x, from.y, to.x, to.y);
+            gradient.addColorStop(0, `${from.color}66`);
+            gradient.addColorStop(1, `${to.color}66`);
+
+            this.ctx.strokeStyle = gradient;
+            this.ctx.beginPath();
+            this.ctx.moveTo(from.x, from.y);
+            this.ctx.lineTo(to.x, to.y);
+            this.ctx.stroke();
+
+            // Occasionally send data packets
+            if (!isStatic && Math.random() < conn.dataFlow) {
+                this.createDataPacket(conn.from, conn.to);
+            }
+        });
+
+        this.ctx.setLineDash([]);
+    }
+
+    drawSatellites() {
+        this.satellites.forEach(satellite => {
+            const pulse = Math.sin(satellite.pulsePhase) * 0.4 + 0.6;
+
+            // Satellite glow
+            const glow = satellite.size * 5;
+            this.ctx.globalAlpha = pulse;
+            this.ctx.drawImage(this.getGlowSprite(satellite.color), satellite.x - glow, satellite.y - glow, glow * 2, glow * 2);
+            this.ctx.globalAlpha = 1;
+
+            // Satellite body
+            this.ctx.fillStyle = satellite.color;
+            this.ctx.beginPath();
+            this.ctx.arc(satellite.x, satellite.y, satellite.size, 0, Math.PI * 2);
+            this.ctx.fill();
+
+            // Satellite details
+            this.ctx.strokeStyle = '#ffffff';
+            this.ctx.lineWidth = 1;
+            this.ctx.beginPath();
+            this.ctx.arc(satellite.x, satellite.y, satellite.size * 0.6, 0, Math.PI * 2);
+            this.ctx.stroke();
+        });
+    }
+
+    drawDataFlow() {
+        // Update and draw data packets
+        for (let i = this.dataPackets.length - 1; i >= 0; i--) {
+            const packet = this.dataPackets[i];
+            const from = this.satellites[packet.from];
+            const to = this.satellites[packet.to];
+
+            packet.progress += 0.015;
+
+            if (packet.progress >= 1) {
+                this.dataPackets.splice(i, 1);
+                continue;
+            }
+
+            // Calculate current position
+            const currentX = from.x + (to.x - from.x) * packet.progress;
+            const currentY = from.y + (to.y - from.y) * packet.progress;
+
+            // Draw data packet
+            this.ctx.fillStyle = `rgba(102, 126, 234, ${1 - packet.progress * 0.7})`;
+            this.ctx.beginPath();
+            this.ctx.arc(currentX, currentY, 4, 0, Math.PI * 2);
+            this.ctx.fill();
+
+            // Draw packet trail
+            this.ctx.strokeStyle = `rgba(102, 126, 234, ${0.4 * (1 - packet.progress)})`;
+            this.ctx.lineWidth = 2;
+            this.ctx.beginPath();
+            this.ctx.moveTo(from.x, from.y);
+            this.ctx.lineTo(currentX, currentY);
+            this.ctx.stroke();
+        }
+    }
+
+    createDataPacket(fromIndex, toIndex) {
+        this.dataPackets.push({
+            from: fromIndex,
+            to: toIndex,
+            progress: 0
+        });
+    }
+}
+
+window.SkyWatchScenes.satellite_network = SatelliteNetwork;
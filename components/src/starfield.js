@@ -0,0 +1,281 @@
+// Cosmic starfield background with nebulas, constellations and data particles
+class CosmicStarfield {
+    constructor(root, Streamlit, args) {
+        this.canvas = document.createElement('canvas');
+        this.canvas.className = 'cosmic-canvas';
+        root.appendChild(this.canvas);
+
+        this.ctx = this.canvas.getContext('2d');
+        this.stars = [];
+        this.meteors = [];
+        this.nebulas = [];
+        this.constellations = [];
+        this.sprites = {};
+        this.config = args.config;
+        this.loop = new AnimationLoop(() => this.drawFrame());
+
+        this.resize();
+        this.createNebulas();
+        this.createConstellations();
+
+        window.addEventListener('resize', () => {
+            this.resize();
+            if (this.loop.isStatic()) this.drawFrame();
+        });
+
+        Streamlit.setFrameHeight(args.height);
+        this.loop.configure(this.config.fps);
+    }
+
+    // Later reruns only change the animation settings
+    update(args) {
+        const densityChanged = args.config.density !== this.config.density;
+        this.config = args.config;
+
+        if (densityChanged) this.resize();
+        this.loop.configure(this.config.fps);
+    }
+
+    resize() {
+        this.canvas.width = window.innerWidth;
+        this.canvas.height = window.innerHeight;
+        this.stars = [];
+        this.createStars();
+    }
+
+    getSprite(color) {
+        if (!this.sprites[color]) {
+            this.sprites[color] = createSprite(64, (ctx, s) => {
+                const gradient = ctx.createRadialGradient(s / 2, s / 2, 0, s / 2, s / 2, s / 2);
+                gradient.addColorStop(0, color);
+                gradient.addColorStop(0.25, color);
+                gradient.addColorStop(1, 'rgba(0, 0, 0, 0)');
+                ctx.fillStyle = gradient;
+                ctx.fillRect(0, 0, s, s);
+            });
+        }
+        return this.sprites[color];
+    }
+
+    createStars() {
+        const starCount = Math.floor(
+            Math.min(400, Math.floor((this.canvas.width * this.canvas.height) / 3000)) * this.config.density
+        );
+
+        for (let i = 0; i < starCount; i++) {
+            this.stars.push({
+                x: Math.random() * this.canvas.width,
+                y: Math.random() * this.canvas.height,
+                size: Math.random() * 3 + 0.5,
+                speed: Math.random() * 0.8 + 0.1,
+                brightness: Math.random() * 0.8 + 0.2,
+                twinkleSpeed: Math.random() * 0.05 + 0.02,
+                twinkleOffset: Math.random() * Math.PI * 2,
+                color: this.getStarColor()
+            });
+        }
+    }
+
+    createNebulas() {
+        for (let i = 0; i < 3; i++) {
+            const color = this.getNebulaColor();
+            this.nebulas.push({
+                x: Math.random() * this.canvas.width,
+                y: Math.random() * this.canvas.height,
+                radius: Math.random() * 200 + 100,
+                sprite: createSprite(256, (ctx, s) => {
+                    const gradient = ctx.createRadialGradient(s / 2, s / 2, 0, s / 2, s / 2, s / 2);
+                    gradient.addColorStop(0, `rgba(${color}, 0.15)`);
+                    gradient.addColorStop(1, `rgba(${color}, 0.01)`);
+                    ctx.fillStyle = gradient;
+                    ctx.beginPath();
+                    ctx.arc(s / 2, s / 2, s / 2, 0, Math.PI * 2);
+                    ctx.fill();
+                }),
+                pulseSpeed: Math.random() * 0.002 + 0.001,
+                pulsePhase: Math.random() * Math.PI * 2
+            });
+        }
+    }
+
+    createConstellations() {
+        const constellationCount = 8;
+        for (let i = 0; i < constellationCount; i++) {
+            const starsInConstellation = Math.floor(Math.random() * 6) + 4;
+            const constellation = {
+                stars: [],
+                lines: [],
+                brightness: Math.random() * 0.3 + 0.7
+            };
+
+            // Create constellation stars
+            const baseX = Math.random() * this.canvas.width;
+            const baseY = Math.random() * this.canvas.height;
+
+            for (let j = 0; j < starsInConstellation; j++) {
+                constellation.stars.push({
+                    x: baseX + (Math.random() - 0.5) * 300,
+                    y: baseY + (Math.random() - 0.5) * 200,
+                    size: Math.random() * 2 + 1,
+                    brightness: Math.random() * 0.4 + 0.6
+                });
+            }
+
+            // Create constellation lines
+            for (let j = 0; j < starsInConstellation - 1; j++) {
+                for (let k = j + 1; k < starsInConstellation; k++) {
+                    if (Math.random() > 0.7) { // 30% chance to connect stars
+                        constellation.lines.push({
+                            from: j,
+                            to: k,
+                            brightness: Math.random() * 0.2 + 0.3
+                        });
+                    }
+                }
+            }
+
+            this.constellations.push(constellation);
+        }
+    }
+
+    getStarColor() {
+        const colors = [
+            '#ffffff', '#f8f7ff', '#e3f2fd', '#f3e5f5',
+            '#fff8e1', '#e8f5e8', '#ffebee', '#e0f2f1'
+        ];
+        return colors[Math.floor(Math.random() * colors.length)];
+    }
+
+    getNebulaColor() {
+        const colors = [
+            '102, 126, 234', '118, 75, 162',
+            '240, 147, 251', '79, 195, 247',
+            '129, 199, 132', '255, 183, 77'
+        ];
+        return colors[Math.floor(Math.random() * colors.length)];
+    }
+
+    drawFrame() {
+        const isStatic = this.loop.isStatic();
+
+        this.ctx.fillStyle = isStatic ? 'rgb(12, 12, 46)' : 'rgba(12, 12, 46, 0.05)';
+        this.ctx.fillRect(0, 0, this.canvas.width, this.canvas.height);
+
+        this.drawNebulas();
+        this.drawStars(isStatic);
+        this.drawConstellations();
+        if (!isStatic) this.drawDataParticles();
+        this.ctx.globalAlpha = 1;
+    }
+
+    drawNebulas() {
+        this.nebulas.forEach(nebula => {
+            const pulse = Math.sin(nebula.pulsePhase) * 0.5 + 0.5;
+            nebula.pulsePhase += nebula.pulseSpeed;
+
+            this.ctx.globalAlpha = pulse;
+            this.ctx.drawImage(
+                nebula.sprite,
+                nebula.x - nebula.radius, nebula.y - nebula.radius,
+                nebula.radius * 2, nebula.radius * 2
+            );
+        });
+    }
+
+    drawStars(isStatic) {
+        this.stars.forEach(star => {
+            const twinkle = Math.sin(star.twinkleOffset) * 0.3 + 0.7;
+            star.twinkleOffset += star.twinkleSpeed;
+
+            if (!isStatic) {
+                star.y += star.speed;
+                if (star.y > this.canvas.height) {
+                    star.y = 0;
+                    star.x = Math.random() * this.canvas.width;
+                }
+            }
+
+            // Star glow
+            const glow = star.size * 3;
+            this.ctx.globalAlpha = star.brightness * twinkle;
+            this.ctx.drawImage(this.getSprite(star.color), star.x - glow, star.y - glow, glow * 2, glow * 2);
+        });
+    }
+
+    drawConstellations() {
+        const sprite = this.getSprite('rgb(102, 126, 234)');
+
+        this.constellations.forEach(constellation => {
+            // Draw constellation lines
+            this.ctx.globalAlpha = 1;
+            constellation.lines.forEach(line => {
+                const fromStar = constellation.stars[line.from];
+                const toStar = constellation.stars[line.to];
+
+                this.ctx.strokeStyle = `rgba(102, 126, 234, ${line.brightness * 0.3})`;
+                this.ctx.lineWidth = 1;
+                this.ctx.beginPath();
+                this.ctx.moveTo(fromStar.x, fromStar.y);
+                this.ctx.lineTo(toStar.x, toStar.y);
+                this.ctx.stroke();
+            });
+
+            // Draw constellation stars
+            constellation.stars.forEach(star => {
+                const glow = star.size * 4;
+                this.ctx.globalAlpha = star.brightness;
+                this.ctx.drawImage(sprite, star.x - glow, star.y - glow, glow * 2, glow * 2);
+            });
+        });
+    }
+
+    drawDataParticles() {
+        this.ctx.globalAlpha = 1;
+
+        // Occasionally create data flow particles
+        if (Math.random() < 0.1 * this.config.density) {
+            this.createDataParticle();
+        }
+
+        // Update and draw data particles
+        for (let i = this.meteors.length - 1; i >= 0; i--) {
+            const meteor = this.meteors[i];
+
+            meteor.x += meteor.vx;
+            meteor.y += meteor.vy;
+            meteor.life -= 0.02;
+
+            if (meteor.life <= 0 || meteor.x < 0 || meteor.x > this.canvas.width ||
+                meteor.y < 0 || meteor.y > this.canvas.height) {
+                this.meteors.splice(i, 1);
+                continue;
+            }
+
+            // Draw meteor with trail
+            this.ctx.strokeStyle = `rgba(102, 126, 234, ${meteor.life})`;
+            this.ctx.lineWidth = 2;
+            this.ctx.beginPath();
+            this.ctx.moveTo(meteor.x, meteor.y);
+            this.ctx.lineTo(meteor.x - meteor.vx * 3, meteor.y - meteor.vy * 3);
+            this.ctx.stroke();
+
+            // Draw meteor head
+            this.ctx.beginPath();
+            this.ctx.arc(meteor.x, meteor.y, 2, 0, Math.PI * 2);
+            this.ctx.fillStyle = `rgba(255, 255, 255, ${meteor.life})`;
+            this.ctx.fill();
+        }
+    }
+
+    createDataParticle() {
+        this.meteors.push({
+            x: Math.random() * this.canvas.width,
+            y: 0,
+            vx: (Math.random() - 0.5) * 4,
+            vy: Math.random() * 3 + 2,
+            life: 1
+        });
+    }
+}
+
+window.SkyWatchScenes.starfield = CosmicStarfield;
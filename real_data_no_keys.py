@@ -88,14 +88,14 @@ class FreeRealData:
             # Using public weather APIs (no key required)
             # National Weather Service API - FREE, no key needed
             url = "https://api.weather.gov/points/40.68,-74.02"
-            response = requests.get(url, headers={'User-Agent': 'SkyWatchAI/1.0'})
+            response = requests.get(url, headers={'User-Agent': 'SkyWatchAI/1.0'}, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
                 forecast_url = data['properties']['forecast']
                 
                 # Get forecast data
-                forecast_response = requests.get(forecast_url, headers={'User-Agent': 'SkyWatchAI/1.0'})
+                forecast_response = requests.get(forecast_url, headers={'User-Agent': 'SkyWatchAI/1.0'}, timeout=10)
                 if forecast_response.status_code == 200:
                     forecast_data = forecast_response.json()
                     current_weather = forecast_data['properties']['periods'][0]
@@ -124,7 +124,7 @@ class FreeRealData:
         try:
             # World Bank API - FREE, no key needed
             url = "https://api.worldbank.org/v2/country/USA/indicator/NY.GDP.MKTP.CD?format=json&date=2023"
-            response = requests.get(url)
+            response = requests.get(url, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
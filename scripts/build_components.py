@@ -0,0 +1,67 @@
+import os
+import re
+import hashlib
+import argparse
+
+print("=" * 60)
+print("📦 SKYWATCH AI - COMPONENT BUNDLE BUILD")
+print("=" * 60)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_DIR = os.path.join(PROJECT_ROOT, "components", "src")
+BUILD_DIR = os.path.join(PROJECT_ROOT, "components", "skywatch")
+
+# index.html is served with no-cache; every other asset gets a content hash
+# in its name so browsers can keep it for as long as they like
+ASSETS = ["bridge.js", "starfield.js", "satellite_network.js", "fleet_map.js", "scenes.css"]
+
+HASHED_NAME = re.compile(r"^[a-z_]+\.[0-9a-f]{10}\.(js|css)$")
+
+def hashed_name(filename, content):
+    """Insert a short content hash before the file extension"""
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:10]}{ext}"
+
+def build(clean=True):
+    """Copy hashed assets into the bundle and point index.html at them"""
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    manifest = {}
+
+    for filename in ASSETS:
+        with open(os.path.join(SOURCE_DIR, filename), "rb") as f:
+            content = f.read()
+
+        manifest[filename] = hashed_name(filename, content)
+        with open(os.path.join(BUILD_DIR, manifest[filename]), "wb") as f:
+            f.write(content)
+        print(f"   ✅ {filename} -> {manifest[filename]}")
+
+    with open(os.path.join(SOURCE_DIR, "index.html"), encoding="utf-8") as f:
+        index_html = f.read()
+    for filename, name in manifest.items():
+        index_html = index_html.replace("{{" + filename + "}}", name)
+    with open(os.path.join(BUILD_DIR, "index.html"), "w", encoding="utf-8") as f:
+        f.write(index_html)
+
+    # Drop assets from previous builds
+    if clean:
+        current = set(manifest.values())
+        for filename in os.listdir(BUILD_DIR):
+            if HASHED_NAME.match(filename) and filename not in current:
+                os.remove(os.path.join(BUILD_DIR, filename))
+                print(f"   🗑️ removed stale {filename}")
+
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the static SkyWatch component bundle")
+    parser.add_argument("--keep-stale", action="store_true", help="Keep assets from previous builds")
+    args = parser.parse_args()
+
+    manifest = build(clean=not args.keep_stale)
+
+    print("\n📦 BUILD COMPLETE")
+    print(f"   {len(manifest)} assets written to {os.path.relpath(BUILD_DIR, PROJECT_ROOT)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os
+import sys
+import time
+import tracemalloc
+import argparse
+
+from streamlit.testing.v1 import AppTest
+
+# Make app.py importable from the scripts folder
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import app
+
+print("=" * 60)
+print("🧪 SKYWATCH AI - FLEET SCALE LOAD TEST")
+print("=" * 60)
+
+DEFAULT_SCALES = [10_000, 100_000, 1_000_000]
+
+VIEWS = [
+    "show_business_metrics",
+    "show_ai_predictions",
+    "show_port_efficiency",
+    "show_risk_alerts",
+    "show_global_overview",
+    "show_live_tracking",
+    "show_playback",
+    "show_analytics_dashboard",
+    "show_ai_insights",
+    "show_business_intelligence"
+]
+
+# Renders a single SkyWatchEnterprise view against a shared fleet snapshot
+VIEW_SCRIPT = """
+import sys
+sys.path.insert(0, {root!r})
+import streamlit as st
+import app
+
+st.session_state.fleet_scale = {scale}
+enterprise_app = app.SkyWatchEnterprise()
+getattr(enterprise_app, {view!r})()
+"""
+
+def measure_fleet_build(scale):
+    """Time and memory to simulate the fleet and build the columnar store"""
+    services = app.get_shared_services()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    fleet_store = app.FleetStore(services.port_system.simulate_fleet(scale), version=services.next_snapshot_version())
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return fleet_store, {
+        'build_s': elapsed,
+        'store_mb': fleet_store.frame.memory_usage(deep=True).sum() / 1e6,
+        'build_peak_mb': peak / 1e6
+    }
+
+def measure_view(view, scale, fleet_store, reruns, timeout):
+    """Time the first run and the steady-state reruns of one view"""
+    at = AppTest.from_string(VIEW_SCRIPT.format(root=PROJECT_ROOT, scale=scale, view=view), default_timeout=timeout)
+    at.session_state['username'] = 'loadtest'
+    at.session_state['fleet_store'] = fleet_store
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    at.run()
+    first_run = time.perf_counter() - start
+
+    rerun_times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        at.run()
+        rerun_times.append(time.perf_counter() - start)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'view': view,
+        'first_run_s': first_run,
+        'rerun_s': sorted(rerun_times)[len(rerun_times) // 2] if rerun_times else first_run,
+        'peak_mb': peak / 1e6,
+        'errors': len(at.exception)
+    }
+
+def run_load_test(scales, views, reruns, timeout):
+    """Measure every view at every fleet scale and print a report"""
+    results = []
+
+    for scale in scales:
+        print(f"\n🚢 FLEET SCALE: {scale:,} vessels")
+        fleet_store, build = measure_fleet_build(scale)
+        print(f"   Build: {build['build_s']:.2f}s • Store: {build['store_mb']:.1f} MB • Peak: {build['build_peak_mb']:.1f} MB")
+
+        for view in views:
+            try:
+                result = measure_view(view, scale, fleet_store, reruns, timeout)
+            except RuntimeError as e:
+                print(f"   ❌ {view}: {e}")
+                continue
+
+            result['scale'] = scale
+            results.append(result)
+            status = "✅" if result['errors'] == 0 else "❌"
+            print(
+                f"   {status} {view:<28} first {result['first_run_s']:7.2f}s  "
+                f"rerun {result['rerun_s']:7.2f}s  peak {result['peak_mb']:8.1f} MB"
+            )
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure dashboard rerun latency and memory at fleet scale")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--views", nargs="+", default=VIEWS, choices=VIEWS)
+    parser.add_argument("--reruns", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=600)
+    args = parser.parse_args()
+
+    results = run_load_test(args.scales, args.views, args.reruns, args.timeout)
+
+    print("\n📊 LOAD TEST COMPLETE")
+    print(f"   {len(results)} view measurements across {len(args.scales)} fleet scales")
+
+if __name__ == "__main__":
+    main()
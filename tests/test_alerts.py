@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import app
+
+
+class ReferenceStream:
+    """One open alert per (vessel, type), resolved after RESOLVE_MINUTES quiet, then suppressed"""
+
+    def __init__(self):
+        self.active = {}
+        self.suppressed_until = {}
+
+    def ingest(self, events, when):
+        for key, group in events.groupby(events['MMSI'] + "|" + events['Type']):
+            if key in self.active:
+                alert = self.active[key]
+                alert['Count'] += len(group)
+                alert['Score'] = max(alert['Score'], group['Score'].max())
+                alert['Last_Seen'] = when
+            elif self.suppressed_until.get(key, datetime.min) <= when:
+                self.active[key] = {'Count': len(group), 'Score': group['Score'].max(), 'Last_Seen': when}
+        for key, alert in list(self.active.items()):
+            if alert['Last_Seen'] < when - timedelta(minutes=app.AlertStream.RESOLVE_MINUTES):
+                self.suppressed_until[key] = alert['Last_Seen'] + timedelta(minutes=app.AlertStream.SUPPRESS_MINUTES)
+                del self.active[key]
+
+
+def make_events(rng, when, count):
+    score = np.round(rng.uniform(5, 10, count), 1)
+    return pd.DataFrame({
+        'Timestamp': when,
+        'MMSI': rng.choice(["1", "2", "3", "4", "5"], count),
+        'Name': "Vessel",
+        'Port': rng.choice(["Rotterdam", "Singapore"], count),
+        'Type': rng.choice(["TELEPORT", "SPEED_JUMP"], count),
+        'Score': score,
+        'Severity': app.StreamingAnomalyDetector(None).get_severity(score),
+        'Message': ""
+    })
+
+
+def test_dedup_matches_reference():
+    rng = np.random.default_rng(8)
+    stream, reference = app.AlertStream(), ReferenceStream()
+    when = datetime(2026, 1, 1)
+    for _ in range(200):
+        when += timedelta(minutes=int(rng.choice([1, 5, 10, 20, 40])))
+        events = make_events(rng, when, int(rng.integers(0, 4)))
+        stream.ingest(events, when)
+        reference.ingest(events, when)
+
+        active = stream.active.set_index(stream.active['MMSI'] + "|" + stream.active['Type'])
+        assert set(active.index) == set(reference.active)
+        for key, alert in reference.active.items():
+            assert active.loc[key, 'Count'] == alert['Count']
+            assert active.loc[key, 'Score'] == alert['Score']
+            assert active.loc[key, 'Last_Seen'] == alert['Last_Seen']
+    assert stream.stats['resolved'] and stream.stats['suppressed']
+
+
+def test_ranking_and_acknowledgment():
+    rng = np.random.default_rng(9)
+    stream = app.AlertStream()
+    when = datetime(2026, 1, 1)
+    stream.ingest(make_events(rng, when, 12), when)
+
+    alerts = stream.get_alerts()
+    assert (np.diff(alerts['Score'].to_numpy(dtype=float)) <= 0).all()
+    assert len(stream.get_alerts(min_score=8.0)) == int((stream.active['Score'] >= 8.0).sum())
+    for port in ["Rotterdam", "Singapore"]:
+        assert set(stream.get_alerts(port)['Alert_ID']) == set(alerts[alerts['Port'] == port]['Alert_ID'])
+
+    top = alerts['Alert_ID'].iloc[0]
+    assert stream.acknowledge([top], "ops") == 1
+    assert top not in set(stream.get_alerts()['Alert_ID'])
+    assert sum(stream.get_counts().values()) == len(alerts) - 1
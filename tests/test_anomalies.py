@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+import app
+
+
+def make_batch(mmsi, lat, lon):
+    return pd.DataFrame({
+        'MMSI': mmsi, 'Name': [f"Vessel {m}" for m in mmsi], 'Port': "New York",
+        'Latitude': lat, 'Longitude': lon, 'Speed': 12.0, 'Status': "Underway"
+    })
+
+
+def test_duplicate_ids_are_rejected_not_merged():
+    detector = app.StreamingAnomalyDetector(app.GlobalPortSystem())
+    start = datetime(2026, 1, 1)
+    detector.update(make_batch(["1", "2"], [40.0, 1.0], [-70.0, 103.0]), start)
+
+    # Vessel 2 reusing vessel 1's ID would read as a jump across oceans on every snapshot
+    with pytest.raises(ValueError):
+        detector.update(make_batch(["1", "1"], [40.0, 1.0], [-70.0, 103.0]), start + timedelta(minutes=1))
+    with pytest.raises(ValueError):
+        detector.update(make_batch(["3", "3"], [40.0, 1.0], [-70.0, 103.0]), start + timedelta(minutes=1))
+    assert list(detector.index) == ["1", "2"]
+
+    events = detector.update(make_batch(["1", "2"], [40.0, 1.0], [-70.0, 103.0]), start + timedelta(minutes=1))
+    assert 'TELEPORT' not in set(events['Type'])
+
+
+def test_snapshot_checks_share_event_schema_and_bands():
+    ports = app.GlobalPortSystem()
+    batch = make_batch(["1", "2", "3", "4"], [40.0, 40.1, 40.2, 40.3], [-70.0] * 4).assign(Speed=[1.0, 28.0, 34.0, 45.0])
+    events = app.PredictiveAI(ports).detect_snapshot_anomalies(batch, datetime(2026, 1, 1))
+    assert list(events.columns) == app.StreamingAnomalyDetector.EVENT_COLUMNS
+    assert dict(zip(events['MMSI'], events['Severity'])) == {"1": "LOW", "2": "LOW", "3": "MEDIUM", "4": "HIGH"}
+    assert list(events['Type']) == ['HIGH_SPEED'] * 3 + ['DRIFTING']
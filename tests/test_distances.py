@@ -0,0 +1,43 @@
+import heapq
+
+import numpy as np
+import pytest
+
+import app
+
+
+@pytest.fixture(scope='module')
+def network():
+    return app.SeaRouteNetwork(app.GlobalPortSystem())
+
+
+def dijkstra(network, start):
+    """Fastest transit hours from one node to every node"""
+    edges = network.edges
+    edge_hours = edges['nm'] / network.TRANSIT_SPEED_KN + edges['delay_h']
+    neighbours = [[] for _ in network.node_names]
+    for a, b, hours in zip(edges['a'], edges['b'], edge_hours):
+        neighbours[a].append((b, hours))
+        neighbours[b].append((a, hours))
+
+    best = np.full(len(network.node_names), np.inf)
+    best[start] = 0.0
+    frontier = [(0.0, start)]
+    while frontier:
+        hours, node = heapq.heappop(frontier)
+        if hours > best[node]:
+            continue
+        for neighbour, edge_hours in neighbours[node]:
+            if hours + edge_hours < best[neighbour]:
+                best[neighbour] = hours + edge_hours
+                heapq.heappush(frontier, (best[neighbour], neighbour))
+    return best
+
+
+def test_floyd_warshall_matches_dijkstra(network):
+    ports = len(network.port_names)
+    expected = np.array([dijkstra(network, port)[:ports] for port in range(ports)])
+    assert np.array_equal(np.isfinite(network.transit_hours), np.isfinite(expected))
+    finite = np.isfinite(expected)
+    assert np.allclose(network.transit_hours[finite], expected[finite])
+    assert np.allclose(network.transit_hours, network.transit_hours.T, equal_nan=True)
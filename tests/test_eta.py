@@ -0,0 +1,38 @@
+import pandas as pd
+import pytest
+
+import app
+
+
+@pytest.fixture(scope='module')
+def predictive_ai():
+    ports = app.GlobalPortSystem()
+    return app.PredictiveAI(ports, app.SeaRouteNetwork(ports))
+
+
+def test_unknown_destination_has_no_eta(predictive_ai):
+    ships = pd.DataFrame({
+        'Latitude': [40.0, 40.0], 'Longitude': [-70.0, -70.0], 'Speed': [12, 12], 'Destination': ["Atlantis", "New York"]
+    })
+    etas = predictive_ai.predict_etas(ships)
+    assert etas['ETA_P50'].isna().tolist() == [True, False]
+    assert etas.loc[1, 'Hours_P10'] <= etas.loc[1, 'Hours_P50'] <= etas.loc[1, 'Hours_P90']
+
+
+def test_inbound_vessels_have_a_spread_of_arrivals(predictive_ai):
+    ports = predictive_ai.port_system
+    store = app.FleetStore(ports.simulate_fleet(3000, seed=4, router=app.SeaRouter(predictive_ai.sea_routes)), 1)
+    frame = store.frame
+    store.frame['Zone'] = app.GeofenceEngine(ports.ports).update(frame['MMSI'], frame['Latitude'], frame['Longitude'], store.created_at)['zone']
+
+    inbound = store.get_inbound_frame("Singapore")
+    assert len(inbound)
+    assert (inbound['Destination'] == "Singapore").all() and (inbound['Status'] == "Underway").all()
+    assert (inbound['Zone'] == "At Sea").all()
+
+    # Vessels still at sea are some way out, so the Monte Carlo range has a width
+    etas = predictive_ai.predict_etas(inbound, "Singapore")
+    known = etas['Hours_P50'].notna()
+    assert known.any()
+    assert (etas['Hours_P10'][known] < etas['Hours_P90'][known]).all()
+    assert (etas['Distance_nm'][known] > 0).all()
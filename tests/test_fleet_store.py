@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+
+
+@pytest.fixture(scope='module')
+def fleet_store():
+    frame = app.GlobalPortSystem().simulate_fleet(3000, seed=21)
+    return app.FleetStore(frame, version=1)
+
+
+def reference_filter(frame, port=None, ship_type=None, company=None, status=None, speed_range=None):
+    """Plain pandas filtering, one column at a time"""
+    mask = pd.Series(True, index=frame.index)
+    for column, wanted in (('Port', port), ('Type', ship_type), ('Company', company), ('Status', status)):
+        if wanted:
+            mask &= frame[column].isin([wanted] if isinstance(wanted, str) else wanted)
+    if speed_range is not None:
+        mask &= frame['Speed'].between(*speed_range)
+    return mask.to_numpy()
+
+
+FILTERS = [
+    {},
+    {'port': "Singapore"},
+    {'ship_type': ["Container", "Tanker"], 'status': "Underway"},
+    {'company': ["Maersk", "MSC", "No Such Company"], 'speed_range': (5, 15)},
+    {'port': ["Rotterdam", "Hamburg"], 'ship_type': "Container", 'speed_range': (0, 0)},
+    {'port': "Atlantis"},
+]
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_filter_mask_matches_pandas(fleet_store, filters):
+    mask = fleet_store.filter_mask(**filters)
+    expected = reference_filter(fleet_store.frame, **filters)
+    if mask is None:
+        assert expected.all()
+    else:
+        assert np.array_equal(mask, expected)
+
+
+@pytest.mark.parametrize('column', app.FleetStore.SORT_COLUMNS)
+def test_sort_index_matches_pandas(fleet_store, column):
+    order = fleet_store.get_sort_index(column)
+    expected = fleet_store.frame.sort_values(column, kind='stable').index.to_numpy()
+    assert np.array_equal(order, expected)
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+@pytest.mark.parametrize('sort_by, ascending', [('Name', True), ('Speed', False), ('Port', True), ('Cargo_Value_M', False)])
+def test_query_pages_match_pandas(fleet_store, filters, sort_by, ascending):
+    frame = fleet_store.frame
+    expected = frame[reference_filter(frame, **filters)].sort_values(sort_by, kind='stable')
+    if not ascending:
+        expected = expected.iloc[::-1]
+
+    page_size = 40
+    pages = max(1, -(-len(expected) // page_size))
+    for page in [1, 2, pages, pages + 5]:
+        result = fleet_store.query(sort_by=sort_by, ascending=ascending, page=page, page_size=page_size, **filters)
+        shown = min(page, pages)
+        assert result['total'] == len(expected)
+        assert result['pages'] == pages and result['page'] == shown
+        assert result['version'] == 1
+        start = (shown - 1) * page_size
+        assert np.array_equal(result['rows'].index.to_numpy(), expected.index.to_numpy()[start:start + page_size])
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import app
+
+
+def contains(polygon, x, y):
+    """Even-odd ray casting, one edge at a time"""
+    inside = False
+    for (x1, y1), (x2, y2) in zip(polygon, np.roll(polygon, -1, axis=0)):
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
+@pytest.fixture(scope='module')
+def ports():
+    return app.GlobalPortSystem()
+
+
+@pytest.fixture(scope='module')
+def points(ports):
+    rng = np.random.default_rng(11)
+    names = rng.choice(list(ports.ports), 800)
+    lat = np.array([ports.ports[name]['lat'] for name in names]) + rng.normal(0, 0.08, len(names))
+    lon = np.array([ports.ports[name]['lon'] for name in names]) + rng.normal(0, 0.12, len(names))
+    return lat, lon
+
+
+def test_locate_matches_brute_force(ports, points):
+    geofence = app.GeofenceEngine(ports.ports)
+    lat, lon = points
+    point, zone = geofence.locate(lat, lon)
+    found = set(zip(point.tolist(), zone.tolist()))
+
+    polygons = [np.asarray(polygon, dtype=float) for port in ports.ports.values() for polygon in port['zones'].values()]
+    expected = {
+        (i, z) for i in range(len(lat)) for z, polygon in enumerate(polygons)
+        if contains(polygon, lon[i], lat[i])
+    }
+    assert found == expected
+    assert len(expected) > 300
+
+
+def test_classify_prefers_most_specific_zone(ports, points):
+    geofence = app.GeofenceEngine(ports.ports)
+    lat, lon = points
+    point, zone = geofence.locate(lat, lon)
+    best_zone, port = geofence.classify(lat, lon)
+    for i in range(len(lat)):
+        candidates = zone[point == i]
+        if not len(candidates):
+            assert best_zone[i] == -1 and port[i] == -1
+        else:
+            assert geofence.zone_rank[best_zone[i]] == geofence.zone_rank[candidates].max()
+            assert geofence.zone_port[best_zone[i]] == geofence.port_names[port[i]]
+
+
+def test_update_emits_enter_and_exit(ports):
+    geofence = app.GeofenceEngine(ports.ports)
+    port = ports.ports["Rotterdam"]
+    when = datetime(2026, 1, 1)
+    geofence.update(["1"], [port['lat'] + 5], [port['lon']], when)
+    entered = geofence.update(["1"], [port['lat']], [port['lon']], when + timedelta(minutes=10))
+    left = geofence.update(["1"], [port['lat'] + 5], [port['lon']], when + timedelta(minutes=20))
+    assert entered['zone'][0] == "Berth"
+    assert left['zone'][0] == "At Sea"
+    assert set(entered['events']['Event']) == {"enter"}
+    assert set(left['events']['Event']) == {"exit"}
+    assert sorted(entered['events']['Zone']) == sorted(left['events']['Zone'])
+
+
+def test_duplicate_ids_are_rejected(ports):
+    geofence = app.GeofenceEngine(ports.ports)
+    port_calls = app.PortCallExtractor(geofence.port_names)
+    rotterdam, singapore = ports.ports["Rotterdam"], ports.ports["Singapore"]
+    when = datetime(2026, 1, 1)
+    lat = np.array([rotterdam['lat'], singapore['lat']])
+    lon = np.array([rotterdam['lon'], singapore['lon']])
+
+    # One ID in two ports would flap enter/exit between their zones on every batch
+    with pytest.raises(ValueError):
+        geofence.update(["1", "1"], lat, lon, when)
+    with pytest.raises(ValueError):
+        port_calls.update(["1", "1"], [0, 1], [True, True], when)
+    assert len(geofence.index) == 0 and len(geofence.membership) == 0
+    assert len(port_calls.index) == 0
+
+    zones = geofence.update(["1", "2"], lat, lon, when)
+    assert list(zones['zone']) == ["Berth", "Berth"]
+    assert set(zones['events']['MMSI']) == {"1", "2"}
@@ -0,0 +1,168 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import app
+
+
+def make_snapshot(rng, vessels=30):
+    return pd.DataFrame({
+        'MMSI': [f"3000000{i:02d}" for i in range(vessels)],
+        'Latitude': rng.uniform(-60, 60, vessels),
+        'Longitude': rng.uniform(-180, 180, vessels),
+        'Speed': rng.integers(0, 20, vessels),
+        'Course': rng.integers(0, 360, vessels),
+        'Status': rng.choice(["Underway", "Anchored"], vessels),
+        'Type': rng.choice(["Container", "Tanker"], vessels),
+        'Port': rng.choice(["Rotterdam", "Singapore", "Santos"], vessels)
+    })
+
+
+def test_partitioned_queries_match_brute_force(tmp_path):
+    rng = np.random.default_rng(12)
+    history = app.HistoryStore(str(tmp_path), flush_rows=10 ** 9, flush_interval=10 ** 9)
+    start = datetime(2026, 3, 1, 20, 0)
+    recorded = []
+    for step in range(16):
+        when = start + timedelta(minutes=30 * step)  # crosses midnight into a second day
+        snapshot = make_snapshot(rng)
+        history.append(snapshot, when)
+        recorded.append(snapshot.assign(Timestamp=when))
+        if step % 5 == 4:
+            history.flush()  # leave some batches buffered so queries read both
+    everything = pd.concat(recorded, ignore_index=True)
+
+    partitions = {(os.path.basename(os.path.dirname(folder)), os.path.basename(folder)) for folder, _, files in os.walk(tmp_path) if files}
+    assert ('day=2026-03-01', 'port=Rotterdam') in partitions
+    assert ('day=2026-03-02', 'port=Santos') in partitions
+
+    key = ['MMSI', 'Timestamp']
+    for window_start, window_end, port, mmsi in [
+        (None, None, None, None),
+        (start + timedelta(hours=3), start + timedelta(hours=6), None, None),
+        (None, None, "Singapore", None),
+        (start + timedelta(hours=2), None, "Santos", ["300000003", "300000007"]),
+    ]:
+        result = history.query(start=window_start, end=window_end, port=port, mmsi=mmsi)
+        expected = everything
+        if window_start is not None:
+            expected = expected[expected['Timestamp'] >= window_start]
+        if window_end is not None:
+            expected = expected[expected['Timestamp'] <= window_end]
+        if port is not None:
+            expected = expected[expected['Port'] == port]
+        if mmsi is not None:
+            expected = expected[expected['MMSI'].isin(mmsi)]
+
+        result = result.sort_values(key).reset_index(drop=True)
+        expected = expected.sort_values(key).reset_index(drop=True)
+        assert len(result) == len(expected)
+        assert (result['MMSI'].to_numpy() == expected['MMSI'].to_numpy()).all()
+        assert (result['Timestamp'].to_numpy() == expected['Timestamp'].to_numpy().astype('datetime64[ms]')).all()
+        assert np.array_equal(result['Latitude'].to_numpy(), expected['Latitude'].to_numpy(dtype=np.float32))
+
+
+def test_simplified_history_keeps_track_ends(tmp_path):
+    rng = np.random.default_rng(13)
+    history = app.HistoryStore(str(tmp_path), flush_rows=10 ** 9, flush_interval=10 ** 9, tolerance_m=25.0)
+    snapshot = make_snapshot(rng).assign(Port="Rotterdam")
+    start = datetime(2026, 3, 1, 8, 0)
+    for step in range(10):
+        history.append(snapshot, start + timedelta(minutes=step))  # vessels standing still
+    history.flush()
+
+    result = history.query(port="Rotterdam")
+    assert history.get_stats()['rows_received'] == 10 * len(snapshot)
+    assert len(result) == 2 * len(snapshot)
+    assert set(result['Timestamp']) == {pd.Timestamp(start), pd.Timestamp(start + timedelta(minutes=9))}
+
+
+def test_new_run_hides_earlier_fleets(tmp_path):
+    rng = np.random.default_rng(14)
+    history = app.HistoryStore(str(tmp_path), flush_rows=10 ** 9, flush_interval=10 ** 9)
+    start = datetime(2026, 3, 1, 8, 0)
+    history.append(make_snapshot(rng), start)
+    history.flush()
+    history.append(make_snapshot(rng), start + timedelta(minutes=1))
+
+    # A fleet simulated afresh reuses the MMSIs; its history starts empty, flushed or buffered
+    history.start_run()
+    assert history.query().empty
+    current = make_snapshot(rng)
+    history.append(current, start + timedelta(minutes=2))
+    history.flush()
+    result = history.query()
+    assert len(result) == len(current)
+    assert set(result['Timestamp']) == {pd.Timestamp(start + timedelta(minutes=2))}
+
+
+def test_tracks_compress_across_flushes(tmp_path):
+    rng = np.random.default_rng(15)
+    history = app.HistoryStore(str(tmp_path), flush_rows=1, tolerance_m=25.0)  # every snapshot is its own flush
+    vessels = 200
+    snapshot = make_snapshot(rng, vessels).assign(Port="Rotterdam")
+    lat0, lon0 = snapshot['Latitude'].to_numpy(), snapshot['Longitude'].to_numpy()
+    # Half the fleet at anchor, half steaming straight at up to 20 knots, with a few meters of report noise
+    moving = np.arange(vessels) % 2 == 1
+    north_mps = np.where(moving, rng.uniform(-7, 7, vessels), 0.0)
+    east_mps = np.where(moving, rng.uniform(-7, 7, vessels), 0.0)
+
+    start = datetime(2026, 3, 1, 8, 0)
+    times, reported = [], []
+    for minute in range(120):
+        seconds = minute * 60
+        lat = lat0 + (north_mps * seconds + rng.normal(0, 2, vessels)) / 111_320
+        lon = lon0 + (east_mps * seconds + rng.normal(0, 2, vessels)) / (111_320 * np.cos(np.radians(lat0)))
+        history.append(snapshot.assign(Latitude=lat, Longitude=lon), start + timedelta(seconds=seconds))
+        times.append(seconds)
+        reported.append((lat, lon))
+    history.flush(final=True)
+
+    stats = history.get_stats()
+    assert stats['rows_received'] == 120 * vessels
+    assert stats['compression'] > 10
+
+    # Every report lies within tolerance of the stored track at its own time
+    stored = history.query().sort_values(['MMSI', 'Timestamp'])
+    reported_lat = np.array([lat for lat, _ in reported])
+    reported_lon = np.array([lon for _, lon in reported])
+    for i, (mmsi, track) in enumerate(stored.groupby('MMSI', sort=False)):
+        vessel = snapshot.index[snapshot['MMSI'] == mmsi][0]
+        track_seconds = (track['Timestamp'] - pd.Timestamp(start)).dt.total_seconds().to_numpy()
+        assert track_seconds[0] == 0 and track_seconds[-1] == times[-1]
+        lat = np.interp(times, track_seconds, track['Latitude'].to_numpy(dtype=float))
+        lon = np.interp(times, track_seconds, track['Longitude'].to_numpy(dtype=float))
+        north = (lat - reported_lat[:, vessel]) * 111_320
+        east = (lon - reported_lon[:, vessel]) * 111_320 * np.cos(np.radians(lat0[vessel]))
+        assert np.hypot(north, east).max() < 25.0 + 1.0  # stored as float32
+
+
+def test_rows_stay_readable_while_flushing(tmp_path, monkeypatch):
+    rng = np.random.default_rng(16)
+    history = app.HistoryStore(str(tmp_path), flush_rows=10 ** 9, flush_interval=10 ** 9, tolerance_m=25.0)
+    snapshot = make_snapshot(rng)
+    start = datetime(2026, 3, 1, 8, 0)
+    for minute in range(3):
+        history.append(snapshot, start + timedelta(minutes=minute))  # vessels standing still
+
+    # Hold the Parquet write until the batch has been queried mid-flush
+    writing, release = threading.Event(), threading.Event()
+    write_dataset = app.ds.write_dataset
+    def slow_write(*args, **kwargs):
+        writing.set()
+        release.wait(10)
+        return write_dataset(*args, **kwargs)
+    monkeypatch.setattr(app.ds, 'write_dataset', slow_write)
+
+    before = len(history.query())
+    flushing = threading.Thread(target=history.flush)
+    flushing.start()
+    assert writing.wait(10)
+    during = len(history.query())
+    release.set()
+    flushing.join(10)
+    assert before == during == 3 * 30
+    assert len(history.query()) == 2 * 30  # each vessel's first report stored, its latest held
@@ -0,0 +1,61 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+
+
+def reference_queue(berths, arrivals, service, horizon):
+    """First-come-first-served multi-berth queue, one vessel at a time"""
+    free = [0.0] * berths
+    heapq.heapify(free)
+    starts = []
+    for arrival in sorted(arrivals):
+        if arrival >= horizon:
+            continue
+        start = max(arrival, heapq.heappop(free))
+        heapq.heappush(free, start + service)
+        starts.append((arrival, start))
+    waiting = sum(min(start, horizon) - arrival for arrival, start in starts)
+    busy = sum(min(start + service, horizon) - min(start, horizon) for _, start in starts)
+    # Vessels counted as queued in an hour: arrived by then and not yet at a berth
+    queue = [sum(1 for arrival, start in starts if int(arrival) <= hour and (start >= horizon or int(start) > hour)) for hour in range(horizon)]
+    return {'mean_wait_h': waiting / max(len(starts), 1), 'load': (busy + waiting) / (berths * horizon), 'queue': np.mean(queue)}
+
+
+@pytest.fixture
+def simulator(monkeypatch):
+    # No service or ETA spread, so every replication is the same deterministic queue
+    monkeypatch.setattr(app.BerthQueueSimulator, 'SERVICE_CV', 0.0)
+    monkeypatch.setattr(app.BerthQueueSimulator, 'ETA_CV', 0.0)
+    return app.BerthQueueSimulator(app.GlobalPortSystem(), replications=3, horizon_hours=24, seed=1)
+
+
+def test_deterministic_queues_match_reference(simulator):
+    ports = pd.DataFrame({
+        'berths': [2, 3, 1],
+        'occupied': [0, 0, 0],
+        'waiting': [3, 0, 5],
+        'arrival_rate': [0.0, 0.0, 0.0],
+        'service_mean': [6.0, 10.0, 4.0],
+        'inbound': [[1.5, 2.5, 7.0], [0.5, 0.7, 0.9, 1.1, 20.0], [30.0]]
+    }, index=["A", "B", "C"])
+    result = simulator.simulate(ports)
+
+    for name, port in ports.iterrows():
+        expected = reference_queue(port['berths'], [0.0] * port['waiting'] + list(port['inbound']), port['service_mean'], 24)
+        assert result.loc[name, 'mean_wait_h'] == pytest.approx(expected['mean_wait_h'])
+        assert result.loc[name, 'congestion_level'] == pytest.approx(min(expected['load'], 1.0))
+        assert result.loc[name, 'expected_queue'] == pytest.approx(expected['queue'])
+        assert result.loc[name, 'berths'] == port['berths']
+
+
+def test_forecast_covers_every_port(simulator):
+    ports = app.GlobalPortSystem()
+    fleet = ports.simulate_fleet(2000, seed=4)
+    forecast = simulator.forecast(fleet)
+    assert list(forecast.index) == list(ports.ports)
+    assert forecast['congestion_level'].between(0, 1).all()
+    assert (forecast['queue_p90'] >= 0).all()
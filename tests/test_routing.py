@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+import app
+
+
+@pytest.fixture(scope='module')
+def network():
+    return app.SeaRouteNetwork(app.GlobalPortSystem())
+
+
+def test_astar_routes_are_fastest(network):
+    router = app.SeaRouter(network)
+    rng = np.random.default_rng(2)
+    for origin, destination in rng.choice(len(network.port_names), size=(40, 2)):
+        origin, destination = network.port_names[origin], network.port_names[destination]
+        route = router.get_route(origin, destination)
+        expected = network.get_transit_hours(origin, destination)
+        if not np.isfinite(expected):
+            assert route is None
+            continue
+
+        # The node path costs exactly the all-pairs optimum and its miles match the distance matrix
+        nodes = [network.node_index[name] for name in route['nodes']]
+        hours = 0.0
+        for a, b in zip(nodes[:-1], nodes[1:]):
+            leg = [h for n, h, _ in router.neighbours[a] if n == b]
+            hours += min(leg)
+        assert hours == pytest.approx(expected)
+        assert route['nodes'][0] == origin and route['nodes'][-1] == destination
+        assert route['nm'] == pytest.approx(network.get_distance(origin, destination), rel=0.01)
+
+
+def test_positions_along_route_endpoints(network):
+    router = app.SeaRouter(network)
+    route = router.get_route("Singapore", "Rotterdam")
+    lat, lon, _ = router.positions_along(route, np.array([0.0, 1.0]))
+    assert np.allclose([lat[0], lon[0]], network.get_position("Singapore"), atol=1e-6)
+    assert np.allclose([lat[1], lon[1]], network.get_position("Rotterdam"), atol=1e-6)
@@ -0,0 +1,46 @@
+import threading
+import time
+
+import app
+
+
+def test_idle_source_retires_with_its_state():
+    scheduler = app.DataRefreshScheduler()
+    retired = threading.Event()
+    scheduler.add_source("fleet:test", lambda: "snapshot", 0.05, idle_timeout=0.2, on_retire=lambda name: retired.set())
+    try:
+        assert scheduler.get_latest("fleet:test", timeout=5)['data'] == "snapshot"
+        assert retired.wait(5)
+        assert not scheduler.has_source("fleet:test")
+        assert scheduler.peek("fleet:test") is None
+    finally:
+        scheduler.stop()
+
+
+def test_source_is_kept_while_read():
+    scheduler = app.DataRefreshScheduler()
+    retired = threading.Event()
+    scheduler.add_source("fleet:test", lambda: "snapshot", 0.05, idle_timeout=0.5, on_retire=lambda name: retired.set())
+    try:
+        for _ in range(10):
+            assert scheduler.get_latest("fleet:test", timeout=5) is not None
+            time.sleep(0.1)
+        assert not retired.is_set()
+    finally:
+        scheduler.stop()
+
+
+def test_failed_first_fetch_releases_readers():
+    scheduler = app.DataRefreshScheduler()
+
+    def fail():
+        raise ValueError("feed down")
+
+    scheduler.add_source("fleet:test", fail, 60)
+    try:
+        start = time.perf_counter()
+        assert scheduler.get_latest("fleet:test", timeout=30) is None
+        assert time.perf_counter() - start < 5
+        assert scheduler.get_error("fleet:test") == "feed down"
+    finally:
+        scheduler.stop()
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+import app
+
+
+def reference_keep(simplifier, x, y, t, first, last, keep):
+    """Classic recursive Douglas-Peucker over one track"""
+    keep[first] = keep[last] = True
+    if last - first < 2:
+        return
+    point = np.arange(first + 1, last)
+    distance = simplifier.segment_distance(x, y, t, point, np.full(len(point), first), np.full(len(point), last))
+    farthest = int(np.argmax(distance))
+    if distance[farthest] > simplifier.tolerance_m:
+        split = first + 1 + farthest
+        reference_keep(simplifier, x, y, t, first, split, keep)
+        reference_keep(simplifier, x, y, t, split, last, keep)
+
+
+def make_tracks(seed, tracks=12, points=80):
+    rng = np.random.default_rng(seed)
+    ids = np.repeat(np.arange(tracks), points)
+    times = np.datetime64('2026-01-01T00:00:00') + (np.tile(np.arange(points), tracks) * 60 + rng.integers(0, 20, tracks * points)).astype('timedelta64[s]')
+    lat = np.repeat(rng.uniform(-50, 50, tracks), points) + np.cumsum(rng.normal(0, 0.002, tracks * points))
+    lon = np.repeat(rng.uniform(-170, 170, tracks), points) + np.cumsum(rng.normal(0, 0.002, tracks * points))
+    return ids, np.sort(times.reshape(tracks, points), axis=1).ravel(), lat, lon
+
+
+@pytest.mark.parametrize('time_aware', [True, False])
+def test_batched_simplify_matches_recursive(time_aware):
+    simplifier = app.TrajectorySimplifier(tolerance_m=40.0, time_aware=time_aware)
+    ids, times, lat, lon = make_tracks(7)
+    keep = simplifier.simplify(ids, times, lat, lon)
+
+    x, y = simplifier.project(lat, lon)
+    t = times.astype('datetime64[ms]').astype(np.int64) / 1000.0
+    expected = np.zeros(len(lat), dtype=bool)
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    for first, last in zip(starts, np.r_[starts[1:], len(ids)] - 1):
+        reference_keep(simplifier, x, y, t, first, last, expected)
+
+    assert (keep == expected).all()
+    assert keep.sum() < len(keep)
+
+
+def test_dropped_points_stay_within_tolerance():
+    simplifier = app.TrajectorySimplifier(tolerance_m=25.0, time_aware=True)
+    ids, times, lat, lon = make_tracks(9)
+    keep = simplifier.simplify(ids, times, lat, lon)
+
+    x, y = simplifier.project(lat, lon)
+    t = times.astype('datetime64[ms]').astype(np.int64) / 1000.0
+    kept = np.flatnonzero(keep)
+    for i in np.flatnonzero(~keep):
+        before = kept[kept < i].max()
+        after = kept[kept > i].min()
+        assert ids[before] == ids[i] == ids[after]
+        assert simplifier.segment_distance(x, y, t, np.array([i]), np.array([before]), np.array([after]))[0] <= 25.0
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+import app
+
+
+def test_fleet_summary_matches_groupby():
+    ports = app.GlobalPortSystem()
+    frame = ports.simulate_fleet(4000, seed=31)
+    # Vessels without a port, or at a port outside the registry, count towards no port or region
+    frame.loc[frame.index[:40], 'Port'] = None
+    frame.loc[frame.index[40:60], 'Port'] = "Atlantis"
+    fleet_store = app.FleetStore(frame, version=1)
+    regions = {name: port['region'] for name, port in ports.ports.items()}
+
+    summary = app.BusinessIntelligence().summarize_fleet(fleet_store, regions)
+
+    counted = frame[frame['Port'].isin(list(regions))]
+    by_port = counted.groupby('Port').agg(
+        Vessels=('MMSI', 'size'), Cargo_Value_M=('Cargo_Value_M', 'sum'), Avg_Speed=('Speed', 'mean')
+    ).reindex(list(regions), fill_value=0)
+    result = summary['Port']
+    assert np.array_equal(result['Vessels'].to_numpy(), by_port['Vessels'].to_numpy())
+    assert np.allclose(result['Cargo_Value_M'].to_numpy(), by_port['Cargo_Value_M'].round(1).to_numpy())
+    assert np.allclose(result['Avg_Speed'].to_numpy(), by_port['Avg_Speed'].round(1).to_numpy())
+
+    by_region = counted.assign(Region=counted['Port'].map(regions)).groupby('Region').size()
+    assert summary['Region']['Vessels'].to_dict() == by_region.to_dict()
+
+    by_company = counted.groupby('Company').size()
+    assert summary['Company']['Vessels'][by_company.index].to_dict() == by_company.to_dict()
+    assert summary['Company']['Vessels'].sum() == len(counted)
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+
+
+def reference_filter(measurements, times, velocity, q, r, velocity_var):
+    """Textbook constant-velocity Kalman filter for one axis, one report at a time"""
+    x = np.array([0.0, velocity])
+    P = np.array([[r, 0.0], [0.0, velocity_var]])
+    H = np.array([[1.0, 0.0]])
+    for z, dt in zip(measurements[1:], np.diff(times)):
+        F = np.array([[1.0, dt], [0.0, 1.0]])
+        Q = q * np.array([[dt ** 3 / 3, dt ** 2 / 2], [dt ** 2 / 2, dt]])
+        x = F @ x
+        P = F @ P @ F.T + Q
+        K = P @ H.T / (H @ P @ H.T + r)
+        x = x + (K * (z - H @ x)).ravel()
+        P = (np.eye(2) - K @ H) @ P
+    return x, P
+
+
+def test_batch_filter_matches_reference():
+    rng = np.random.default_rng(3)
+    tracker = app.VesselTracker()
+    vessels = 20
+    mmsi = [f"2000000{i:02d}" for i in range(vessels)]
+    lat0 = rng.uniform(-60, 60, vessels)
+    lon0 = rng.uniform(-180, 180, vessels)
+    speed = rng.uniform(0, 20, vessels)
+    course = rng.uniform(0, 360, vessels)
+
+    start = datetime(2026, 1, 1)
+    offsets = np.cumsum(np.r_[0, rng.uniform(5, 300, 30)])
+    fixes = []
+    for seconds in offsets:
+        lat = lat0 + rng.normal(0, 2e-4, vessels) + seconds * 1e-6
+        lon = lon0 + rng.normal(0, 2e-4, vessels) - seconds * 2e-6
+        tracker.update(mmsi, lat, lon, start + timedelta(seconds=float(seconds)), speed_kn=speed, course_deg=course)
+        fixes.append((lat, lon))
+
+    for i in range(vessels):
+        rows = np.array([i])
+        measured = np.array([tracker.to_local(rows, np.array([lat[i]]), np.array([lon[i]]))[0] for lat, lon in fixes])
+        initial = speed[i] * tracker.KNOT * np.array([np.sin(np.radians(course[i])), np.cos(np.radians(course[i]))])
+        for axis in range(2):
+            x, P = reference_filter(measured[:, axis], offsets, initial[axis], tracker.q, tracker.r, tracker.initial_velocity_var)
+            assert np.isclose(tracker.position[i, axis], x[0], atol=1e-6)
+            assert np.isclose(tracker.velocity[i, axis], x[1], atol=1e-9)
+            assert np.allclose(tracker.covariance[i], [P[0, 0], P[0, 1], P[1, 1]], rtol=1e-6)
+
+
+def test_filter_recovers_constant_velocity():
+    rng = np.random.default_rng(5)
+    tracker = app.VesselTracker()
+    start = datetime(2026, 1, 1)
+    # 12 knots due east along the equator, reported every minute with 15 m noise
+    east_mps = 12 * tracker.KNOT
+    for minute in range(120):
+        meters = east_mps * minute * 60 + rng.normal(0, 15)
+        lon = meters / tracker.METERS_PER_DEGREE
+        state = tracker.update(["1"], [rng.normal(0, 15) / tracker.METERS_PER_DEGREE], [lon], start + timedelta(minutes=minute))
+    assert abs(state['Filtered_Speed'].iloc[0] - 12) < 0.5
+    assert abs(state['Filtered_Course'].iloc[0] - 90) < 3
+
+
+def test_duplicate_ids_are_rejected():
+    tracker = app.VesselTracker()
+    when = datetime(2026, 1, 1)
+    # One ID reported from New York and Singapore would share one state row
+    with pytest.raises(ValueError):
+        tracker.update(["367000001", "367000001"], [40.7, 1.26], [-74.0, 103.8], when)
+    assert len(tracker) == 0
+
+
+def test_demo_fleet_ids_are_unique():
+    ports = app.GlobalPortSystem()
+    for _ in range(20):
+        fleet = pd.DataFrame(ports.get_global_fleet())
+        assert fleet['MMSI'].is_unique
@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+
+import app
+
+
+@pytest.fixture(scope='module')
+def world():
+    ports = app.GlobalPortSystem()
+    router = app.SeaRouter(app.SeaRouteNetwork(ports))
+    return ports, router, app.GeofenceEngine(ports.ports)
+
+
+def in_own_port(geofence, frame):
+    """Whether each vessel lies inside one of its own port's zones"""
+    point, zone = geofence.locate(frame['Latitude'].to_numpy(), frame['Longitude'].to_numpy())
+    own = geofence.port_names
+    port = np.array([own.index(name) for name in frame['Port']])
+    inside = np.zeros(len(frame), dtype=bool)
+    inside[point[geofence.zone_port_index[zone] == port[point]]] = True
+    return inside
+
+
+def test_vessels_stay_on_route_or_in_port(world):
+    ports, router, geofence = world
+    voyages = app.VoyageSimulator(ports, router, seed=1)
+    store = app.FleetStore(ports.simulate_fleet(2000, seed=0, router=router), 1)
+    start = store.frame
+    stationary = start['Status'] != "Underway"
+    assert in_own_port(geofence, start)[stationary.to_numpy()].all()
+
+    arrived = berthed = departed = 0
+    previous = start
+    for step in range(48):
+        store = store.advance(store.created_at + timedelta(minutes=10), step + 2, voyages=voyages)
+        frame = store.frame
+        underway = (frame['Status'] == "Underway").to_numpy()
+        routed = underway & (frame['Origin'] != "").to_numpy()
+        direct = underway & ~routed
+
+        # Waiting vessels are inside their own port, never out at sea past it
+        assert in_own_port(geofence, frame)[~underway].all()
+        assert (frame['Speed'].to_numpy()[~underway] == 0).all()
+
+        # Vessels on a voyage stay within the lane around their route
+        for row in np.flatnonzero(routed):
+            route = router.get_route(frame['Origin'].iat[row], frame['Port'].iat[row])
+            lat, lon, _ = router.positions_along(route, np.array([frame['Route_Progress'].iat[row]]))
+            off = ports.great_circle_nm(lat[0], lon[0], frame['Latitude'].iat[row], frame['Longitude'].iat[row])
+            assert off < 20
+
+        # Vessels heading straight in only ever get closer to their port
+        port_lat = np.array([ports.ports[name]['lat'] for name in frame['Port']])
+        port_lon = np.array([ports.ports[name]['lon'] for name in frame['Port']])
+        was_direct = ((previous['Status'] == "Underway") & (previous['Origin'] == "")).to_numpy()
+        same_port = (previous['Port'] == frame['Port']).to_numpy()
+        keep = direct & was_direct & same_port
+        before = ports.great_circle_nm(previous['Latitude'].to_numpy()[keep], previous['Longitude'].to_numpy()[keep], port_lat[keep], port_lon[keep])
+        after = ports.great_circle_nm(frame['Latitude'].to_numpy()[keep], frame['Longitude'].to_numpy()[keep], port_lat[keep], port_lon[keep])
+        assert (after <= before + 1e-6).all()
+
+        was_routed = ((previous['Status'] == "Underway") & (previous['Origin'] != "")).to_numpy()
+        was_waiting = (previous['Status'] != "Underway").to_numpy()
+        arrived += int((was_routed & (frame['Status'] == "Anchored").to_numpy()).sum())
+        berthed += int((was_direct & ~underway).sum())
+        departed += int((was_waiting & routed).sum())
+        previous = frame
+
+    assert arrived and berthed and departed
+    assert (frame['Destination'] == frame['Port']).all()
+
+
+def test_advance_without_voyages_dead_reckons(world):
+    ports, _, _ = world
+    store = app.FleetStore(ports.simulate_fleet(200, seed=0), 1)
+    moved = store.advance(store.created_at + timedelta(hours=1), 2)
+    assert moved.version == 2
+    assert len(moved.frame) == 200
+    assert (moved.frame['MMSI'] == store.frame['MMSI']).all()
+
+
+def own_zone_kinds(geofence, frame):
+    """Set of own-port zone kinds each vessel lies inside"""
+    point, zone = geofence.locate(frame['Latitude'].to_numpy(), frame['Longitude'].to_numpy())
+    port = np.array([geofence.port_names.index(name) for name in frame['Port']])
+    own = geofence.zone_port_index[zone] == port[point]
+    kinds = [set() for _ in range(len(frame))]
+    for i, kind in zip(point[own], geofence.zone_kind[zone[own]]):
+        kinds[i].add(kind)
+    return kinds
+
+
+def test_dense_ports_keep_stationary_vessels_in_their_zones(world):
+    ports, _, geofence = world
+    frame = ports.simulate_fleet(100_000, seed=2)
+    kinds = own_zone_kinds(geofence, frame)
+
+    # The Underway spread around a busy port is wider than its anchorage, the waiting vessels are not
+    underway = (frame['Status'] == "Underway").to_numpy()
+    assert any(not kinds[i] for i in np.flatnonzero(underway))
+    for i in np.flatnonzero(frame['Status'] == "Anchored"):
+        assert kinds[i] == {'anchorage'}
+    for i in np.flatnonzero(frame['Status'].isin(app.VoyageSimulator.BERTH_STATUSES)):
+        assert kinds[i] == {'anchorage', 'port', 'berth'}